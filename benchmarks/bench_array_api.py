@@ -0,0 +1,59 @@
+"""Point operations of the processing library API in threads and processes.
+
+Checks that the processing modules import without tkinter, then runs the
+same chain (gamma, threshold, equalization) over a batch of frames serially,
+on a thread pool and on a process pool, verifies the results are identical
+and reports frames per second.
+
+Run from the repository root:  python -m benchmarks.bench_array_api [frames] [side]
+"""
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+import processing
+
+HEADLESS_MODULES = ("processing", "image_processing", "histogram_equalization", "pcxtool.operations")
+
+
+def process_frame(frame):
+    """The per-frame job: module-level so process pools can pickle it."""
+    out = processing.gamma(frame, 0.8)
+    out = processing.clahe(out, tiles=4)
+    return processing.threshold(processing.equalize(out), 128)
+
+
+def _imports_tkinter(module):
+    code = f"import sys, {module}; print('tkinter' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.strip() == "True"
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    side = int(sys.argv[2]) if len(sys.argv) > 2 else 512
+    for module in HEADLESS_MODULES:
+        print(f"import {module:<24} tkinter loaded: {_imports_tkinter(module)}")
+
+    rng = np.random.default_rng(0)
+    stack = [rng.normal(110, 25, (side, side)).clip(0, 255).astype(np.uint8) for _ in range(frames)]
+
+    start = time.perf_counter()
+    expected = [process_frame(frame) for frame in stack]
+    serial = time.perf_counter() - start
+    print(f"{frames} frames of {side}x{side}")
+    print(f"serial:    {frames / serial:8.1f} frames/s")
+    for label, pool_type in (("threads", ThreadPoolExecutor), ("processes", ProcessPoolExecutor)):
+        with pool_type() as pool:
+            start = time.perf_counter()
+            results = list(pool.map(process_frame, stack))
+            elapsed = time.perf_counter() - start
+        same = all(np.array_equal(a, b) for a, b in zip(results, expected))
+        print(f"{label + ':':<10} {frames / elapsed:8.1f} frames/s  identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
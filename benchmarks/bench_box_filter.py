@@ -0,0 +1,50 @@
+"""Sweep the box-blur kernel size to show the summed-area table cost stays flat.
+
+Times box_sum against the separable two-pass correlate2d (O(k) per pixel
+below k = 8, running sums from there on) and the three blur-based filters,
+for k from 3 to 101.
+
+Run from the repository root:  python -m benchmarks.bench_box_filter [side]
+"""
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from filters.convolution import box_sum, correlate2d
+from filters.smoothing_filters import apply_average_filter
+from filters.sharpening_filters import unsharp_masking, highboost_filtering
+
+KERNEL_SIZES = (3, 5, 9, 15, 31, 51, 75, 101)
+
+
+def _best(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(side=1024):
+    rng = np.random.default_rng(0)
+    img_np = rng.integers(0, 256, (side, side)).astype(np.float32)
+    image = Image.fromarray(img_np.astype(np.uint8), mode="L")
+
+    print(f"{side}x{side} image, times in ms")
+    print(f"{'k':>5}{'SAT':>9}{'correlate2d':>12}{'average':>10}{'unsharp':>10}{'highboost':>11}")
+    for k in KERNEL_SIZES:
+        ones = np.ones((k, k))
+        assert np.array_equal(box_sum(img_np, k), correlate2d(img_np, ones))
+        sat = _best(lambda: box_sum(img_np, k))
+        sep = _best(lambda: correlate2d(img_np, ones), repeat=1)
+        avg = _best(lambda: apply_average_filter(image, k))
+        uns = _best(lambda: unsharp_masking(image, k))
+        hb = _best(lambda: highboost_filtering(image, 2.0, k))
+        print(f"{k:>5}{sat * 1e3:>9.1f}{sep * 1e3:>12.1f}{avg * 1e3:>10.1f}{uns * 1e3:>10.1f}{hb * 1e3:>11.1f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1024)
@@ -0,0 +1,53 @@
+"""Measure PCX encode throughput of write_pcx against Pillow's C encoder.
+
+Run from the repository root:  python -m benchmarks.bench_encode
+"""
+import io
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from pcx_reader import PcxImage
+from pcx_writer import encode_pcx
+
+
+def _best(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _pillow_encode(arr):
+    buf = io.BytesIO()
+    Image.fromarray(arr).save(buf, format="PCX")
+    return buf.getvalue()
+
+
+def run(sides=(1024, 4096)):
+    boat = PcxImage.open("images/Boat.pcx")
+    cases = [("Boat.pcx indexed", boat.indices), ("Boat.pcx 24-bit", boat.rgb)]
+    gray = Image.fromarray(boat.indices)
+    for side in sides:
+        smooth = np.asarray(gray.resize((side, side)))
+        cases.append((f"{side}x{side} 8-bit", smooth))
+        cases.append((f"{side}x{side} 24-bit", np.repeat(smooth[:, :, None], 3, axis=2)))
+
+    print(f"{'image':<22}{'MB/s':>10}{'pillow MB/s':>14}{'ratio':>8}")
+    for name, arr in cases:
+        # Round-trip check before timing
+        decoded = PcxImage.from_bytes(encode_pcx(arr))
+        assert np.array_equal(decoded.indices if arr.ndim == 2 else decoded.rgb, arr)
+        mb = arr.nbytes / 1e6
+        ours = _best(lambda: encode_pcx(arr))
+        theirs = _best(lambda: _pillow_encode(arr))
+        print(f"{name:<22}{mb / ours:>10.1f}{mb / theirs:>14.1f}{theirs / ours:>8.2f}")
+
+
+if __name__ == "__main__":
+    sides = tuple(int(s) for s in sys.argv[1:]) or (1024, 4096)
+    run(sides)
@@ -0,0 +1,66 @@
+"""Compare the raster histogram renderer with the matplotlib PNG round-trip.
+
+Times one 250x180 channel histogram and the 800x400 equalization comparison,
+plus the one-off cost of importing matplotlib.pyplot.
+
+Run from the repository root:  python -m benchmarks.bench_histogram
+"""
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from histogram_plot import render_histogram, render_histograms
+
+
+def _best(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _matplotlib_png(plt, hists, colors, figsize):
+    # The rendering path used before the raster renderer
+    plt.figure(figsize=figsize)
+    for i, (hist, color) in enumerate(zip(hists, colors)):
+        plt.subplot(1, len(hists), i + 1)
+        plt.bar(range(256), hist, color=color, width=1.0)
+        plt.xlabel("Intensity")
+        plt.ylabel("Frequency")
+    plt.tight_layout()
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png")
+    plt.close()
+    buf.seek(0)
+    return Image.open(buf).load()
+
+
+def run():
+    rng = np.random.default_rng(0)
+    hist = np.bincount(rng.integers(0, 256, 512 * 512), minlength=256)
+    hist_eq = np.bincount(rng.integers(0, 256, 512 * 512), minlength=256)
+
+    t0 = time.perf_counter()
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import_ms = (time.perf_counter() - t0) * 1e3
+
+    raster_one = _best(lambda: render_histogram(hist, "red", (250, 180), title="Red Channel Histogram"))
+    raster_two = _best(lambda: render_histograms([hist, hist_eq], ["gray", "green"], size=(800, 400)))
+    mpl_one = _best(lambda: _matplotlib_png(plt, [hist], ["red"], (3, 2)))
+    mpl_two = _best(lambda: _matplotlib_png(plt, [hist, hist_eq], ["gray", "green"], (8, 4)))
+
+    print(f"import matplotlib.pyplot: {import_ms:.0f} ms")
+    print(f"{'':>22}{'raster':>10}{'matplotlib':>12}{'speedup':>9}")
+    for label, fast, slow in (("channel histogram", raster_one, mpl_one),
+                              ("comparison (2 panels)", raster_two, mpl_two)):
+        print(f"{label:>22}{fast * 1e3:>8.1f}ms{slow * 1e3:>10.1f}ms{slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run()
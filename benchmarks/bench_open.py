@@ -0,0 +1,58 @@
+"""Time to first pixel when opening a file, with derived views deferred.
+
+Measures, without a display: the import time of the GUI module, the work
+before the original image can be shown (decode + thumbnail), and the work
+that file open used to do eagerly for every derived view.
+
+Run from the repository root:  python -m benchmarks.bench_open [file.pcx ...]
+"""
+import subprocess
+import sys
+import time
+
+from histogram_equalization import histogram_equalization
+from image_processing import create_histogram, create_rgb_channel_images, create_grayscale_image
+from lut import apply_chain
+from pcx_reader import PcxImage
+
+
+def _import_ms(module):
+    code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def _thumbnail(img, size=(400, 400)):
+    copy = img.copy()
+    copy.thumbnail(size)
+    return copy
+
+
+def _all_views(img):
+    r_img, g_img, b_img, channels = create_rgb_channel_images(img)
+    for channel, color in zip(channels, ("red", "green", "blue")):
+        create_histogram(channel, color, size=(250, 180))
+    for view in (r_img, g_img, b_img):
+        _thumbnail(view, (250, 250))
+    gray = create_grayscale_image(img)
+    for steps in ([("negative",)], [("threshold", 128)], [("gamma", 0.5)]):
+        _thumbnail(apply_chain(gray, steps))
+    histogram_equalization(gray)
+
+
+def run(paths):
+    print(f"import main: {_import_ms('main'):.0f} ms")
+    for path in paths:
+        t0 = time.perf_counter()
+        img = PcxImage.open(path).to_image()
+        _thumbnail(img)
+        first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _all_views(img)
+        views = time.perf_counter() - t0
+        print(f"{path}: first pixel {first * 1e3:.1f} ms, "
+              f"eager derived views {views * 1e3:.1f} ms (now deferred until visible)")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:] or ["images/Boat.pcx", "images/Lena_256.pcx"])
@@ -0,0 +1,113 @@
+"""Compare the legacy per-byte RLE loop with the vectorized decoder.
+
+Also checks with tracemalloc that decoding a noise image into a caller-supplied
+array needs only O(chunk) extra memory, not a multiple of the image size.
+
+Run from the repository root:  python -m benchmarks.bench_rle
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from pcx_reader import _RLE_CHUNK, PcxHeader, decode_rle, read_pcx_header
+
+
+def legacy_decompress_rle(filepath):
+    """The original byte-at-a-time decoder, kept here as the baseline."""
+    with open(filepath, 'rb') as f:
+        f.seek(128)
+        pixel_data = []
+        file_size = os.path.getsize(filepath)
+        end_pos = file_size - 769
+        while f.tell() < end_pos:
+            byte = f.read(1)
+            if not byte:
+                break
+            val = byte[0]
+            if val >= 0xC0:
+                count = val & 0x3F
+                data_byte = f.read(1)[0]
+                pixel_data.extend([data_byte] * count)
+            else:
+                pixel_data.append(val)
+        return pixel_data
+
+
+def fast_decompress(filepath):
+    header = read_pcx_header(filepath)
+    size = header['Height'] * header['BytesPerLine'] * header['NPlanes']
+    with open(filepath, 'rb') as f:
+        f.seek(128)
+        return decode_rle(f.read(), size)
+
+
+def make_synthetic(path, side, seed=0):
+    """Write a side x side 8-bit PCX mixing flat areas, gradients and noise."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:side, 0:side]
+    img = ((x // 16 + y // 16) * 7 % 256).astype(np.uint8)
+    noisy = rng.random((side, side)) < 0.3
+    img[noisy] = rng.integers(0, 256, noisy.sum(), dtype=np.uint8)
+    Image.fromarray(img, mode="L").save(path, format="PCX")
+
+
+def check_peak_memory(side=2048, limit=64 * _RLE_CHUNK):
+    """Assert decode_rle of side x side noise into a preallocated array peaks below limit bytes."""
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "noise.pcx")
+        Image.fromarray(rng.integers(0, 256, (side, side), dtype=np.uint8), mode="L").save(path, format="PCX")
+        with open(path, 'rb') as f:
+            data = f.read()
+    header = PcxHeader.from_bytes(data)
+    payload = memoryview(data)[128:]
+    out = np.empty(header.decoded_size, dtype=np.uint8)
+    tracemalloc.start()
+    decode_rle(payload, header.decoded_size, out=out)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"noise {side}x{side}: {len(payload) / 1e6:.1f} MB payload, {out.nbytes / 1e6:.1f} MB output, "
+          f"peak {peak / 1e6:.1f} MB extra (limit {limit / 1e6:.1f} MB)")
+    assert peak < limit, f"decode_rle peaked at {peak} bytes, limit {limit}"
+
+
+def _time(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(sides=(1024, 2048, 4096), legacy_max_side=2048):
+    files = [("Boat.pcx", os.path.join("images", "Boat.pcx"))]
+    with tempfile.TemporaryDirectory() as tmp:
+        for side in sides:
+            path = os.path.join(tmp, f"synthetic_{side}.pcx")
+            make_synthetic(path, side)
+            files.append((f"synthetic {side}x{side}", path))
+
+        print(f"{'file':<24}{'MB':>8}{'legacy s':>12}{'fast s':>10}{'speedup':>10}")
+        for name, path in files:
+            mb = os.path.getsize(path) / 1e6
+            fast = _time(fast_decompress, path)
+            header = read_pcx_header(path)
+            if max(header['Width'], header['Height']) <= legacy_max_side:
+                legacy = _time(legacy_decompress_rle, path, repeat=1)
+                assert np.array_equal(np.asarray(legacy_decompress_rle(path), dtype=np.uint8),
+                                      fast_decompress(path))
+                print(f"{name:<24}{mb:>8.2f}{legacy:>12.3f}{fast:>10.4f}{legacy / fast:>9.1f}x")
+            else:
+                print(f"{name:<24}{mb:>8.2f}{'-':>12}{fast:>10.4f}{'-':>10}")
+
+
+if __name__ == "__main__":
+    sides = tuple(int(s) for s in sys.argv[1:]) or (1024, 2048, 4096)
+    run(sides)
+    check_peak_memory()
@@ -0,0 +1,68 @@
+"""Per-frame calls versus the batched (N, H, W) stack API.
+
+Runs histograms, equalization, a LUT chain and the Sobel gradient over a
+stack of small frames, once frame by frame through processing and once
+through stack_processing, checks the results are identical and reports frames
+per second and the stacked speedup. Then writes the frames as PCX files and compares decoding them one
+by one with load_stack.
+
+Run from the repository root:  python -m benchmarks.bench_stack [frames] [side]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import processing
+import stack_processing
+from pcx_reader import PcxImage
+from pcx_writer import write_pcx
+
+STEPS = [("gamma", 0.8), ("threshold", 120)]
+
+
+def _per_frame_sobel(frame):
+    return processing.apply_filter("Gradient (Sobel)", frame)
+
+
+CASES = [
+    ("histograms", lambda f: processing.histogram(f), stack_processing.histograms),
+    ("equalize", processing.equalize, lambda s: stack_processing.equalize(s)[0]),
+    ("lut chain", lambda f: processing.point_chain(f, STEPS), lambda s: stack_processing.point_chain(s, STEPS)),
+    ("sobel", _per_frame_sobel, stack_processing.sobel),
+]
+
+
+def _time(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    side = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    rng = np.random.default_rng(0)
+    stack = rng.normal(110, 30, (frames, side, side)).clip(0, 255).astype(np.uint8)
+    print(f"{frames} frames of {side}x{side}")
+    print(f"{'operation':<12} {'per frame':>12} {'stacked':>12} {'speedup':>8}  identical")
+    for name, per_frame, stacked in CASES:
+        loop_s, expected = _time(lambda: [per_frame(frame) for frame in stack])
+        stack_s, result = _time(lambda: stacked(stack))
+        same = all(np.array_equal(a, b) for a, b in zip(result, expected))
+        print(f"{name:<12} {frames / loop_s:9.0f}/s {frames / stack_s:9.0f}/s {loop_s / stack_s:7.2f}x  {same}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, frame in enumerate(stack):
+            write_pcx(os.path.join(tmp, f"frame{i:05d}.pcx"), frame)
+        paths = sorted(os.path.join(tmp, name) for name in os.listdir(tmp))
+        loop_s, expected = _time(lambda: [processing.grayscale(PcxImage.open(p).rgb) for p in paths])
+        stack_s, (loaded, _) = _time(lambda: stack_processing.load_stack(tmp))
+        same = all(np.array_equal(a, b) for a, b in zip(loaded, expected))
+        print(f"{'load':<12} {frames / loop_s:9.0f}/s {frames / stack_s:9.0f}/s {loop_s / stack_s:7.2f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Peak memory and time of streamed versus in-memory batch processing.
+
+Writes a synthetic 24-bit PCX file, runs the same operation chain through
+pcxtool.batch.process_file with and without streaming, checks that both write
+identical files, and reports the tracemalloc peak and the wall time of each.
+
+Run from the repository root:  python -m benchmarks.bench_stream [side] [chain]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from pcx_writer import write_pcx
+from pcxtool.batch import process_file
+from pcxtool.operations import parse_chain
+
+DEFAULT_CHAIN = "grayscale > median:kernel_size=5 > gamma:gamma=0.8 > threshold:threshold=120"
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    chain = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_CHAIN
+    ops = parse_chain(chain)
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = np.random.default_rng(0)
+        y, x = np.mgrid[0:side, 0:side]
+        rgb = np.stack([(x + y) % 256, (x * 2) % 256, (y // 4) % 256], axis=2).astype(np.uint8)
+        rgb[::7] = rng.integers(0, 256, rgb[::7].shape, dtype=np.uint8)
+        src = os.path.join(tmp, "frame.pcx")
+        write_pcx(src, rgb)
+        del rgb, x, y
+        print(f"{side}x{side} RGB, {os.path.getsize(src) / 1e6:.1f} MB: {chain}")
+
+        outputs = {}
+        for label, stream in (("in-memory", False), ("streamed", True)):
+            out_path = os.path.join(tmp, label, "frame.pcx")
+            elapsed, peak = _measure(lambda: process_file(src, ops, out_path, stream=stream))
+            outputs[label] = open(out_path, "rb").read()
+            print(f"{label + ':':<11} {elapsed:6.2f} s  peak {peak / 1e6:8.1f} MB")
+        print(f"identical output: {outputs['in-memory'] == outputs['streamed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Cross-check the vectorized decoder on every supported PCX variant.
+
+Each variant is written from a known random image with a small reference
+encoder, decoded with PcxImage, and compared with the source pixels and, where
+Pillow can read the variant, with Pillow's own PCX decoder.
+
+Run from the repository root:  python -m benchmarks.check_pcx_variants
+"""
+import io
+import sys
+
+import numpy as np
+from PIL import Image
+
+from pcx_reader import PcxImage, SUPPORTED_FORMATS
+
+# Variants Pillow's PcxImagePlugin can decode
+PILLOW_FORMATS = {(1, 1), (1, 2), (1, 4), (8, 1), (8, 3)}
+
+
+def _rle(line):
+    """Reference per-byte RLE encoder for one scanline."""
+    out = bytearray()
+    i = 0
+    while i < len(line):
+        j = i
+        while j < len(line) and j - i < 63 and line[j] == line[i]:
+            j += 1
+        if j - i > 1 or line[i] >= 0xC0:
+            out += bytes((0xC0 | (j - i), line[i]))
+        else:
+            out.append(line[i])
+        i = j
+    return bytes(out)
+
+
+def _pack_lines(planes, bpp):
+    """Pack (H, NPlanes, W) values of `bpp` bits into even-length byte scanlines."""
+    h, nplanes, w = planes.shape
+    stride = (w * bpp + 7) // 8
+    stride += stride % 2
+    if bpp == 8:
+        packed = np.zeros((h, nplanes, stride), dtype=np.uint8)
+        packed[:, :, :w] = planes
+        return packed, stride
+    bits = (planes[..., None] >> np.arange(bpp - 1, -1, -1)) & 1
+    bits = bits.reshape(h, nplanes, w * bpp).astype(np.uint8)
+    padded = np.zeros((h, nplanes, stride * 8), dtype=np.uint8)
+    padded[:, :, :w * bpp] = bits
+    return np.packbits(padded, axis=2), stride
+
+
+def encode(planes, bpp, palette=None, ega=None):
+    """Build a PCX file from (H, NPlanes, W) plane values."""
+    h, nplanes, w = planes.shape
+    packed, stride = _pack_lines(planes, bpp)
+    header = bytearray(128)
+    header[0:4] = bytes((10, 5, 1, bpp))
+    header[8:10] = (w - 1).to_bytes(2, 'little')
+    header[10:12] = (h - 1).to_bytes(2, 'little')
+    if ega is not None:
+        header[16:64] = ega.tobytes()
+    header[65] = nplanes
+    header[66:68] = stride.to_bytes(2, 'little')
+    header[68:70] = (1).to_bytes(2, 'little')
+    body = b''.join(_rle(packed[y].tobytes()) for y in range(h))
+    tail = b'\x0c' + palette.tobytes() if palette is not None else b''
+    return bytes(header) + body + tail
+
+
+def make_variant(bpp, nplanes, width, height, rng):
+    """Return (file bytes, expected RGB array) for one variant."""
+    if (bpp, nplanes) == (8, 3):
+        rgb = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        rgb[:, : width // 2] //= 64  # long runs as well as noise
+        return encode(rgb.transpose(0, 2, 1), 8), rgb
+    levels = 1 << (bpp * nplanes)
+    idx = rng.integers(0, levels, (height, width), dtype=np.uint8)
+    idx[: height // 2, : width // 3] = levels - 1
+    palette = rng.integers(0, 256, (256, 3), dtype=np.uint8)
+    ega = palette[:16]
+    if (bpp, nplanes) == (1, 1):
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        palette[1] = 255
+    planes = np.stack([(idx >> (p * bpp)) & ((1 << bpp) - 1) for p in range(nplanes)], axis=1)
+    data = encode(planes.astype(np.uint8), bpp,
+                  palette if bpp == 8 else None, ega if bpp != 8 else None)
+    return data, palette[idx]
+
+
+def main():
+    rng = np.random.default_rng(1)
+    failures = 0
+    for bpp, nplanes in sorted(SUPPORTED_FORMATS):
+        for width, height in ((64, 48), (37, 5), (1, 1), (2, 1)):
+            data, expected = make_variant(bpp, nplanes, width, height, rng)
+            ours = PcxImage.from_bytes(data).rgb
+            checks = [("source", np.array_equal(ours, expected))]
+            # Pillow's RGB;L unpacker ignores scanline padding, so odd-width
+            # 24-bit files are only checked against the source pixels
+            if (bpp, nplanes) in PILLOW_FORMATS and not (nplanes == 3 and width % 2):
+                theirs = np.asarray(Image.open(io.BytesIO(data)).convert('RGB'))
+                checks.append(("pillow", np.array_equal(ours, theirs)))
+            status = ", ".join(f"{name} {'ok' if ok else 'MISMATCH'}" for name, ok in checks)
+            failures += sum(not ok for _, ok in checks)
+            print(f"{bpp}-bit x {nplanes} plane(s) {width}x{height}: {status}")
+    print("all variants match" if not failures else f"{failures} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
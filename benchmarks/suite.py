@@ -0,0 +1,257 @@
+"""Benchmark suite and performance regression harness.
+
+Times decoding (decompress_rle, PcxImage.open), every FILTERS entry at several
+kernel sizes, the point operations, global and adaptive equalization, the
+pyramid behind the zoomable view and the histogram renderers on
+images/Boat.pcx, images/Lena_256.pcx and generated images, and reports
+best/median time, throughput and peak traced memory as JSON.
+
+Run from the repository root:
+    python -m benchmarks.suite -o results.json                  # 256² and 1024² inputs
+    python -m benchmarks.suite --sizes 256,1024,4096,8192 -o big.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.2
+
+With --baseline, every case more than --threshold slower (or using more than
+--threshold more peak memory) than the baseline is reported and the exit
+status is 1. Peak memory comes from tracemalloc in one extra call, so it
+covers NumPy buffers and Python objects but not Pillow's internal storage.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.bench_rle import make_synthetic
+from filters.registry import FILTERS
+from histogram_equalization import adaptive_equalize_image, equalize_image, histogram_equalization
+from histogram_plot import render_histogram, render_histograms
+from image_processing import (
+    create_gamma_image,
+    create_grayscale_image,
+    create_histogram,
+    create_negative_image,
+    create_threshold_image,
+)
+from pcx_reader import PcxImage, decompress_rle
+from pyramid import ImagePyramid
+
+SAMPLE_FILES = ("images/Boat.pcx", "images/Lena_256.pcx")
+DEFAULT_SIZES = (256, 1024)
+DEFAULT_KERNELS = (3, 7, 15, 31)
+
+
+class BenchInput:
+    """One benchmark image: its PCX file plus decoded RGB and grayscale versions."""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.file_bytes = os.path.getsize(path)
+        self.rgb = PcxImage.open(path).to_image()
+        self.gray = create_grayscale_image(self.rgb)
+        self.hist = np.bincount(np.asarray(self.gray).ravel(), minlength=256)
+        self.pixels = self.gray.width * self.gray.height
+        self._pyramid = None
+
+    @property
+    def pyramid(self):
+        if self._pyramid is None:
+            self._pyramid = ImagePyramid.from_image(self.rgb)
+        return self._pyramid
+
+
+def _cases(kernels):
+    """Yield (case name, kind, fn(input)); kind 'decode' also reports MB/s of file."""
+    yield "decode/decompress_rle", "decode", lambda inp: decompress_rle(inp.path)
+    yield "decode/PcxImage.open", "decode", lambda inp: PcxImage.open(inp.path)
+
+    for name, spec in FILTERS.items():
+        takes_kernel = any(p[0] == "kernel_size" for p in spec["params"])
+        defaults = {p[0]: p[2] for p in spec["params"]}
+        for k in (kernels if takes_kernel else (None,)):
+            params = dict(defaults, **({"kernel_size": k} if k else {}))
+            label = f"filter/{name}" + (f" k={k}" if k else "")
+            yield label, "image", lambda inp, fn=spec["fn"], params=params: fn(inp.gray, **params)
+
+    yield "point/grayscale", "image", lambda inp: create_grayscale_image(inp.rgb)
+    yield "point/negative", "image", lambda inp: create_negative_image(inp.gray)
+    yield "point/threshold", "image", lambda inp: create_threshold_image(inp.gray, 128)
+    yield "point/gamma", "image", lambda inp: create_gamma_image(inp.gray, 0.5)
+
+    yield "equalize/equalize_image", "image", lambda inp: equalize_image(inp.gray)
+    yield "equalize/histogram_equalization", "image", lambda inp: histogram_equalization(inp.gray)
+    yield "equalize/clahe", "image", lambda inp: adaptive_equalize_image(inp.gray)
+
+    # Zoomable view: one-time pyramid build, then a 400x400 viewport per frame
+    yield "view/build_pyramid", "image", lambda inp: ImagePyramid.from_image(inp.rgb)
+    yield "view/render_viewport", "image", lambda inp: inp.pyramid.render(
+        inp.rgb.width / 4, inp.rgb.height / 4, 0.37, (400, 400)
+    )
+
+    # Renderer cost does not depend on the image, only on the output size
+    yield "histogram/create_histogram", "render", lambda inp: create_histogram(None, "red", inp.hist, (250, 180))
+    yield "histogram/render_histogram", "render", lambda inp: render_histogram(inp.hist, "gray", (400, 300))
+    yield "histogram/render_histograms", "render", lambda inp: render_histograms(
+        [inp.hist, inp.hist], ["gray", "green"], size=(800, 400)
+    )
+
+
+def measure(fn, repeat=5, budget=2.0, memory=True):
+    """
+    Time fn() up to `repeat` times, stopping early once `budget` seconds are
+    spent; then measure its traced peak memory in one more call.
+    """
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        if sum(times) > budget:
+            break
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {
+        "best_s": min(times),
+        "median_s": statistics.median(times),
+        "runs": len(times),
+        "peak_bytes": peak,
+    }
+
+
+def _inputs(sizes, tmp):
+    for path in SAMPLE_FILES:
+        if os.path.exists(path):
+            yield BenchInput(os.path.splitext(os.path.basename(path))[0], path)
+    for side in sizes:
+        path = os.path.join(tmp, f"generated_{side}.pcx")
+        make_synthetic(path, side)
+        yield BenchInput(f"generated {side}x{side}", path)
+
+
+def run_suite(sizes=DEFAULT_SIZES, kernels=DEFAULT_KERNELS, repeat=5, budget=2.0,
+              memory=True, match=None, log=print):
+    """Run every case on every input; returns the JSON-serializable report."""
+    pattern = re.compile(match) if match else None
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for inp in _inputs(sizes, tmp):
+            for name, kind, fn in _cases(kernels):
+                if pattern and not pattern.search(f"{name} {inp.name}"):
+                    continue
+                if kind == "render" and any(r["case"] == name for r in results):
+                    continue  # image-independent: measured once
+                stats = measure(lambda: fn(inp), repeat, budget, memory)
+                record = {"case": name, "image": inp.name if kind != "render" else "-",
+                          "pixels": inp.pixels if kind != "render" else None, **stats}
+                if kind != "render":
+                    record["mpix_per_s"] = inp.pixels / 1e6 / stats["best_s"]
+                if kind == "decode":
+                    record["mb_per_s"] = inp.file_bytes / 1e6 / stats["best_s"]
+                results.append(record)
+                log(_format(record))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pillow": Image.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": list(sizes),
+            "kernels": list(kernels),
+        },
+        "results": results,
+    }
+
+
+def _format(record, extra=""):
+    peak = record.get("peak_bytes")
+    peak_text = f"{peak / 1e6:9.1f} MB" if peak is not None else f"{'-':>12}"
+    rate = record.get("mpix_per_s")
+    rate_text = f"{rate:9.1f} MP/s" if rate is not None else f"{'':>14}"
+    return (f"{record['case']:<40}{record['image']:<22}{record['best_s'] * 1e3:10.2f} ms"
+            f"{rate_text}{peak_text}{extra}")
+
+
+def compare(report, baseline, threshold=0.2, log=print):
+    """
+    Compare a report with a baseline report. Returns the list of regressions:
+    (case, image, metric, ratio) for time or peak memory above 1 + threshold.
+    """
+    base = {(r["case"], r["image"]): r for r in baseline["results"]}
+    regressions = []
+    for record in report["results"]:
+        ref = base.get((record["case"], record["image"]))
+        if ref is None:
+            continue
+        ratio = record["best_s"] / ref["best_s"] if ref["best_s"] else 1.0
+        flags = []
+        if ratio > 1 + threshold:
+            regressions.append((record["case"], record["image"], "time", ratio))
+            flags.append("SLOWER")
+        if record.get("peak_bytes") and ref.get("peak_bytes"):
+            mem_ratio = record["peak_bytes"] / ref["peak_bytes"]
+            if mem_ratio > 1 + threshold:
+                regressions.append((record["case"], record["image"], "memory", mem_ratio))
+                flags.append(f"MEMORY x{mem_ratio:.2f}")
+        log(_format(record, f"   x{ratio:5.2f} vs baseline {' '.join(flags)}"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.suite", description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="generated image sides, comma-separated (e.g. 256,1024,4096,8192)")
+    parser.add_argument("--kernels", default=",".join(map(str, DEFAULT_KERNELS)),
+                        help="kernel sizes for filters that take one")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is reported)")
+    parser.add_argument("--budget", type=float, default=2.0, help="stop repeating a case after this many seconds")
+    parser.add_argument("--match", default=None, help="only run cases whose 'case image' matches this regex")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("-o", "--output", default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown (or memory growth) counted as a regression")
+    parser.add_argument("--save-baseline", default=None, help="also write the report as a new baseline")
+    args = parser.parse_args(argv)
+
+    sizes = tuple(int(s) for s in args.sizes.split(",") if s)
+    kernels = tuple(int(k) for k in args.kernels.split(",") if k)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = run_suite(sizes, kernels, args.repeat, args.budget, not args.no_memory, args.match,
+                       log=print if baseline is None else (lambda line: None))
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=1)
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold)
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        for case, image, metric, ratio in regressions:
+            print(f"  {case} [{image}]: {metric} x{ratio:.2f}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# Shared neighbourhood engine used by the smoothing, sharpening and gradient filters
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def separate_kernel(kernel: np.ndarray):
+    """
+    Split a rank-1 kernel into (column, row) 1-D weights with outer(column, row) == kernel.
+    Returns None when the kernel is not exactly separable.
+    """
+    kernel = np.asarray(kernel, dtype=np.float64)
+    if kernel.ndim != 2 or not kernel.any():
+        return None
+    i, j = np.unravel_index(np.argmax(np.abs(kernel)), kernel.shape)
+    row = kernel[i]
+    col = kernel[:, j] / kernel[i, j]
+    if not np.array_equal(np.outer(col, row), kernel):
+        return None
+    return col, row
+
+
+# From this length on, uniform 1-D weights are summed with a running sum
+_RUNNING_SUM_MIN = 8
+
+
+def _correlate_axis(padded: np.ndarray, weights: np.ndarray, axis: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    1-D correlation along one axis of an already padded array ('valid' output).
+    Long uniform weights use a running sum, whose cost does not grow with their
+    length; others accumulate one shifted window view per non-zero tap. Sums
+    are float64 unless out (e.g. a float32 scratch buffer) is given.
+    """
+    k = len(weights)
+    windows = sliding_window_view(padded, k, axis=axis)
+    if out is None:
+        out = np.empty(windows.shape[:-1], dtype=np.float64)
+    if k >= _RUNNING_SUM_MIN and np.all(weights == weights[0]):
+        sums = np.moveaxis(np.cumsum(padded, axis=axis, dtype=np.float64), axis, 0)
+        dest = np.moveaxis(out, axis, 0)
+        dest[0] = sums[k - 1]
+        np.subtract(sums[k:], sums[:-k], out=dest[1:], casting="unsafe")
+        if weights[0] != 1:
+            out *= weights[0]
+        return out
+    out[...] = 0
+    for tap, weight in enumerate(weights):
+        if not weight:
+            continue
+        if weight == 1:
+            np.add(out, windows[..., tap], out=out)
+        elif weight == -1:
+            np.subtract(out, windows[..., tap], out=out)
+        else:
+            out += out.dtype.type(weight) * windows[..., tap]
+    return out
+
+
+def correlate2d(img: np.ndarray, kernel: np.ndarray, mode: str = "reflect") -> np.ndarray:
+    """
+    Correlate a 2-D image with a kernel (no flip, as the filters have always done).
+    The image is padded by half the kernel size with np.pad(mode=mode), so the
+    output has the input's shape. Leading axes, e.g. the N of an (N, H, W)
+    stack of frames, are carried through: each frame is correlated on its own.
+    Separable kernels (box, Sobel, ...) run as two 1-D passes; others
+    accumulate one shifted window view per non-zero tap. Sums are accumulated
+    in float64, so integer images give exact results.
+    """
+    kernel = np.asarray(kernel, dtype=np.float64)
+    k_h, k_w = kernel.shape
+    pad_h, pad_w = k_h // 2, k_w // 2
+    pad = [(0, 0)] * (np.ndim(img) - 2) + [(pad_h, pad_h), (pad_w, pad_w)]
+    padded = np.pad(np.asarray(img, dtype=np.float64), pad, mode=mode)
+
+    factors = separate_kernel(kernel)
+    if factors is not None:
+        col, row = factors
+        return _correlate_axis(_correlate_axis(padded, row, axis=-1), col, axis=-2)
+
+    windows = sliding_window_view(padded, kernel.shape, axis=(-2, -1))
+    out = np.zeros(windows.shape[:-2], dtype=np.float64)
+    for (i, j), weight in np.ndenumerate(kernel):
+        if weight:
+            out += weight * windows[..., i, j]
+    return out
+
+
+def box_sum(img: np.ndarray, kernel_size: int, mode: str = "reflect") -> np.ndarray:
+    """
+    Sum over a kernel_size x kernel_size window using a summed-area table.
+    Cost per pixel is the same for any kernel size: two cumulative sums over the
+    padded image, then four lookups per output pixel. Integer images are summed
+    in int64 and others in float64, so integer-valued data gives exact sums.
+    """
+    img = np.asarray(img)
+    k = kernel_size
+    pad = k // 2
+    acc = np.int64 if np.issubdtype(img.dtype, np.integer) else np.float64
+    padded = np.pad(img, pad_width=pad, mode=mode)
+    table = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=acc)
+    np.cumsum(padded, axis=0, dtype=acc, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return table[k:, k:] - table[:-k, k:] - table[k:, :-k] + table[:-k, :-k]
+
+
+def box_mean(img: np.ndarray, kernel_size: int, mode: str = "reflect") -> np.ndarray:
+    """
+    Mean over a kernel_size x kernel_size window, as float32.
+    Matches window.mean() on float32 windows: the exact window sum divided by k².
+    """
+    sums = box_sum(img, kernel_size, mode=mode)
+    return (sums / (kernel_size * kernel_size)).astype(np.float32)
@@ -2,6 +2,22 @@
 from PIL import Image
 import numpy as np
 
+from filters.convolution import correlate2d
+from filters.linear import Linear, Stage
+
+# Sobel kernels for horizontal (Gx) and vertical (Gy) gradients
+SOBEL_X = np.array([
+    [-1, 0, 1],
+    [-2, 0, 2],
+    [-1, 0, 1]
+])
+
+SOBEL_Y = np.array([
+    [-1, -2, -1],
+    [0, 0, 0],
+    [1, 2, 1]
+])
+
 
 def gradient_sobel(image: Image.Image) -> Image.Image:
     """
@@ -9,41 +25,34 @@ def gradient_sobel(image: Image.Image) -> Image.Image:
     Computes the gradient magnitude using Sobel operators in x and y directions.
     Magnitude = sqrt(Gx² + Gy²)
     """
-    img_np = np.array(image, dtype=np.float32)
-    
-    # Sobel kernels for horizontal (Gx) and vertical (Gy) gradients
-    sobel_x = np.array([
-        [-1, 0, 1],
-        [-2, 0, 2],
-        [-1, 0, 1]
-    ])
-    
-    sobel_y = np.array([
-        [-1, -2, -1],
-        [0, 0, 0],
-        [1, 2, 1]
-    ])
-    
-    # Apply convolution
-    k_h, k_w = sobel_x.shape
-    pad_h, pad_w = k_h // 2, k_w // 2
-    padded = np.pad(img_np, pad_width=((pad_h, pad_h), (pad_w, pad_w)), mode="reflect")
-    
-    height, width = img_np.shape
-    gx = np.zeros_like(img_np, dtype=np.float32)
-    gy = np.zeros_like(img_np, dtype=np.float32)
-    
-    # Compute gradients in x and y directions
-    for y in range(height):
-        for x in range(width):
-            window = padded[y:y+k_h, x:x+k_w]
-            gx[y, x] = np.sum(window * sobel_x)
-            gy[y, x] = np.sum(window * sobel_y)
-    
+    return Image.fromarray(_sobel_array(np.array(image, dtype=np.float32)), mode="L")
+
+
+def gradient_sobel_stack(stack: np.ndarray) -> np.ndarray:
+    """Sobel magnitude of every frame of an (N, H, W) uint8 stack, in one call."""
+    return _sobel_array(np.asarray(stack, dtype=np.float32))
+
+
+def _sobel_array(img_np: np.ndarray) -> np.ndarray:
+    """uint8 Sobel magnitude over the last two axes of a float32 array."""
+    # Compute gradients in x and y directions (both kernels are separable)
+    gx = correlate2d(img_np, SOBEL_X).astype(np.float32)
+    gy = correlate2d(img_np, SOBEL_Y).astype(np.float32)
+
     # Compute gradient magnitude: sqrt(Gx² + Gy²)
     magnitude = np.sqrt(gx**2 + gy**2)
-    
+
     # Normalize to 0-255 range
-    magnitude = np.clip(magnitude, 0, 255).astype(np.uint8)
-    
-    return Image.fromarray(magnitude, mode="L")
\ No newline at end of file
+    return np.clip(magnitude, 0, 255).astype(np.uint8)
+
+
+def _magnitude(outputs):
+    gx, gy = outputs
+    np.multiply(gx, gx, out=gx)
+    gx += np.square(gy, out=gy)
+    return np.sqrt(gx, out=gx)
+
+
+def sobel_stage() -> Stage:
+    """Sobel magnitude as a chain stage; a preceding linear stage fuses into both gradients."""
+    return Stage("Sobel", (Linear.from_kernel(SOBEL_X), Linear.from_kernel(SOBEL_Y)), _magnitude)
@@ -0,0 +1,167 @@
+# Linear neighbourhood operators as sums of separable terms, and chain stages
+import numpy as np
+
+from filters.convolution import _correlate_axis, separate_kernel
+
+
+def _is_identity(col: np.ndarray, row: np.ndarray) -> bool:
+    return len(col) == 1 and len(row) == 1 and col[0] == 1 and row[0] == 1
+
+
+class Linear:
+    """
+    A linear, shift-invariant operator: the sum over terms (coef, den, col, row)
+    of coef / den * correlation with the separable kernel outer(col, row).
+    Keeping box sums unnormalized (integer weights, den = k²) keeps them exact.
+    Linear operators compose (then) and add (plus) without leaving this form,
+    so adjacent linear filters fuse into one operator.
+    """
+
+    __slots__ = ("terms",)
+
+    def __init__(self, terms):
+        merged = {}
+        for coef, den, col, row in terms:
+            col = np.asarray(col, dtype=np.float64)
+            row = np.asarray(row, dtype=np.float64)
+            key = (den, col.tobytes(), row.tobytes())
+            if key in merged:
+                merged[key] = (merged[key][0] + coef, den, col, row)
+            else:
+                merged[key] = (coef, den, col, row)
+        self.terms = tuple(term for term in merged.values() if term[0] != 0)
+
+    @classmethod
+    def identity(cls) -> "Linear":
+        return cls([(1.0, 1, [1.0], [1.0])])
+
+    @classmethod
+    def box(cls, kernel_size: int) -> "Linear":
+        """Mean over a kernel_size x kernel_size window."""
+        ones = np.ones(kernel_size)
+        return cls([(1.0, kernel_size * kernel_size, ones, ones)])
+
+    @classmethod
+    def from_kernel(cls, kernel) -> "Linear":
+        """Any odd-sized 2-D kernel: one term if separable, else one term per non-zero row."""
+        kernel = np.asarray(kernel, dtype=np.float64)
+        factors = separate_kernel(kernel)
+        if factors is not None:
+            return cls([(1.0, 1, *factors)])
+        terms = []
+        for i, row in enumerate(kernel):
+            if row.any():
+                col = np.zeros(kernel.shape[0])
+                col[i] = 1.0
+                terms.append((1.0, 1, col, row))
+        return cls(terms)
+
+    @property
+    def radius(self) -> int:
+        return max(max(len(col), len(row)) // 2 for _, _, col, row in self.terms)
+
+    def scaled(self, factor: float) -> "Linear":
+        return Linear([(coef * factor, den, col, row) for coef, den, col, row in self.terms])
+
+    def plus(self, other: "Linear") -> "Linear":
+        return Linear(self.terms + other.terms)
+
+    def then(self, other: "Linear") -> "Linear":
+        """Operator applying self first and other second."""
+        return Linear([
+            (c1 * c2, d1 * d2, np.convolve(col1, col2), np.convolve(row1, row2))
+            for c1, d1, col1, row1 in self.terms
+            for c2, d2, col2, row2 in other.terms
+        ])
+
+    def kernel(self) -> np.ndarray:
+        """Dense equivalent kernel (for inspection and tests)."""
+        size = 2 * self.radius + 1
+        dense = np.zeros((size, size))
+        for coef, den, col, row in self.terms:
+            oy, ox = self.radius - len(col) // 2, self.radius - len(row) // 2
+            dense[oy:oy + len(col), ox:ox + len(row)] += coef / den * np.outer(col, row)
+        return dense
+
+    def apply(self, img: np.ndarray, scratch: "Scratch", out_name: str, mode: str = "reflect") -> np.ndarray:
+        """
+        Apply to a float32 image padded with np.pad(mode=mode); the result is
+        the scratch buffer out_name.
+        """
+        height, width = img.shape
+        r = self.radius
+        padded = np.pad(img, r, mode=mode)
+        out = scratch.get(out_name, img.shape)
+        term_out = scratch.get("term", img.shape)
+        if not self.terms:
+            out[...] = 0
+        for i, (coef, den, col, row) in enumerate(self.terms):
+            if _is_identity(col, row):
+                value = img
+            else:
+                # Each term reads only the part of the padding its kernel reaches
+                x0, y0 = r - len(row) // 2, r - len(col) // 2
+                rows = scratch.get("rows", (height + 2 * r, width))
+                _correlate_axis(padded[:, x0:x0 + width + len(row) - 1], row, axis=1, out=rows)
+                value = _correlate_axis(rows[y0:y0 + height + len(col) - 1], col, axis=0, out=term_out)
+            if den != 1:
+                value = np.divide(value, den, out=term_out)
+            if i == 0:
+                np.multiply(value, coef, out=out)
+            elif coef == 1:
+                np.add(out, value, out=out)
+            elif coef == -1:
+                np.subtract(out, value, out=out)
+            else:
+                np.add(out, np.multiply(value, coef, out=term_out), out=out)
+        return out
+
+
+class Scratch:
+    """Named float32 work buffers, reused while their shape stays the same."""
+
+    __slots__ = ("_buffers",)
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name: str, shape) -> np.ndarray:
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != tuple(shape):
+            buf = np.empty(shape, dtype=np.float32)
+            self._buffers[name] = buf
+        return buf
+
+
+class Stage:
+    """
+    One step of a filter chain on float32 arrays.
+    Pure linear stages have one operator and no fn; stages with fn either
+    combine the outputs of their linear operators (fn(outputs)) or, with no
+    operators, transform the image directly (fn(img), with an fn.radius).
+    """
+
+    __slots__ = ("name", "linears", "fn")
+
+    def __init__(self, name: str, linears=(), fn=None):
+        self.name = name
+        self.linears = tuple(linears)
+        self.fn = fn
+
+    @classmethod
+    def linear(cls, name: str, operator: Linear) -> "Stage":
+        return cls(name, (operator,))
+
+    @property
+    def is_linear(self) -> bool:
+        return self.fn is None
+
+    @property
+    def radius(self) -> int:
+        if self.linears:
+            return max(op.radius for op in self.linears)
+        return getattr(self.fn, "radius", 0)
+
+    def after(self, prefix: Linear, name: str) -> "Stage":
+        """This stage with a linear prefix fused into each of its operators."""
+        return Stage(f"{name} + {self.name}", [prefix.then(op) for op in self.linears], self.fn)
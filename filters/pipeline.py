@@ -0,0 +1,81 @@
+# Composable filter chains over the FILTERS registry
+import threading
+
+import numpy as np
+from PIL import Image
+
+from filters.linear import Scratch
+from filters.registry import FILTERS
+
+
+def fuse_stages(stages):
+    """
+    Merge each linear stage into the stage after it when that stage is built
+    from linear operators: linear runs collapse into one operator, and a linear
+    stage before Sobel moves into both gradient kernels.
+    """
+    fused = []
+    for stage in stages:
+        prev = fused[-1] if fused else None
+        if prev is not None and prev.is_linear and stage.linears:
+            fused[-1] = stage.after(prev.linears[0], prev.name)
+        else:
+            fused.append(stage)
+    return fused
+
+
+class FilterChain:
+    """
+    A sequence of FILTERS entries, e.g. [("Median", {"kernel_size": 5}),
+    ("Unsharp Masking", {"kernel_size": 3}), ("Gradient (Sobel)", {})].
+    Intermediates stay float32 in scratch buffers reused across stages and
+    calls, and are clipped to uint8 only once at the end. Adjacent linear
+    stages are fused (see fuse_stages). A chain is called like a filter,
+    chain(image) -> 'L' image, and chain.halo is its total radius, so
+    TiledExecutor.run(chain, image, chain.halo) tiles it.
+    """
+
+    def __init__(self, ops):
+        self.ops = tuple((name, dict(params)) for name, params in ops)
+        if not self.ops:
+            raise ValueError("A filter chain needs at least one filter.")
+        for name, _ in self.ops:
+            if name not in FILTERS:
+                raise ValueError(f"Unknown filter '{name}'")
+        self.stages = fuse_stages([FILTERS[name]["stage"](**params) for name, params in self.ops])
+        self.halo = sum(stage.radius for stage in self.stages)
+        self._local = threading.local()
+
+    def __reduce__(self):
+        # Stages hold closures; rebuild from ops in worker processes
+        return FilterChain, (self.ops,)
+
+    def __repr__(self):
+        return " -> ".join(stage.name for stage in self.stages)
+
+    def _scratch(self) -> Scratch:
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = Scratch()
+        return scratch
+
+    def apply_array(self, img: np.ndarray) -> np.ndarray:
+        """Run the chain on a 2-D array; returns the unclipped float32 result (a scratch buffer)."""
+        scratch = self._scratch()
+        current = scratch.get("input", img.shape)
+        current[...] = img
+        for i, stage in enumerate(self.stages):
+            out_name = "ab"[i % 2]
+            if not stage.linears:
+                current = stage.fn(current)
+                continue
+            outputs = [
+                op.apply(current, scratch, out_name + (str(j) if j else ""))
+                for j, op in enumerate(stage.linears)
+            ]
+            current = outputs[0] if stage.fn is None else stage.fn(outputs)
+        return current
+
+    def __call__(self, image: Image.Image) -> Image.Image:
+        result = self.apply_array(np.asarray(image, dtype=np.float32))
+        return Image.fromarray(np.clip(result, 0, 255).astype(np.uint8), mode="L")
@@ -0,0 +1,65 @@
+# Registry of available filters, their parameter prompts and neighbourhood radius
+from filters.smoothing_filters import (
+    apply_average_filter,
+    apply_median_filter,
+    average_stage,
+    median_stage,
+)
+from filters.sharpening_filters import (
+    highpass_filtering_with_laplacian_operator,
+    unsharp_masking,
+    highboost_filtering,
+    laplacian_stage,
+    unsharp_stage,
+    highboost_stage,
+)
+from filters.gradient import gradient_sobel, sobel_stage
+
+
+def _kernel_radius(params):
+    return params.get("kernel_size", 3) // 2
+
+
+# "halo" gives the number of neighbouring rows one output row depends on;
+# "stage" builds the filter as a filters.pipeline chain stage from the same params
+FILTERS = {
+    "Averaging": {
+        "fn": apply_average_filter,
+        "stage": average_stage,
+        "params": [("kernel_size", "int", 3, {"min": 3, "odd": True})],
+        "halo": _kernel_radius,
+    },
+    "Median": {
+        "fn": apply_median_filter,
+        "stage": median_stage,
+        "params": [("kernel_size", "int", 3, {"min": 3, "odd": True})],
+        "halo": _kernel_radius,
+    },
+    "Laplacian (Highpass)": {
+        "fn": highpass_filtering_with_laplacian_operator,
+        "stage": laplacian_stage,
+        "params": [],  # No parameters needed
+        "halo": lambda params: 1,
+    },
+    "Unsharp Masking": {
+        "fn": unsharp_masking,
+        "stage": unsharp_stage,
+        "params": [("kernel_size", "int", 3, {"min": 3, "odd": True})],
+        "halo": _kernel_radius,
+    },
+    "Highboost": {
+        "fn": highboost_filtering,
+        "stage": highboost_stage,
+        "params": [
+            ("boost_factor", "float", 2.0, {"min": 1.0, "max": 3}),
+            ("kernel_size", "int", 3, {"min": 3, "odd": True}),
+        ],
+        "halo": _kernel_radius,
+    },
+    "Gradient (Sobel)": {
+        "fn": gradient_sobel,
+        "stage": sobel_stage,
+        "params": [],  # No parameters needed
+        "halo": lambda params: 1,
+    },
+}
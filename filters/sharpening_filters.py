@@ -1,6 +1,16 @@
 import numpy as np
 from PIL import Image
 
+from filters.convolution import box_mean, correlate2d
+from filters.linear import Linear, Stage
+
+# Laplacian kernel (4-neighbor version)
+LAPLACIAN_KERNEL = np.array([
+    [0, -1, 0],
+    [-1, 4, -1],
+    [0, -1, 0]
+])
+
 
 def highpass_filtering_with_laplacian_operator(image: Image.Image) -> Image.Image:
     """
@@ -9,25 +19,8 @@ def highpass_filtering_with_laplacian_operator(image: Image.Image) -> Image.Imag
     """
     img_np = np.array(image, dtype=np.float32)
     
-    # Laplacian kernel (4-neighbor version)
-    kernel = np.array([
-        [0, -1, 0],
-        [-1, 4, -1],
-        [0, -1, 0]
-    ])
-    
     # Apply kernel using convolution
-    k_h, k_w = kernel.shape
-    pad_h, pad_w = k_h // 2, k_w // 2
-    padded = np.pad(img_np, pad_width=((pad_h, pad_h), (pad_w, pad_w)), mode="reflect")
-    
-    height, width = img_np.shape
-    filtered = np.zeros_like(img_np, dtype=np.float32)
-    
-    for y in range(height):
-        for x in range(width):
-            window = padded[y:y+k_h, x:x+k_w]
-            filtered[y, x] = np.sum(window * kernel)
+    filtered = correlate2d(img_np, LAPLACIAN_KERNEL).astype(np.float32)
     
     # Add to original for sharpening: g(x,y) = f(x,y) + c * ∇²f
     result = img_np + filtered
@@ -44,15 +37,7 @@ def unsharp_masking(image: Image.Image, kernel_size: int = 3) -> Image.Image:
     img_np = np.array(image, dtype=np.float32)
     
     # Create blurred version (simple averaging)
-    k = kernel_size
-    pad = k // 2
-    padded = np.pad(img_np, pad_width=pad, mode="reflect")
-    blurred = np.zeros_like(img_np)
-    
-    for y in range(img_np.shape[0]):
-        for x in range(img_np.shape[1]):
-            window = padded[y:y+k, x:x+k]
-            blurred[y, x] = window.mean()
+    blurred = box_mean(img_np, kernel_size)
     
     # Unsharp masking: g(x,y) = f(x,y) + k * (f(x,y) - f_blur(x,y))
     # where k is the amplification parameter (set to 1.0 here)
@@ -68,18 +53,33 @@ def highboost_filtering(image: Image.Image, boost_factor: float = 2.0, kernel_si
     img_np = np.array(image, dtype=np.float32)
     
     # Create blurred version
-    k = kernel_size
-    pad = k // 2
-    padded = np.pad(img_np, pad_width=pad, mode="reflect")
-    blurred = np.zeros_like(img_np)
-    
-    for y in range(img_np.shape[0]):
-        for x in range(img_np.shape[1]):
-            window = padded[y:y+k, x:x+k]
-            blurred[y, x] = window.mean()
+    blurred = box_mean(img_np, kernel_size)
     
     # Highboost: g(x,y) = A * f(x,y) - (A-1) * f_blur(x,y)
     result = boost_factor * img_np - (boost_factor - 1.0) * blurred
     
     result = np.clip(result, 0, 255).astype(np.uint8)
-    return Image.fromarray(result, mode="L")
\ No newline at end of file
+    return Image.fromarray(result, mode="L")
+
+
+# Chain stages: the same filters as linear operators, before clipping
+
+def laplacian_stage() -> Stage:
+    """f + Laplacian(f)."""
+    return Stage.linear("Laplacian", Linear.identity().plus(Linear.from_kernel(LAPLACIAN_KERNEL)))
+
+
+def unsharp_stage(kernel_size: int = 3) -> Stage:
+    """2f - blur(f), i.e. f + (f - blur(f))."""
+    return Stage.linear(
+        f"Unsharp {kernel_size}",
+        Linear.identity().scaled(2.0).plus(Linear.box(kernel_size).scaled(-1.0)),
+    )
+
+
+def highboost_stage(boost_factor: float = 2.0, kernel_size: int = 3) -> Stage:
+    """A f - (A - 1) blur(f)."""
+    return Stage.linear(
+        f"Highboost {boost_factor} {kernel_size}",
+        Linear.identity().scaled(boost_factor).plus(Linear.box(kernel_size).scaled(-(boost_factor - 1.0))),
+    )
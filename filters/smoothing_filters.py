@@ -1,25 +1,23 @@
 import numpy as np
 from PIL import Image
 
+from filters.convolution import box_mean
+from filters.linear import Linear, Stage
+from filters.median import median_filter
 
-def apply_average_filter(image: Image.Image, kernel_size: int = 3) -> Image.Image:
-    """Apply an averaging (mean) filter to a grayscale image."""
+
+def _check_kernel_size(kernel_size: int):
     if kernel_size % 2 == 0 or kernel_size < 3:
         raise ValueError("kernel_size must be an odd integer >= 3")
 
-    img_np = np.array(image, dtype=np.float32)
 
-    k = kernel_size
-    pad = k // 2
-    padded = np.pad(img_np, pad_width=pad, mode="reflect")
+def apply_average_filter(image: Image.Image, kernel_size: int = 3) -> Image.Image:
+    """Apply an averaging (mean) filter to a grayscale image."""
+    _check_kernel_size(kernel_size)
 
-    height, width = img_np.shape
-    result = np.empty_like(img_np)
+    img_np = np.array(image, dtype=np.float32)
 
-    for y in range(height):
-        for x in range(width):
-            window = padded[y:y+k, x:x+k]
-            result[y, x] = window.mean()
+    result = box_mean(img_np, kernel_size)
 
     result = np.clip(result, 0, 255).astype(np.uint8)
     return Image.fromarray(result, mode="L")
@@ -27,26 +25,31 @@ def apply_average_filter(image: Image.Image, kernel_size: int = 3) -> Image.Imag
 
 def apply_median_filter(image: Image.Image, kernel_size: int = 3) -> Image.Image:
     """Apply a median filter to a grayscale image."""
-    if kernel_size % 2 == 0 or kernel_size < 3:
-        raise ValueError("kernel_size must be an odd integer >= 3")
+    _check_kernel_size(kernel_size)
 
     img_np = np.array(image, dtype=np.uint8)
 
-    pad = kernel_size // 2
-    padded = np.pad(img_np, pad_width=pad, mode="reflect")
+    result = median_filter(img_np, kernel_size)
+
+    return Image.fromarray(result, mode="L")
 
-    height, width = img_np.shape
-    result = np.empty_like(img_np)
 
-    for y in range(height):
-        y0 = y
-        y1 = y + kernel_size
-        for x in range(width):
-            x0 = x
-            x1 = x + kernel_size
-            window = padded[y0:y1, x0:x1]
-            result[y, x] = np.median(window)
+def average_stage(kernel_size: int = 3) -> Stage:
+    """Averaging filter as a linear chain stage."""
+    _check_kernel_size(kernel_size)
+    return Stage.linear(f"Averaging {kernel_size}", Linear.box(kernel_size))
 
-    return Image.fromarray(result, mode="L")
 
+def median_stage(kernel_size: int = 3) -> Stage:
+    """
+    Median filter as a chain stage. The median works on uint8 levels, so its
+    input is clipped and truncated exactly as a standalone filter's output is.
+    """
+    _check_kernel_size(kernel_size)
+
+    def run(img: np.ndarray) -> np.ndarray:
+        levels = np.clip(img, 0, 255).astype(np.uint8)
+        return median_filter(levels, kernel_size).astype(np.float32)
 
+    run.radius = kernel_size // 2
+    return Stage(f"Median {kernel_size}", fn=run)
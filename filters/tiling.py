@@ -0,0 +1,190 @@
+# Tiled multi-core execution of neighbourhood filters
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+
+from filters.registry import FILTERS
+from profiling import span
+
+# Minimum number of bands when a progress callback is given
+PROGRESS_STEPS = 16
+
+
+def split_bands(height: int, tile_rows: int, halo: int):
+    """
+    Yield (y0, y1, s0, s1) row bands: output rows y0..y1 are computed from the
+    source rows s0..s1, which extend the band by `halo` rows on each side.
+    """
+    for y0 in range(0, height, tile_rows):
+        y1 = min(height, y0 + tile_rows)
+        yield y0, y1, max(0, y0 - halo), min(height, y1 + halo)
+
+
+def _filter_band(fn, band: np.ndarray, y0: int, y1: int, s0: int, params: dict) -> np.ndarray:
+    """Run fn on one band with its halo and keep only the band's own rows."""
+    with span("filter band", rows=y1 - y0):
+        out = np.asarray(fn(Image.fromarray(band, mode="L"), **params))
+    return out[y0 - s0:y1 - s0]
+
+
+def _filter_band_shared(fn, in_name, out_name, shape, y0, y1, s0, s1, params):
+    """Process-pool worker: read and write the band through shared memory."""
+    src_shm = shared_memory.SharedMemory(name=in_name)
+    dst_shm = shared_memory.SharedMemory(name=out_name)
+    try:
+        src = np.ndarray(shape, dtype=np.uint8, buffer=src_shm.buf)
+        dst = np.ndarray(shape, dtype=np.uint8, buffer=dst_shm.buf)
+        dst[y0:y1] = _filter_band(fn, src[s0:s1].copy(), y0, y1, s0, params)
+        del src, dst
+    finally:
+        src_shm.close()
+        dst_shm.close()
+
+
+class TiledExecutor:
+    """
+    Run a filter over row bands of a grayscale image in parallel.
+    Each band carries a halo of neighbouring rows at least as deep as the
+    filter's radius, so the stitched result is identical to a single call.
+    Threads are the default (the filters spend their time in NumPy, which
+    releases the GIL); use_processes=True uses a process pool over shared memory.
+    With a ResultCache, run_filter returns cached results for an image and
+    parameters it has already filtered.
+    """
+
+    def __init__(self, workers: int | None = None, tile_rows: int | None = None,
+                 use_processes: bool = False, cache=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.tile_rows = tile_rows
+        self.use_processes = use_processes
+        self.cache = cache
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            pool_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._pool = pool_cls(max_workers=self.workers)
+        return self._pool
+
+    def _rows_per_tile(self, height: int, halo: int, report: bool = False) -> int:
+        if self.tile_rows:
+            return self.tile_rows
+        if self.workers == 1 and not report:
+            return height
+        # About two bands per worker (at least PROGRESS_STEPS when reporting
+        # progress), each at least as tall as its halos
+        bands = max(2 * self.workers, PROGRESS_STEPS if report else 0)
+        return max(2 * halo, 32, math.ceil(height / bands))
+
+    def run(self, fn, image: Image.Image, halo: int, *, progress=None, token=None,
+            **params) -> Image.Image:
+        """
+        Apply fn(image, **params) band by band; fn reads at most `halo` rows away.
+        progress(done, total) is called as bands complete. token.check() is
+        called between bands and may raise to abort the run.
+        """
+        with span(f"filter {getattr(fn, '__name__', fn)}", halo=halo, **params):
+            return self._run(fn, image, halo, progress, token, params)
+
+    def _run(self, fn, image, halo, progress, token, params):
+        src = np.asarray(image)
+        if src.ndim != 2:
+            raise ValueError("Tiled filtering needs a single-channel image.")
+        height = src.shape[0]
+        tile_rows = self._rows_per_tile(height, halo, progress is not None)
+        if tile_rows >= height:
+            return fn(image, **params)
+        bands = list(split_bands(height, tile_rows, halo))
+        if self.workers == 1:
+            # Bands in the calling thread, so progress and cancellation still apply
+            out = np.empty_like(src)
+            for done, (y0, y1, s0, s1) in enumerate(bands, 1):
+                if token is not None:
+                    token.check()
+                out[y0:y1] = _filter_band(fn, src[s0:s1], y0, y1, s0, params)
+                if progress is not None:
+                    progress(done, len(bands))
+        elif self.use_processes:
+            out = self._run_processes(fn, src, bands, params, progress, token)
+        else:
+            out = np.empty_like(src)
+            pool = self._get_pool()
+            futures = {
+                pool.submit(_filter_band, fn, src[s0:s1], y0, y1, s0, params): (y0, y1)
+                for y0, y1, s0, s1 in bands
+            }
+            self._collect(futures, progress, token, out)
+        return Image.fromarray(out, mode="L")
+
+    @staticmethod
+    def _collect(futures, progress, token, out=None):
+        """Wait for band futures, storing results into out and reporting progress."""
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                if token is not None:
+                    token.check()
+                result = future.result()
+                if out is not None:
+                    y0, y1 = futures[future]
+                    out[y0:y1] = result
+                if progress is not None:
+                    progress(done, len(futures))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def _run_processes(self, fn, src: np.ndarray, bands, params, progress=None,
+                       token=None) -> np.ndarray:
+        in_shm = shared_memory.SharedMemory(create=True, size=max(1, src.nbytes))
+        out_shm = shared_memory.SharedMemory(create=True, size=max(1, src.nbytes))
+        try:
+            np.ndarray(src.shape, dtype=np.uint8, buffer=in_shm.buf)[:] = src
+            pool = self._get_pool()
+            futures = {
+                pool.submit(_filter_band_shared, fn, in_shm.name, out_shm.name,
+                            src.shape, y0, y1, s0, s1, params): (y0, y1)
+                for y0, y1, s0, s1 in bands
+            }
+            self._collect(futures, progress, token)
+            return np.ndarray(src.shape, dtype=np.uint8, buffer=out_shm.buf).copy()
+        finally:
+            for shm in (in_shm, out_shm):
+                shm.close()
+                shm.unlink()
+
+    def run_filter(self, name: str, image: Image.Image, *, progress=None, token=None,
+                   **params) -> Image.Image:
+        """Run a FILTERS registry entry by name with its own halo."""
+        spec = FILTERS[name]
+        if self.cache is None:
+            return self.run(spec["fn"], image, spec["halo"](params), progress=progress,
+                            token=token, **params)
+        key = self.cache.key("filter", name, image, params)
+        return self.cache.get_or_compute(key, lambda: self.run(
+            spec["fn"], image, spec["halo"](params), progress=progress, token=token, **params
+        ))
+
+    def run_chain(self, chain, image: Image.Image, *, progress=None, token=None) -> Image.Image:
+        """Run a filters.pipeline.FilterChain with the chain's total halo."""
+        if self.cache is None:
+            return self.run(chain, image, chain.halo, progress=progress, token=token)
+        key = self.cache.key("chain", chain.ops, image)
+        return self.cache.get_or_compute(key, lambda: self.run(
+            chain, image, chain.halo, progress=progress, token=token
+        ))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -1,52 +1,165 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-import matplotlib.pyplot as plt
 from PIL import Image
-import io
 
+from histogram_plot import render_histograms
+from profiling import traced
+
+# Images with fewer pixels run CLAHE in the calling thread
+_PARALLEL_MIN_PIXELS = 1 << 20
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """
+    Shared thread pool for CLAHE tile rows and bands, created on first use
+    in each process (a pool inherited through fork has no threads).
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="clahe")
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _cdf_luts(hists: np.ndarray) -> np.ndarray:
+    """
+    Equalization tables for histograms along the last axis: each CDF is
+    stretched so its minimum maps to 0 and its maximum to 255. A constant CDF
+    (every pixel 0) maps to the identity instead of dividing by zero.
+    """
+    cdf = hists.cumsum(axis=-1)
+    lo = cdf.min(axis=-1, keepdims=True)
+    span = cdf.max(axis=-1, keepdims=True) - lo
+    flat = span == 0
+    luts = (cdf - lo) * 255 / np.where(flat, 1, span)
+    return np.where(flat, np.arange(256), luts).astype(np.uint8)
+
+
+@traced("equalize")
+def _equalize_array(img_array: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return (equalized array, original histogram) for a uint8 array."""
+    hist = np.bincount(img_array.ravel(), minlength=256)
+    return _cdf_luts(hist)[img_array], hist
+
+
+def _tile_luts(padded: np.ndarray, grid: tuple[int, int], clip_limit: float,
+               r0: int, r1: int) -> np.ndarray:
+    """
+    Clipped-histogram equalization tables for tile rows r0..r1, shape
+    (r1 - r0, columns, 256): one bincount over all their tiles, offset by tile.
+    """
+    rows, cols = grid
+    th, tw = padded.shape[0] // rows, padded.shape[1] // cols
+    n = (r1 - r0) * cols
+    tiles = padded[r0 * th:r1 * th].reshape(r1 - r0, th, cols, tw).transpose(0, 2, 1, 3)
+    offsets = (np.arange(n, dtype=np.intp) * 256).reshape(r1 - r0, cols, 1, 1)
+    hists = np.bincount((tiles + offsets).ravel(), minlength=n * 256).reshape(r1 - r0, cols, 256)
+    if clip_limit > 0:
+        # Counts above the limit are spread evenly over all bins
+        limit = max(1.0, clip_limit * th * tw / 256)
+        excess = np.maximum(hists - limit, 0).sum(axis=-1, keepdims=True)
+        hists = np.minimum(hists, limit) + excess / 256
+    return _cdf_luts(hists)
+
+
+def _tile_weights(n: int, tile: int, count: int):
+    """For n pixels along an axis: the two nearest tile centers and the weight of the second."""
+    pos = (np.arange(n) + 0.5) / tile - 0.5
+    first = np.clip(np.floor(pos).astype(np.intp), 0, count - 1)
+    second = np.minimum(first + 1, count - 1)
+    weight = np.clip(pos - first, 0, 1).astype(np.float32)
+    return first, second, weight
+
+
+def _interpolate_rows(img_array, luts, tile_size, y0, y1, out):
+    """Bilinear blend of the four nearest tiles' tables for output rows y0..y1."""
+    rows, cols = luts.shape[:2]
+    th, tw = tile_size
+    table = luts.reshape(-1).astype(np.float32)
+    ty0, ty1, wy = _tile_weights(img_array.shape[0], th, rows)
+    tx0, tx1, wx = _tile_weights(img_array.shape[1], tw, cols)
+    values = img_array[y0:y1]
+    top, bottom = (ty[y0:y1, None] * (cols * 256) for ty in (ty0, ty1))
+    left, right = tx0 * 256 + values, tx1 * 256 + values
+    wy = wy[y0:y1, None]
+    upper = table[top + left] * (1 - wx) + table[top + right] * wx
+    lower = table[bottom + left] * (1 - wx) + table[bottom + right] * wx
+    blended = upper * (1 - wy) + lower * wy
+    out[y0:y1] = blended + 0.5
+
+
+@traced("clahe")
+def _clahe_array(img_array: np.ndarray, tiles=8, clip_limit: float = 2.0,
+                 workers: int | None = None) -> np.ndarray:
+    """
+    Contrast-limited adaptive histogram equalization of a uint8 array.
+    tiles is the grid size (n or (rows, columns)); clip_limit caps each tile's
+    histogram bins at clip_limit times the mean bin count (<= 0: no clipping).
+    One tile without clipping is global equalization.
+    """
+    rows, cols = (tiles, tiles) if isinstance(tiles, int) else tiles
+    height, width = img_array.shape
+    rows, cols = max(1, min(rows, height)), max(1, min(cols, width))
+    if rows == cols == 1 and clip_limit <= 0:
+        return _equalize_array(img_array)[0]
+    th, tw = -(-height // rows), -(-width // cols)
+    padded = img_array
+    if (rows * th, cols * tw) != img_array.shape:
+        padded = np.pad(img_array, ((0, rows * th - height), (0, cols * tw - width)), mode="symmetric")
+
+    workers = workers or os.cpu_count() or 1
+    parallel = workers > 1 and img_array.size >= _PARALLEL_MIN_PIXELS
+    run = _get_pool().map if parallel else map
+
+    # Tables per tile row, then interpolated output per band of rows
+    luts = np.concatenate(list(run(
+        lambda r: _tile_luts(padded, (rows, cols), clip_limit, r, r + 1), range(rows)
+    )))
+    out = np.empty_like(img_array)
+    step = max(16, -(-height // (4 * workers))) if parallel else height
+    list(run(
+        lambda y0: _interpolate_rows(img_array, luts, (th, tw), y0, min(height, y0 + step), out),
+        range(0, height, step),
+    ))
+    return out
+
+
+def equalize_image(gray_img: Image.Image) -> Image.Image:
+    """Histogram-equalize a grayscale image without rendering the comparison plot."""
+    equalized_array, _ = _equalize_array(np.array(gray_img))
+    return Image.fromarray(equalized_array, mode='L')
+
+
+def adaptive_equalize_image(gray_img: Image.Image, tiles=8, clip_limit: float = 2.0) -> Image.Image:
+    """Tiled contrast-limited adaptive histogram equalization (CLAHE) of a grayscale image."""
+    return Image.fromarray(_clahe_array(np.asarray(gray_img), tiles, clip_limit), mode='L')
+
+
+@traced("histogram equalization")
 def histogram_equalization(gray_img: Image.Image) -> tuple[Image.Image, Image.Image]:
     """
     Apply histogram equalization to a grayscale image.
     Returns: (equalized_image, histogram_comparison_image)
     """
     img_array = np.array(gray_img)
-    
-    # Compute histogram
-    hist = np.bincount(img_array.ravel(), minlength=256)
-    
-    # Calculate CDF
-    cdf = hist.cumsum()
-    cdf_normalized = (cdf - cdf.min()) * 255 / (cdf.max() - cdf.min())
-    cdf_normalized = cdf_normalized.astype(np.uint8)
-    
-    # Create equalized image
-    equalized_array = cdf_normalized[img_array]
+    equalized_array, hist = _equalize_array(img_array)
     equalized_img = Image.fromarray(equalized_array, mode='L')
     
     # Calculate equalized histogram
     hist_eq = np.bincount(equalized_array.ravel(), minlength=256)
     
     # Create histogram comparison image
-    plt.figure(figsize=(8, 4))
-    
-    plt.subplot(1, 2, 1)
-    plt.bar(range(256), hist, color='gray', width=1.0)
-    plt.title('Original Histogram')
-    plt.xlabel('Intensity')
-    plt.ylabel('Frequency')
-    
-    plt.subplot(1, 2, 2)
-    plt.bar(range(256), hist_eq, color='green', width=1.0)
-    plt.title('Equalized Histogram')
-    plt.xlabel('Intensity')
-    plt.ylabel('Frequency')
-    
-    plt.tight_layout()
-    
-    # Convert plot to PIL Image
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    buf.seek(0)
-    hist_img = Image.open(buf)
+    hist_img = render_histograms(
+        [hist, hist_eq], ['gray', 'green'],
+        ['Original Histogram', 'Equalized Histogram'], size=(800, 400),
+    )
     
-    return equalized_img, hist_img
\ No newline at end of file
+    return equalized_img, hist_img
@@ -0,0 +1,143 @@
+# Raster histogram renderer.
+# Bars are drawn straight into a NumPy buffer and the axes and labels with
+# ImageDraw, so no plotting library is imported and no PNG round-trip is made.
+# matplotlib is only used, if installed, by export_histogram for
+# publication-quality output.
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+from profiling import traced
+
+BACKGROUND = (255, 255, 255)
+AXIS_COLOR = (0, 0, 0)
+X_TICKS = (0, 64, 128, 192, 255)
+
+_FONT_CACHE = {}
+
+
+def _font(size):
+    if size not in _FONT_CACHE:
+        try:
+            _FONT_CACHE[size] = ImageFont.load_default(size=size)
+        except (TypeError, ImportError):  # Pillow without FreeType: fixed bitmap font
+            _FONT_CACHE[size] = ImageFont.load_default()
+    return _FONT_CACHE[size]
+
+
+def _format_count(value):
+    """Compact tick label: 950, 12k, 3.4M."""
+    if value >= 1e6:
+        return f"{value / 1e6:.1f}M"
+    if value >= 1e4:
+        return f"{value / 1e3:.0f}k"
+    return f"{int(value)}"
+
+
+def _text_size(draw, text, font):
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    return right - left, bottom - top
+
+
+def _draw_panel(canvas, box, hist, color, title, xlabel, ylabel, font):
+    """Draw one histogram with axes into the (x0, y0, x1, y1) box of an RGB canvas."""
+    x0, y0, x1, y1 = box
+    draw = ImageDraw.Draw(canvas)
+    # Line height with ascenders and descenders
+    _, line_h = _text_size(draw, "Ag", font)
+
+    # Plot area inside the margins left for labels and ticks
+    ymax = max(float(np.max(hist)) * 1.1, 1.0)
+    tick_w, _ = _text_size(draw, _format_count(ymax), font)
+    left = x0 + tick_w + 10 + (line_h + 6 if ylabel else 0)
+    top = y0 + (line_h + 8 if title else 6)
+    right = x1 - 8
+    bottom = y1 - line_h - 8 - (line_h + 4 if xlabel else 0)
+    plot_w, plot_h = right - left, bottom - top
+    if plot_w < 8 or plot_h < 8:
+        raise ValueError(f"Histogram panel {x1 - x0}x{y1 - y0} is too small")
+
+    # Bars: each pixel column shows the tallest of the bins under it, filled
+    # from the baseline up. Narrower than 256 columns, a column spans several
+    # bins; wider, reduceat of a repeated start is just that start's bin.
+    hist = np.asarray(hist, dtype=np.float64)
+    starts = (np.arange(plot_w) * 256) // plot_w
+    heights = np.rint(np.maximum.reduceat(hist, starts) / ymax * plot_h).astype(np.int64)
+    rows = np.arange(plot_h)[:, None]
+    mask = rows >= plot_h - heights[None, :]
+    area = np.asarray(canvas)[top:bottom, left:right].copy()
+    area[mask] = ImageColor.getrgb(color)
+    canvas.paste(Image.fromarray(area, mode="RGB"), (left, top))
+
+    # Axes, ticks and labels
+    draw.line([(left - 1, top), (left - 1, bottom), (right, bottom)], fill=AXIS_COLOR)
+    for level in X_TICKS:
+        x = left + (level * plot_w) // 256 + plot_w // 512
+        draw.line([(x, bottom), (x, bottom + 3)], fill=AXIS_COLOR)
+        text = str(level)
+        text_w, _ = _text_size(draw, text, font)
+        draw.text((x - text_w // 2, bottom + 5), text, fill=AXIS_COLOR, font=font)
+    for value in (0, ymax / 2, ymax):
+        y = bottom - int(round(value / ymax * plot_h))
+        draw.line([(left - 4, y), (left - 1, y)], fill=AXIS_COLOR)
+        text = _format_count(value)
+        text_w, text_h = _text_size(draw, text, font)
+        draw.text((left - 6 - text_w, y - text_h // 2 - 1), text, fill=AXIS_COLOR, font=font)
+    if title:
+        text_w, _ = _text_size(draw, title, font)
+        draw.text(((left + right - text_w) // 2, y0 + 3), title, fill=AXIS_COLOR, font=font)
+    if xlabel:
+        text_w, _ = _text_size(draw, xlabel, font)
+        draw.text(((left + right - text_w) // 2, y1 - line_h - 5), xlabel, fill=AXIS_COLOR, font=font)
+    if ylabel:
+        text_w, text_h = _text_size(draw, ylabel, font)
+        label = Image.new("RGB", (text_w + 2, line_h + 2), BACKGROUND)
+        ImageDraw.Draw(label).text((0, 0), ylabel, fill=AXIS_COLOR, font=font)
+        label = label.rotate(90, expand=True)
+        canvas.paste(label, (x0 + 2, (top + bottom - label.height) // 2))
+
+
+@traced("render histograms")
+def render_histograms(hists, colors, titles=None, size=(800, 400),
+                      xlabel="Intensity", ylabel="Frequency", font_size=11):
+    """
+    Render 256-bin histograms side by side into one RGB image of the given
+    (width, height). Each panel gets its own axes and optional title.
+    """
+    width, height = size
+    titles = titles or [None] * len(hists)
+    canvas = Image.new("RGB", size, BACKGROUND)
+    font = _font(font_size)
+    panel_w = width // len(hists)
+    for i, (hist, color, title) in enumerate(zip(hists, colors, titles)):
+        box = (i * panel_w, 0, (i + 1) * panel_w, height)
+        _draw_panel(canvas, box, hist, color, title, xlabel, ylabel, font)
+    return canvas
+
+
+def render_histogram(hist, color="gray", size=(300, 200), title=None,
+                     xlabel="Intensity", ylabel="Frequency", font_size=11):
+    """Render one 256-bin histogram as an RGB image of the given (width, height)."""
+    return render_histograms([hist], [color], [title], size, xlabel, ylabel, font_size)
+
+
+def export_histogram(filepath, hists, colors, titles=None, figsize=(8, 4), dpi=150):
+    """
+    Save histograms side by side with matplotlib (optional dependency), for
+    higher quality output than the raster renderer.
+    """
+    try:
+        from matplotlib.figure import Figure
+    except ImportError as exc:
+        raise RuntimeError("Exporting histograms with matplotlib requires matplotlib to be installed") from exc
+
+    titles = titles or [None] * len(hists)
+    fig = Figure(figsize=figsize)
+    axes = fig.subplots(1, len(hists), squeeze=False)
+    for ax, hist, color, title in zip(axes[0], hists, colors, titles):
+        ax.bar(range(256), hist, color=color, width=1.0)
+        if title:
+            ax.set_title(title)
+        ax.set_xlabel("Intensity")
+        ax.set_ylabel("Frequency")
+    fig.tight_layout()
+    fig.savefig(filepath, dpi=dpi)
@@ -0,0 +1,65 @@
+# Palette-domain processing for 8-bit indexed images.
+# Point operations run on the 256 palette entries and are then mapped through
+# the index plane once; histograms are weighted index counts. Nothing here
+# expands the image to full RGB.
+import numpy as np
+from PIL import Image
+
+from lut import compile_chain
+from profiling import traced
+
+
+def palette_gray(palette):
+    """Channel average int((r + g + b) / 3) of every palette entry, as uint8."""
+    return (palette.sum(axis=1, dtype=np.uint16) // 3).astype(np.uint8)
+
+
+def indexed_image(indices, palette):
+    """'P' PIL image sharing the index plane with the given (256, 3) palette."""
+    img = Image.fromarray(indices)
+    img.putpalette(np.ascontiguousarray(palette, dtype=np.uint8).tobytes())
+    return img
+
+
+def split_indexed(img):
+    """(indices, (256, 3) palette) of a 'P' PIL image."""
+    raw = np.zeros(768, dtype=np.uint8)
+    values = img.getpalette() or []
+    raw[:len(values)] = values[:768]
+    return np.asarray(img), raw.reshape(256, 3)
+
+
+@traced("indexed point operation")
+def indexed_point_image(indices, palette, steps=()):
+    """
+    Grayscale followed by a chain of point operations (see lut.compile_chain),
+    evaluated on the palette and mapped through the index plane in one pass.
+    Equal to running the chain on create_grayscale_image of the RGB image.
+    """
+    entry_values = compile_chain(steps)[palette_gray(palette)]
+    return Image.fromarray(entry_values[indices], mode="L")
+
+
+@traced("indexed channels")
+def indexed_channel_images(indices, palette):
+    """Red, green and blue channel views as 'P' images with single-channel palettes."""
+    views = []
+    for channel in range(3):
+        channel_palette = np.zeros_like(palette)
+        channel_palette[:, channel] = palette[:, channel]
+        views.append(indexed_image(indices, channel_palette))
+    return tuple(views)
+
+
+@traced("indexed histograms")
+def indexed_histograms(indices, palette):
+    """
+    Per-channel and grayscale 256-bin histograms from one bincount of the
+    index plane, weighted through the palette. Returns (red, green, blue, gray).
+    """
+    counts = np.bincount(indices.ravel(), minlength=256)
+    columns = list(palette.T) + [palette_gray(palette)]
+    return tuple(
+        np.bincount(values, weights=counts, minlength=256).astype(np.int64)
+        for values in columns
+    )
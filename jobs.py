@@ -0,0 +1,116 @@
+# Background jobs for the GUI.
+# Work runs on a concurrent.futures thread pool; the Tk thread polls the
+# futures with root.after and delivers results, errors and progress there,
+# so the mainloop never blocks on decoding or filtering.
+from concurrent.futures import ThreadPoolExecutor
+
+from lazy_views import CancelToken, Cancelled
+
+# How often the Tk thread checks running jobs
+POLL_MS = 40
+
+
+class Job:
+    """Handle given to the worker function: progress reporting and cancellation."""
+
+    __slots__ = ("key", "token", "progress", "future", "on_done", "on_error", "on_progress")
+
+    def __init__(self, key, token, on_done, on_error, on_progress):
+        self.key = key
+        self.token = token
+        self.progress = None  # latest (done, total), read by the Tk thread
+        self.future = None
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+
+    def report(self, done, total):
+        self.progress = (done, total)
+
+    def check(self):
+        """Raise Cancelled if the job was cancelled or superseded."""
+        self.token.check()
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+
+class JobRunner:
+    """
+    Run fn(job, *args) in the background and call on_done(result) on the Tk thread.
+    Submitting with a key supersedes the previous job with the same key: it is
+    cancelled and its result, if it still arrives, is dropped.
+    """
+
+    def __init__(self, root, workers=2):
+        self.root = root
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = []
+        self._latest = {}
+        self._after_id = None
+
+    def submit(self, fn, *args, key=None, token=None, on_done=None, on_error=None, on_progress=None):
+        if key is not None and key in self._latest:
+            self._latest[key].token.cancel()
+        job = Job(key, token or CancelToken(), on_done, on_error, on_progress)
+        job.future = self._pool.submit(fn, job, *args)
+        if key is not None:
+            self._latest[key] = job
+        self._jobs.append(job)
+        if self._after_id is None:
+            self._after_id = self.root.after(POLL_MS, self._poll)
+        return job
+
+    def cancel(self, key=None):
+        """Cancel the job with this key, or every keyed job when key is None."""
+        keys = list(self._latest) if key is None else [key]
+        for k in keys:
+            job = self._latest.pop(k, None)
+            if job is not None:
+                job.token.cancel()
+                job.future.cancel()
+
+    def busy(self, key):
+        job = self._latest.get(key)
+        return job is not None and not job.future.done()
+
+    def _poll(self):
+        self._after_id = None
+        # Take the list first: callbacks may run nested event loops (modal
+        # dialogs) that poll again, and must not see these jobs a second time
+        pending, self._jobs = self._jobs, []
+        running = []
+        try:
+            while pending:
+                job = pending.pop(0)
+                if not job.future.done():
+                    if job.progress is not None and job.on_progress and not job.cancelled:
+                        job.on_progress(*job.progress)
+                    running.append(job)
+                    continue
+                self._deliver(job)
+        finally:
+            # Jobs submitted by the callbacks are already in self._jobs
+            self._jobs = running + pending + self._jobs
+            if self._jobs and self._after_id is None:
+                self._after_id = self.root.after(POLL_MS, self._poll)
+
+    def _deliver(self, job):
+        """Call the callback of a finished job, unless it was cancelled or superseded."""
+        if self._latest.get(job.key) is job:
+            del self._latest[job.key]
+        if job.cancelled or job.future.cancelled():
+            return  # stale or cancelled: drop the result
+        exc = job.future.exception()
+        if isinstance(exc, Cancelled):
+            return
+        if exc is not None:
+            if job.on_error:
+                job.on_error(exc)
+        elif job.on_done:
+            job.on_done(job.future.result())
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,151 @@
+# Deferred, memoized derived views for the GUI.
+# Every derived image (channels, histograms, point operations, ...) is a
+# LazyNode computed the first time it is needed. A ViewScheduler renders a
+# node into its widget only once the widget scrolls into the visible part of
+# the canvas, computing it on a background JobRunner when one is given, and
+# drops everything still pending when another file is opened.
+import threading
+
+
+class Cancelled(Exception):
+    """Raised when work belonging to a superseded file is requested."""
+
+
+class CancelToken:
+    """Shared flag telling the nodes and renders of one opened file to stop."""
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+
+class LazyNode:
+    """
+    A value computed from the values of its dependency nodes on first get()
+    and memoized afterwards. get() raises Cancelled once the token is cancelled.
+    Safe to call from several threads; the value is computed once.
+    """
+
+    __slots__ = ("_fn", "_deps", "_token", "_value", "_done", "_lock")
+
+    def __init__(self, fn, *deps, token=None):
+        self._fn = fn
+        self._deps = deps
+        self._token = token
+        self._value = None
+        self._done = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._done
+
+    def get(self):
+        if self._done:
+            return self._value
+        # Dependencies form a DAG, so nested locks are always taken in one order
+        with self._lock:
+            if not self._done:
+                if self._token is not None:
+                    self._token.check()
+                args = [dep.get() for dep in self._deps]
+                if self._token is not None:
+                    self._token.check()
+                self._value = self._fn(*args)
+                self._done = True
+        return self._value
+
+
+class ViewScheduler:
+    """
+    Render registered widgets when they become visible inside a scrollable canvas.
+    The canvas must generate <<ViewScrolled>> whenever its view changes.
+    With a runner, compute() runs on its worker threads and show() on the Tk thread.
+    """
+
+    def __init__(self, canvas, on_error=None, runner=None):
+        self.canvas = canvas
+        self.on_error = on_error
+        self.runner = runner
+        self.token = CancelToken()
+        self._pending = []   # [(widget, compute, show)] not rendered yet
+        self._bound = []     # every widget bound for the current file
+        self._after_id = None
+        canvas.bind("<<ViewScrolled>>", lambda event: self.refresh(), add="+")
+
+    def reset(self):
+        """Cancel the current file's views, clear their widgets and return a fresh token."""
+        self.token.cancel()
+        self.token = CancelToken()
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
+        for widget in self._bound:
+            widget.config(image="")
+            widget.image = None
+        self._pending.clear()
+        self._bound.clear()
+        return self.token
+
+    def bind(self, widget, compute, show):
+        """Call show(compute()) once, when widget is first visible."""
+        self._pending.append((widget, compute, show))
+        self._bound.append(widget)
+        self.refresh()
+
+    def refresh(self):
+        """Schedule rendering of the pending views that are currently visible."""
+        if self._after_id is None and self._pending:
+            self._after_id = self.canvas.after_idle(self._render_next, self.token)
+
+    def _is_visible(self, widget):
+        if not widget.winfo_ismapped():
+            return False
+        top = self.canvas.winfo_rooty()
+        bottom = top + self.canvas.winfo_height()
+        y = widget.winfo_rooty()
+        return y < bottom and y + widget.winfo_height() > top
+
+    def _render_next(self, token):
+        self._after_id = None
+        if token.cancelled:
+            return
+        for i, (widget, compute, show) in enumerate(self._pending):
+            if self._is_visible(widget):
+                del self._pending[i]
+                if self.runner is None:
+                    try:
+                        self._show(show, compute())
+                    except Cancelled:
+                        return
+                    except Exception as exc:
+                        self._error(exc)
+                else:
+                    self.runner.submit(
+                        lambda job: compute(), token=token,
+                        on_done=lambda result: self._show(show, result),
+                        on_error=self._error,
+                    )
+                    self.refresh()
+                return
+
+    def _show(self, show, result):
+        try:
+            show(result)
+        except Exception as exc:
+            self._error(exc)
+        # Geometry may have changed: look again on the next idle round
+        self.refresh()
+
+    def _error(self, exc):
+        if self.on_error is None:
+            raise exc
+        self.on_error(exc)
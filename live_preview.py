@@ -0,0 +1,143 @@
+# Live preview of an operation while its parameters are being adjusted.
+# Every parameter change renders the operation on a proxy, the source image
+# downscaled to display resolution, so the preview keeps up with a dragged
+# slider. Once the parameters have not changed for SETTLE_MS, the
+# full-resolution result is computed on the job runner. Each change supersedes
+# the jobs of the previous one: they are cancelled and late results dropped.
+import time
+
+from PIL import Image
+
+SETTLE_MS = 300
+
+# Proxy renders faster than this run directly on the Tk thread
+INLINE_MS = 8.0
+
+PROXY_KEY = "live-proxy"
+FULL_KEY = "live-full"
+
+
+def make_proxy(image: Image.Image, max_size) -> tuple[Image.Image, float]:
+    """(image downscaled to fit max_size, scale factor); images that already fit are kept."""
+    scale = min(max_size[0] / image.width, max_size[1] / image.height, 1.0)
+    if scale == 1.0:
+        return image, 1.0
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.BILINEAR, reducing_gap=2.0), scale
+
+
+def proxy_params(params: dict, scale: float) -> dict:
+    """Parameters for the proxy: kernel sizes shrink with the image (odd, at least 3)."""
+    if scale >= 1.0 or "kernel_size" not in params:
+        return params
+    k = max(3, round(params["kernel_size"] * scale))
+    return dict(params, kernel_size=k if k % 2 else k + 1)
+
+
+class LivePreview:
+    """
+    apply(name, image, params) runs the operation on the proxy;
+    run_full(job, name, image, params) computes the full-resolution result on
+    a worker thread; show(display_image, full_image) is called on the Tk thread
+    with each proxy result (full_image None) and then the settled full result.
+    """
+
+    def __init__(self, root, runner, apply, run_full, show, on_error=None,
+                 proxy_size=(400, 400), settle_ms=SETTLE_MS):
+        self.root = root
+        self.runner = runner
+        self.apply = apply
+        self.run_full = run_full
+        self.show = show
+        self.on_error = on_error
+        self.proxy_size = proxy_size
+        self.settle_ms = settle_ms
+        self._source = None     # callable returning the full-resolution image
+        self._proxy = None      # (proxy image, scale), built on first use
+        self._cost = {}         # operation name -> seconds of its last proxy render
+        self._request = None    # (name, params) of the latest change
+        self._generation = 0
+        self._full_shown = False
+        self._settle_id = None
+
+    def set_source(self, source):
+        """Preview on a new image; source() returns it (and may compute it)."""
+        self.cancel()
+        self._source = source
+        self._proxy = None
+
+    def cancel(self):
+        """Drop the pending settle timer and every in-flight job."""
+        if self._settle_id is not None:
+            self.root.after_cancel(self._settle_id)
+            self._settle_id = None
+        self.runner.cancel(PROXY_KEY)
+        self.runner.cancel(FULL_KEY)
+
+    def update(self, name, params):
+        """Parameters changed: show a proxy render now, the full result once they settle."""
+        if self._source is None:
+            return
+        self._request = (name, dict(params))
+        self._generation += 1
+        self._full_shown = False
+        generation = self._generation
+        self.runner.cancel(FULL_KEY)
+        if self._settle_id is not None:
+            self.root.after_cancel(self._settle_id)
+        self._settle_id = self.root.after(self.settle_ms, self._settle)
+
+        if self._proxy is not None and self._cost.get(name, 1.0) * 1000 < INLINE_MS:
+            self.runner.cancel(PROXY_KEY)
+            try:
+                image = self._render_proxy(name, params)
+            except Exception as exc:
+                self._error(exc)
+                return
+            self._show_proxy(generation, image)
+        else:
+            self.runner.submit(
+                lambda job: self._render_proxy(name, params, job), key=PROXY_KEY,
+                on_done=lambda image: self._show_proxy(generation, image), on_error=self._error,
+            )
+
+    def _render_proxy(self, name, params, job=None):
+        if self._proxy is None:
+            self._proxy = make_proxy(self._source(), self.proxy_size)
+        if job is not None:
+            job.check()
+        proxy, scale = self._proxy
+        started = time.perf_counter()
+        image = self.apply(name, proxy, proxy_params(params, scale))
+        self._cost[name] = time.perf_counter() - started
+        return image
+
+    def _show_proxy(self, generation, image):
+        # A late proxy must not replace a newer change or the settled full result
+        if generation == self._generation and not self._full_shown:
+            self.show(image, None)
+
+    def _settle(self):
+        self._settle_id = None
+        name, params = self._request
+        source, generation = self._source, self._generation
+
+        def run(job):
+            full = self.run_full(job, name, source(), params)
+            job.check()
+            return make_proxy(full, self.proxy_size)[0], full
+
+        self.runner.submit(
+            run, key=FULL_KEY, on_done=lambda result: self._show_full(generation, *result),
+            on_error=self._error,
+        )
+
+    def _show_full(self, generation, display, full):
+        if generation == self._generation:
+            self._full_shown = True
+            self.show(display, full)
+
+    def _error(self, exc):
+        if self.on_error is None:
+            raise exc
+        self.on_error(exc)
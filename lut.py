@@ -0,0 +1,92 @@
+# Lookup-table engine for point operations.
+# Every point operation on 8-bit levels is a 256-entry table; a chain of them
+# composes into a single table, so any chain costs one pass over the image.
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+_LEVELS = np.arange(256)
+
+
+def negative_lut():
+    return (255 - _LEVELS).astype(np.uint8)
+
+
+def threshold_lut(threshold):
+    return np.where(_LEVELS >= threshold, 255, 0).astype(np.uint8)
+
+
+def gamma_lut(gamma):
+    # Same float32 arithmetic as the original per-image gamma correction
+    levels = _LEVELS.astype(np.float32) / 255.0
+    return np.uint8(np.clip(np.power(levels, gamma) * 255, 0, 255))
+
+
+# Table builders by step name; parameters are passed positionally
+POINT_LUTS = {
+    "negative": negative_lut,
+    "threshold": threshold_lut,
+    "gamma": gamma_lut,
+}
+
+
+@lru_cache(maxsize=256)
+def _compile(steps):
+    table = _LEVELS.astype(np.uint8)
+    for name, *args in steps:
+        table = POINT_LUTS[name](*args)[table]
+    table.flags.writeable = False
+    return table
+
+
+def compile_chain(steps):
+    """
+    Compose point operations, e.g. [("gamma", 0.5), ("negative",), ("threshold", 128)],
+    into one 256-entry uint8 table. Compiled chains are cached.
+    """
+    steps = tuple(tuple(step) for step in steps)
+    for name, *_ in steps:
+        if name not in POINT_LUTS:
+            raise ValueError(f"Unknown point operation '{name}'")
+    return _compile(steps)
+
+
+@lru_cache(maxsize=64)
+def _gray_sum_table(table_bytes):
+    # Index by r + g + b (0..765): the channel average followed by the chain
+    table = np.frombuffer(table_bytes, dtype=np.uint8)[np.arange(766) // 3]
+    table.flags.writeable = False
+    return table
+
+
+def apply_lut(img, table):
+    """Map an 'L' PIL image or a uint8 ndarray through a 256-entry table."""
+    if isinstance(img, Image.Image):
+        return img.point(table.tolist())
+    return table[img]
+
+
+def rgb_to_gray(rgb, table=None):
+    """
+    Average the channels of an (H, W, 3) uint8 array as int((r + g + b) / 3),
+    optionally followed by a compiled chain, in a single table lookup.
+    """
+    chain = _LEVELS.astype(np.uint8) if table is None else table
+    channel_sum = rgb.sum(axis=2, dtype=np.uint16)
+    return _gray_sum_table(chain.tobytes())[channel_sum]
+
+
+def apply_chain(img, steps):
+    """
+    Apply a chain of point operations to a PIL image in one pass.
+    A leading ("grayscale",) step averages RGB channels first (as
+    create_grayscale_image does); otherwise the image is converted to 'L'.
+    """
+    steps = list(steps)
+    if steps and steps[0][0] == "grayscale":
+        table = compile_chain(steps[1:])
+        if img.mode == "L":
+            return apply_lut(img, table)
+        return Image.fromarray(rgb_to_gray(np.asarray(img.convert("RGB")), table), mode="L")
+    return apply_lut(img.convert("L"), compile_chain(steps))
@@ -1,61 +1,68 @@
-from tkinter import Tk, filedialog, Label, simpledialog
+import os
+import time
+
+# Startup stays light: NumPy-based decoding and processing modules are
+# imported on first use, inside the functions that need them.
+_START = time.perf_counter()
+
+from tkinter import Tk, filedialog, Label, simpledialog, Scale, IntVar, DoubleVar
 from PIL import Image, ImageDraw, ImageTk
-import os, io, matplotlib.pyplot as plt
-from pcx_reader import read_pcx_header, read_pcx_palette, decompress_rle
-from image_processing import (
-    create_grayscale_image,
-    create_negative_image,
-    create_gamma_image,
-    create_rgb_channel_images,
-    create_histogram,
-    create_threshold_image,
-)
-from ui_components import create_main_ui
-from histogram_equalization import histogram_equalization
-from filters.smoothing_filters import apply_average_filter, apply_median_filter
-from filters.sharpening_filters import (
-    highpass_filtering_with_laplacian_operator,
-    unsharp_masking,
-    highboost_filtering,
-)
-from filters.gradient import gradient_sobel
-
-# Registry of available filters and their parameter prompts
-FILTERS = {
-    "Averaging": {
-        "fn": apply_average_filter,
-        "params": [("kernel_size", "int", 3, {"min": 3, "odd": True})],
-    },
-    "Median": {
-        "fn": apply_median_filter,
-        "params": [("kernel_size", "int", 3, {"min": 3, "odd": True})],
-    },
-    "Laplacian (Highpass)": {
-        "fn": highpass_filtering_with_laplacian_operator,
-        "params": [],  # No parameters needed
-    },
-    "Unsharp Masking": {
-        "fn": unsharp_masking,
-        "params": [("kernel_size", "int", 3, {"min": 3, "odd": True})],
-    },
-    "Highboost": {
-        "fn": highboost_filtering,
-        "params": [
-            ("boost_factor", "float", 2.0, {"min": 1.0, "max": 3}),
-            ("kernel_size", "int", 3, {"min": 3, "odd": True}),
-        ],
-    },
-    "Gradient (Sobel)": {
-        "fn": gradient_sobel,
-        "params": [],  # No parameters needed
-    },
-}
+from ui_components import create_main_ui, create_stats_panel
+from lazy_views import LazyNode, ViewScheduler
+from jobs import JobRunner
+import profiling
+
+# Files larger than this are memory-mapped and shown in preview-only mode
+LARGE_FILE_BYTES = 128 * 1024 * 1024
+
+# Filter menu entry that prompts for a chain of filters
+CHAIN_CHOICE = "Filter Chain..."
+
+# How often the open profiling stats window re-reads the recorded spans
+STATS_REFRESH_MS = 1000
+
+# Live preview slider ends for parameters whose rules set no maximum
+LIVE_INT_MAX = 31
+LIVE_FLOAT_MAX = 10.0
+LIVE_FLOAT_STEP = 0.05
+
+_filter_executor = None
+_result_cache = None
+
+
+def _get_result_cache():
+    """Shared in-memory cache of filter and point-operation results, created on first use."""
+    global _result_cache
+    if _result_cache is None:
+        from result_cache import ResultCache
+        _result_cache = ResultCache()
+    return _result_cache
+
+
+def _get_filter_executor():
+    """Shared executor running filters over row bands on all cores, created on first use."""
+    global _filter_executor
+    if _filter_executor is None:
+        from filters.tiling import TiledExecutor
+        _filter_executor = TiledExecutor(cache=_get_result_cache())
+    return _filter_executor
+
+
+def _thumbnail(image, max_size):
+    """Copy of a PIL image (or ImagePyramid, MappedPcx) resized to fit within max_size (w, h)."""
+    if hasattr(image, "render"):  # ImagePyramid resamples its nearest level
+        return image.thumbnail(max_size)
+    if hasattr(image, "preview"):  # MappedPcx decodes only the sampled rows
+        copy = image.preview(max_size)
+    else:
+        copy = image.copy()
+    copy.thumbnail(max_size)
+    return copy
+
 
 def _thumbnail_photo(image, max_size):
-    """Return a PhotoImage from a PIL image resized to fit within max_size (w, h)."""
-    copy = image.copy()
-    copy.thumbnail(max_size)
-    return ImageTk.PhotoImage(copy)
+    """Return a PhotoImage from a PIL image (or MappedPcx) resized to fit within max_size (w, h)."""
+    return ImageTk.PhotoImage(_thumbnail(image, max_size))
 
 
 def _set_widget_image(widgets, key, photo):
@@ -64,6 +71,57 @@ def _set_widget_image(widgets, key, photo):
     widgets[key].image = photo
 
 
+def _bind_view(widgets, key, node, max_size):
+    """Show node's image in widgets[key] once the widget scrolls into view."""
+    def compute():  # worker thread
+        with profiling.span(f"view {key}"):
+            return _thumbnail(node.get(), max_size)
+
+    widgets["views"].bind(
+        widgets[key],
+        compute,
+        lambda thumb: _set_widget_image(widgets, key, ImageTk.PhotoImage(thumb)),
+    )
+
+
+def _start_progress(widgets, text, determinate=False):
+    """Show a running job in the status bar; indeterminate until progress is reported."""
+    bar = widgets["progress"]
+    bar.stop()
+    bar.config(mode="determinate" if determinate else "indeterminate", value=0)
+    if not determinate:
+        bar.start(15)
+    widgets["cancel_btn"].config(state="normal")
+    widgets["status"].config(text=text, fg="gray")
+
+
+def _set_progress(widgets, done, total):
+    widgets["progress"].config(value=100 * done / total)
+
+
+def _stop_progress(widgets):
+    widgets["progress"].stop()
+    widgets["progress"].config(mode="determinate", value=0)
+    widgets["cancel_btn"].config(state="disabled")
+
+
+def _job_failed(widgets, exc):
+    import traceback
+    _stop_progress(widgets)
+    widgets["status"].config(text=f"Error: {exc}", fg="red")
+    traceback.print_exception(exc)
+
+
+def _point_label(widgets, key, title):
+    """Titled result label in the point processing frame, created on first use."""
+    if key not in widgets:
+        Label(widgets["point_processing_frame"], text=title, font=("Arial", 11, "bold")).pack(anchor="w")
+        label = Label(widgets["point_processing_frame"], bg="white", relief="sunken")
+        label.pack(pady=10)
+        widgets[key] = label
+    return widgets[key]
+
+
 def _render_palette_preview(palette, cols=16, swatch=20):
     """Build a small palette preview image from an RGB palette list."""
     width = cols * swatch
@@ -77,141 +135,335 @@ def _render_palette_preview(palette, cols=16, swatch=20):
     return pal_img
 
 
-def _render_grayscale_histogram(gray_img):
+def _render_grayscale_histogram(gray_img, gray_hist=None):
     """Create a PIL image of the grayscale histogram for display."""
-    gray_hist = gray_img.histogram()
-    plt.figure(figsize=(4, 3))
-    plt.bar(range(256), gray_hist, color='gray')
-    plt.tight_layout()
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    buf.seek(0)
-    return Image.open(buf)
+    from histogram_plot import render_histogram
+    if gray_hist is None:
+        gray_hist = gray_img.histogram()
+    return render_histogram(gray_hist, 'gray', (400, 300), xlabel=None, ylabel=None)
+
+def _show_original(widgets, source, get_rgb):
+    """Show the original image in the zoomable view and bind click-to-inspect RGB readout."""
+    def show_rgb_values(xy):
+        if xy is not None:
+            x, y = xy
+            r, g, b = get_rgb(xy)
+            widgets["rgb_info"].config(
+                text=f"Position: ({x}, {y}) | RGB: ({r}, {g}, {b}) | R={r}, G={g}, B={b}"
+            )
+        else:
+            widgets["rgb_info"].config(text="Click inside the image to see RGB values")
+
+    widgets["original_view"].on_click = show_rgb_values
+    widgets["original_view"].set_source(source)
+
+
+def _show_header(widgets, header):
+    info = [f"{k}: {v}" for k, v in header.as_dict().items()]
+    widgets["header"].delete(1.0, "end")
+    widgets["header"].insert(1.0, '\n'.join(info))
+
+
+def _load_large_pcx(job, filepath):
+    """Worker: map a huge file and decode only the rows of its preview."""
+    from pcx_mmap import MappedPcx
+    from pyramid import MappedView
+    mapped = MappedPcx(filepath)
+    try:
+        view = MappedView(mapped, _thumbnail(mapped, (400, 400)))
+        job.check()
+    except BaseException:
+        mapped.close()
+        raise
+    return mapped, view
+
+
+def _show_large_pcx(widgets, filepath, mapped, view):
+    """Preview-only view of a huge file: decodes only the scanlines on screen."""
+    widgets["mapped_pcx"] = mapped
+    _show_header(widgets, mapped.header)
+    _show_original(widgets, view, lambda xy: mapped.pixel_rgb(*xy))
+    if mapped.palette is not None:
+        pal_img = _render_palette_preview([tuple(c) for c in mapped.palette.tolist()])
+        _set_widget_image(widgets, "palette", _thumbnail_photo(pal_img, (400, 400)))
+    widgets["status"].config(
+        text=f"Loaded (preview only, large file): {os.path.basename(filepath)}", fg="green"
+    )
+
+
+def _load_pcx(job, filepath):
+    """Worker: decode the file and build the pyramid the original image is viewed through."""
+    from pcx_reader import PcxImage
+    from indexed_processing import indexed_image
+    from pyramid import ImagePyramid
+
+    with profiling.span("load", file=os.path.basename(filepath)):
+        pcx = PcxImage.open(filepath)
+        job.check()
+        # Indexed files are processed in the palette domain and never expanded to RGB
+        img = indexed_image(pcx.indices, pcx.palette) if pcx.mode == 'P' else pcx.to_image()
+        pyramid = ImagePyramid.from_image(img)
+    return pcx, img, pyramid
+
+
+def _prompt_point_params():
+    """Ask for the threshold and gamma of the point operation views; None when skipped."""
+    threshold = simpledialog.askinteger(
+        "Threshold Input", "Enter threshold (0-255):", minvalue=0, maxvalue=255
+    )
+    gamma = simpledialog.askfloat(
+        "Gamma Input",
+        "Enter gamma value (e.g., 0.5 for brighter, 2.0 for darker):",
+        minvalue=0.1,
+        maxvalue=10.0,
+    )
+    return threshold, gamma
+
+
+def _show_pcx(widgets, filepath, started, point_params, pcx, img, pyramid):
+    """Show a decoded file and register its derived views."""
+    from indexed_processing import (
+        indexed_channel_images,
+        indexed_histograms,
+        indexed_point_image,
+    )
+    from image_processing import (
+        create_grayscale_image,
+        create_negative_image,
+        create_gamma_image,
+        create_rgb_channel_images,
+        create_histogram,
+        create_threshold_image,
+    )
+    from histogram_equalization import adaptive_equalize_image, histogram_equalization
+
+    # 24-bit files carry no palette
+    palette = [tuple(c) for c in pcx.palette.tolist()] if pcx.palette is not None else []
+    indexed = pcx.mode == 'P'
+    token = widgets["views"].token
+    cache = _get_result_cache()
+
+    _show_header(widgets, pcx.header)
+    if indexed:
+        get_rgb = lambda xy: palette[pcx.indices[xy[1], xy[0]]]
+    else:
+        get_rgb = img.getpixel
+
+    # Original Image (clickable for RGB values); everything else is deferred
+    _show_original(widgets, pyramid, get_rgb)
+    widgets["original_view"].canvas.update_idletasks()
+    first_pixel_ms = (time.perf_counter() - started) * 1000
+    name = os.path.basename(filepath)
+    widgets["status"].config(text=f"Loaded: {name} (first pixel in {first_pixel_ms:.0f} ms)", fg="green")
+
+    # Derived views, computed in the background when their widget first becomes visible
+    node = lambda fn, *deps: LazyNode(fn, *deps, token=token)
+    pal_img = node(lambda: _render_palette_preview(palette))
+    if indexed:
+        channels = node(lambda: indexed_channel_images(pcx.indices, pcx.palette))
+        gray = node(lambda: indexed_point_image(pcx.indices, pcx.palette))
+        hists = node(lambda: indexed_histograms(pcx.indices, pcx.palette))
+        gray_hist = node(lambda h: h[3], hists)
+    else:
+        split = node(lambda: create_rgb_channel_images(img))
+        channels = node(lambda parts: parts[:3], split)
+        gray = node(lambda: create_grayscale_image(img))
+        hists = node(lambda parts: tuple(c.histogram() for c in parts[3]), split)
+        gray_hist = node(lambda g: g.histogram(), gray)
+    widgets["gray_node"] = gray
+    widgets["live_preview"].set_source(gray.get)
+    widgets["live_changed"]()
+
+    _bind_view(widgets, "palette", pal_img, (400, 400))
+    _bind_view(widgets, "img", node(lambda: pyramid), (400, 400))
+    for i, color in enumerate(("red", "green", "blue")):
+        channel = node(lambda views, i=i: views[i], channels)
+        hist_img = node(lambda h, i=i, color=color: create_histogram(None, color, h[i], (250, 180)), hists)
+        _bind_view(widgets, color, channel, (250, 250))
+        _bind_view(widgets, f"{color}_hist", hist_img, (250, 180))
+    _bind_view(widgets, "gray", gray, (400, 400))
+    _bind_view(widgets, "gray_hist", node(_render_grayscale_histogram, gray, gray_hist), (400, 400))
+
+    def point_node(step, fallback):
+        """Point operation on the palette for indexed files, else on the gray image."""
+        if indexed:
+            return node(lambda: indexed_point_image(pcx.indices, pcx.palette, [step]))
+        cached = cache.wrap(fallback.__name__, fallback)
+        return node(lambda g: cached(g, *step[1:]), gray)
+
+    # Negative Image
+    _point_label(widgets, "negative", "Negative Image:")
+    _bind_view(widgets, "negative", point_node(("negative",), create_negative_image), (400, 400))
+
+    threshold, gamma = point_params
+
+    # --- Black/White via Manual Thresholding ---
+    if threshold is not None:
+        _point_label(widgets, "bw", "Black/White (Manual Thresholding):")
+        _bind_view(widgets, "bw", point_node(("threshold", threshold), create_threshold_image), (400, 400))
+
+    # --- Power-Law (Gamma) Transformation ---
+    if gamma is not None:
+        _point_label(widgets, "gamma", "Power-Law (Gamma) Transformation:")
+        _bind_view(widgets, "gamma", point_node(("gamma", gamma), create_gamma_image), (400, 400))
+
+    # --- Histogram Equalization ---
+    equalized = node(cache.wrap("histogram_equalization", histogram_equalization), gray)
+    _point_label(widgets, "hist_eq", "Histogram Equalization:")
+    _point_label(widgets, "hist_eq_comparison", "Histogram Comparison:")
+    _bind_view(widgets, "hist_eq", node(lambda eq: eq[0], equalized), (400, 400))
+    _bind_view(widgets, "hist_eq_comparison", node(lambda eq: eq[1], equalized), (600, 300))
+
+    # --- Adaptive Histogram Equalization (CLAHE, default 8x8 tiles) ---
+    adaptive = node(cache.wrap("adaptive_equalize_image", adaptive_equalize_image), gray)
+    _point_label(widgets, "clahe", "Adaptive Histogram Equalization (CLAHE):")
+    _bind_view(widgets, "clahe", adaptive, (400, 400))
+
+
+def _live_operations():
+    """Operations with parameters to tune in the live preview, in menu order."""
+    from pcxtool.operations import OPERATIONS
+    return [name for name, spec in OPERATIONS.items() if spec["params"]]
+
+
+def _apply_live(name, image, params):
+    """Proxy render: the operation run directly on the small image."""
+    from pcxtool.operations import OPERATIONS
+    return OPERATIONS[name]["fn"](image, **params)
+
+
+def _run_live_full(job, name, image, params):
+    """Worker: full-resolution result, tiled and cached like the filter and point views."""
+    from filters.registry import FILTERS
+    from pcxtool.operations import OPERATIONS
+    if name in FILTERS:
+        return _get_filter_executor().run_filter(name, image, progress=job.report, token=job.token, **params)
+    return _get_result_cache().wrap(name, OPERATIONS[name]["fn"])(image, **params)
+
+
+def _build_live_sliders(widgets, name, on_change):
+    """Replace the live preview sliders with one per parameter of operation name."""
+    from pcxtool.operations import OPERATIONS
+    frame = widgets["live_sliders"]
+    for child in frame.winfo_children():
+        child.destroy()
+    variables = {}
+    for param, kind, default, rules in OPERATIONS[name]["params"]:
+        rules = rules or {}
+        if kind == "int":
+            var = IntVar(value=default)
+            low, high, step = rules.get("min", 0), rules.get("max", LIVE_INT_MAX), 1
+        else:
+            var = DoubleVar(value=default)
+            low, high, step = rules.get("min", 0.0), rules.get("max", LIVE_FLOAT_MAX), LIVE_FLOAT_STEP
+        Scale(frame, label=param, variable=var, from_=low, to=high, resolution=step,
+              orient="horizontal", length=300, command=lambda _: on_change()).pack(anchor="w")
+        variables[param] = (var, rules)
+    return variables
+
+
+def _live_params(variables):
+    """Current slider values; even values of odd-only parameters snap up (None while snapping)."""
+    params = {}
+    for param, (var, rules) in variables.items():
+        value = var.get()
+        if rules.get("odd") and value % 2 == 0:
+            var.set(value + 1)  # the slider moves and reports again
+            return None
+        params[param] = value
+    return params
+
+
+def _open_stats_panel(root, widgets):
+    """Show the profiling stats window (one at a time); its table refreshes while open."""
+    panel = widgets.get("stats_panel")
+    if panel is not None and panel["window"].winfo_exists():
+        panel["window"].lift()
+        return
+    panel = widgets["stats_panel"] = create_stats_panel(root)
+    panel["record_var"].set(profiling.is_enabled())
+    panel["memory_var"].set(profiling.memory_tracking())
+    shown = [None]
+
+    def toggle():
+        if panel["record_var"].get():
+            profiling.enable(memory=panel["memory_var"].get())
+        else:
+            profiling.disable()
+
+    def refresh():
+        if not panel["window"].winfo_exists():
+            return
+        text = profiling.format_summary() if profiling.spans() else \
+            "No spans recorded yet. Tick 'Record spans', then open a file or apply a filter."
+        if text != shown[0]:
+            shown[0] = text
+            panel["table"].delete(1.0, "end")
+            panel["table"].insert(1.0, text)
+        panel["window"].after(STATS_REFRESH_MS, refresh)
+
+    def clear():
+        profiling.clear()
+        refresh()
+
+    def export():
+        filepath = filedialog.asksaveasfilename(
+            parent=panel["window"], defaultextension=".json",
+            filetypes=[("Chrome trace", "*.json")],
+        )
+        if not filepath:
+            return
+        try:
+            count = profiling.export_chrome_trace(filepath)
+            widgets["status"].config(text=f"Exported {count} spans: {os.path.basename(filepath)}", fg="green")
+        except OSError as ex:
+            widgets["status"].config(text=f"Error: {ex}", fg="red")
+
+    panel["record_check"].configure(command=toggle)
+    panel["memory_check"].configure(command=toggle)
+    panel["clear_btn"].configure(command=clear)
+    panel["export_btn"].configure(command=export)
+    refresh()
+
 
 def open_pcx(widgets):
     filepath = filedialog.askopenfilename(filetypes=[("PCX files", "*.pcx")])
     if not filepath:
         return
-    try:
-        header = read_pcx_header(filepath)
-        if header['BitsPerPixel'] != 8 or header['NPlanes'] != 1:
-            raise ValueError("Only 8-bit single-plane PCX files supported.")
-        palette = read_pcx_palette(filepath)
-        pixels = decompress_rle(filepath)
-
-        width, height = header['Width'], header['Height']
-        img = Image.new('RGB', (width, height))
-        img.putdata([palette[p] for p in pixels[:width * height]])
-
-        # Header text
-        info = [f"{k}: {v}" for k, v in header.items()]
-        widgets["header"].delete(1.0, "end")
-        widgets["header"].insert(1.0, '\n'.join(info))
-        
-        # Original Image (clickable for RGB values)
-        original_img = img.copy()
-        original_photo = _thumbnail_photo(original_img, (400, 400))
-        _set_widget_image(widgets, "original_img", original_photo)
-
-        scale_x = original_img.width / original_photo.width()
-        scale_y = original_img.height / original_photo.height()
-
-        def show_rgb_values(event):
-            x = int(event.x * scale_x)
-            y = int(event.y * scale_y)
-            if 0 <= x < original_img.width and 0 <= y < original_img.height:
-                r, g, b = original_img.getpixel((x, y))
-                widgets["rgb_info"].config(
-                    text=f"Position: ({x}, {y}) | RGB: ({r}, {g}, {b}) | R={r}, G={g}, B={b}"
-                )
-            else:
-                widgets["rgb_info"].config(text="Click inside the image to see RGB values")
-
-        widgets["original_img"].bind("<Button-1>", show_rgb_values)
+    large = os.path.getsize(filepath) > LARGE_FILE_BYTES
+    # Ask before the load job starts: a modal prompt inside a job callback
+    # would run a nested event loop while other jobs are being delivered
+    point_params = None if large else _prompt_point_params()
+    started = time.perf_counter()
+    # Drop the previous file's pending views and jobs before anything else
+    widgets["views"].reset()
+    widgets["jobs"].cancel("filter")
+    widgets["gray_node"] = None
+    widgets["live_preview"].set_source(None)
+    widgets["live"].config(image="")
+    previous = widgets.pop("mapped_pcx", None)
+    if previous is not None:
+        previous.close()
+
+    _start_progress(widgets, f"Loading {os.path.basename(filepath)}...")
+
+    def loaded(result):
+        _stop_progress(widgets)
+        try:
+            with profiling.span("show"):
+                if large:
+                    _show_large_pcx(widgets, filepath, *result)
+                else:
+                    _show_pcx(widgets, filepath, started, point_params, *result)
+        except Exception as e:
+            _job_failed(widgets, e)
 
-        # Palette preview
-        pal_img = _render_palette_preview(palette)
-        _set_widget_image(widgets, "palette", _thumbnail_photo(pal_img, (400, 400)))
+    # Decoding runs off the Tk thread; opening another file supersedes this job
+    widgets["jobs"].submit(
+        _load_large_pcx if large else _load_pcx, filepath,
+        key="open", on_done=loaded, on_error=lambda e: _job_failed(widgets, e),
+    )
 
-        # Main decompressed image
-        _set_widget_image(widgets, "img", _thumbnail_photo(img, (400, 400)))
-
-        # RGB channels and their histograms
-        r_img, g_img, b_img, (r_channel, g_channel, b_channel) = create_rgb_channel_images(img)
-        _set_widget_image(widgets, "red", _thumbnail_photo(r_img, (250, 250)))
-        _set_widget_image(widgets, "green", _thumbnail_photo(g_img, (250, 250)))
-        _set_widget_image(widgets, "blue", _thumbnail_photo(b_img, (250, 250)))
-
-        _set_widget_image(widgets, "red_hist", _thumbnail_photo(create_histogram(r_channel, 'red'), (250, 180)))
-        _set_widget_image(widgets, "green_hist", _thumbnail_photo(create_histogram(g_channel, 'green'), (250, 180)))
-        _set_widget_image(widgets, "blue_hist", _thumbnail_photo(create_histogram(b_channel, 'blue'), (250, 180)))
-
-        # Grayscale view and histogram
-        gray_img = create_grayscale_image(img)
-        _set_widget_image(widgets, "gray", _thumbnail_photo(gray_img, (400, 400)))
-        gray_hist_img = _render_grayscale_histogram(gray_img)
-        _set_widget_image(widgets, "gray_hist", _thumbnail_photo(gray_hist_img, (400, 400)))
-        # Store grayscale image for later operations
-        widgets["gray_image_obj"] = gray_img
-
-        # Negative Image
-        neg_img = create_negative_image(gray_img)
-        if "negative" not in widgets:
-            neg_label_title = Label(widgets["point_processing_frame"], text="Negative Image:", font=("Arial", 11, "bold"))
-            neg_label_title.pack(anchor="w")
-            neg_label = Label(widgets["point_processing_frame"], bg="white", relief="sunken")
-            neg_label.pack(pady=10)
-            widgets["negative"] = neg_label
-        _set_widget_image(widgets, "negative", _thumbnail_photo(neg_img, (400, 400)))
-
-        # --- Black/White via Manual Thresholding ---
-        bw_img = create_threshold_image(gray_img)
-        if bw_img:
-            if "bw" not in widgets:
-                bw_label_title = Label(widgets["point_processing_frame"], text="Black/White (Manual Thresholding):", font=("Arial", 11, "bold"))
-                bw_label_title.pack(anchor="w")
-                bw_label = Label(widgets["point_processing_frame"], bg="white", relief="sunken")
-                bw_label.pack(pady=10)
-                widgets["bw"] = bw_label
-            _set_widget_image(widgets, "bw", _thumbnail_photo(bw_img, (400, 400)))
-
-        # --- Power-Law (Gamma) Transformation ---
-        gamma_img = create_gamma_image(gray_img)
-        if gamma_img:
-            if "gamma" not in widgets:
-                gamma_label_title = Label(widgets["point_processing_frame"], text="Power-Law (Gamma) Transformation:", font=("Arial", 11, "bold"))
-                gamma_label_title.pack(anchor="w")
-                gamma_label = Label(widgets["point_processing_frame"], bg="white", relief="sunken")
-                gamma_label.pack(pady=10)
-                widgets["gamma"] = gamma_label
-            _set_widget_image(widgets, "gamma", _thumbnail_photo(gamma_img, (400, 400)))
-
-        # --- Histogram Equalization ---
-        eq_img, eq_hist_img = histogram_equalization(gray_img)
-        if "hist_eq" not in widgets:
-            eq_label_title = Label(widgets["point_processing_frame"], text="Histogram Equalization:", font=("Arial", 11, "bold"))
-            eq_label_title.pack(anchor="w")
-            eq_label = Label(widgets["point_processing_frame"], bg="white", relief="sunken")
-            eq_label.pack(pady=10)
-            widgets["hist_eq"] = eq_label
-            
-            eq_hist_label_title = Label(widgets["point_processing_frame"], text="Histogram Comparison:", font=("Arial", 11, "bold"))
-            eq_hist_label_title.pack(anchor="w")
-            eq_hist_label = Label(widgets["point_processing_frame"], bg="white", relief="sunken")
-            eq_hist_label.pack(pady=10)
-            widgets["hist_eq_comparison"] = eq_hist_label
-        
-        _set_widget_image(widgets, "hist_eq", _thumbnail_photo(eq_img, (400, 400)))
-        _set_widget_image(widgets, "hist_eq_comparison", _thumbnail_photo(eq_hist_img, (600, 300)))
-
-        widgets["status"].config(text=f"Loaded: {os.path.basename(filepath)}", fg="green")
-
-    except Exception as e:
-        widgets["status"].config(text=f"Error: {e}", fg="red")
-        import traceback
-        traceback.print_exc()
-    
 
 def main():
     root = Tk()
@@ -219,6 +471,20 @@ def main():
     root.geometry("1000x800")
 
     widgets = create_main_ui(root, lambda: open_pcx(widgets=None))
+    widgets["jobs"] = JobRunner(root)
+    widgets["views"] = ViewScheduler(
+        widgets["canvas"],
+        on_error=lambda ex: widgets["status"].config(text=f"Error: {ex}", fg="red"),
+        runner=widgets["jobs"],
+    )
+
+    def _cancel_jobs():
+        widgets["jobs"].cancel()
+        _stop_progress(widgets)
+        widgets["status"].config(text="Cancelled", fg="gray")
+
+    widgets["cancel_btn"].configure(command=_cancel_jobs)
+    widgets["stats_btn"].configure(command=lambda: _open_stats_panel(root, widgets))
     # Late binding fix:
     widgets["status"].after(100, lambda: widgets.update({"open": lambda: open_pcx(widgets)}))
     widgets["status"].after(100, lambda: root.bind("<Control-o>", lambda e: open_pcx(widgets)))
@@ -236,12 +502,15 @@ def main():
         if not select_widget or not var:
             return
         menu = select_widget["menu"]
+        from filters.registry import FILTERS
         menu.delete(0, "end")
         names = list(FILTERS.keys())
         default = names[0] if names else ""
         var.set(default)
         for name in names:
             menu.add_command(label=name, command=lambda n=name: var.set(n))
+        menu.add_separator()
+        menu.add_command(label=CHAIN_CHOICE, command=lambda: var.set(CHAIN_CHOICE))
 
     def _prompt_params(params_spec):
         values = {}
@@ -278,32 +547,151 @@ def main():
             values[name] = val
         return values
 
+    def _prompt_chain():
+        """Ask for 'filter > filter > ...' and build a fused FilterChain."""
+        from filters.pipeline import FilterChain
+        from filters.registry import FILTERS
+        from pcxtool.operations import parse_chain
+        text = simpledialog.askstring(
+            "Filter Chain",
+            "Filters separated by '>' (e.g. median:kernel_size=5 > unsharp > sobel):",
+            initialvalue=widgets.get("last_chain", ""),
+        )
+        if not text:
+            return None
+        try:
+            ops = parse_chain(text)
+            not_filters = [name for name, _ in ops if name not in FILTERS]
+            if not_filters:
+                raise ValueError(f"Not a filter: {', '.join(not_filters)}")
+            chain = FilterChain(ops)
+        except ValueError as ex:
+            widgets["status"].config(text=f"Error: {ex}", fg="red")
+            return None
+        widgets["last_chain"] = text
+        return chain
+
     def _apply_selected_filter():
-        src = widgets.get("gray_image_obj")
-        if src is None:
+        gray = widgets.get("gray_node")
+        if gray is None:
             widgets["status"].config(text="Load an image first.", fg="red")
             return
         var = widgets.get("filter_select_var")
         choice = var.get() if var else None
-        spec = FILTERS.get(choice)
-        if not spec:
-            widgets["status"].config(text="Select a filter.", fg="red")
+        if choice == CHAIN_CHOICE:
+            chain = _prompt_chain()
+            if chain is None:
+                return
+            choice = repr(chain)
+            run_filter = lambda job: _get_filter_executor().run_chain(
+                chain, gray.get(), progress=job.report, token=job.token
+            )
+        else:
+            from filters.registry import FILTERS
+            spec = FILTERS.get(choice)
+            if not spec:
+                widgets["status"].config(text="Select a filter.", fg="red")
+                return
+            params = _prompt_params(spec.get("params", []))
+            if params is None:
+                return
+            run_filter = lambda job: _get_filter_executor().run_filter(
+                choice, gray.get(), progress=job.report, token=job.token, **params
+            )
+
+        def run(job):
+            from pyramid import ImagePyramid
+            out = run_filter(job)
+            return out, ImagePyramid.from_image(out)
+
+        def done(result):
+            out, pyramid = result
+            _stop_progress(widgets)
+            widgets["filter_result_obj"] = out
+            widgets["filter_result_view"].set_source(pyramid)
+            stats = _get_result_cache().stats()
+            widgets["status"].config(
+                text=f"Applied {choice} (cache: {stats['hits']} hits, {stats['misses']} misses)",
+                fg="green",
+            )
+
+        # Applying another filter supersedes this one; its result is dropped
+        _start_progress(widgets, f"Applying {choice}...", determinate=True)
+        widgets["jobs"].submit(
+            run, key="filter", on_done=done,
+            on_error=lambda ex: _job_failed(widgets, ex),
+            on_progress=lambda finished, total: _set_progress(widgets, finished, total),
+        )
+
+    def _save_filter_result():
+        out = widgets.get("filter_result_obj")
+        if out is None:
+            widgets["status"].config(text="Apply a filter first.", fg="red")
             return
-        params = _prompt_params(spec.get("params", []))
-        if params is None:
+        filepath = filedialog.asksaveasfilename(defaultextension=".pcx", filetypes=[("PCX files", "*.pcx")])
+        if not filepath:
             return
         try:
-            out = spec["fn"](src, **params)
-            _set_widget_image(widgets, "filter_result_img", _thumbnail_photo(out, (400, 400)))
-            widgets["status"].config(text=f"Applied {choice}", fg="green")
+            from pcx_writer import write_pcx
+            write_pcx(filepath, out)
+            widgets["status"].config(text=f"Saved: {os.path.basename(filepath)}", fg="green")
         except Exception as ex:
             widgets["status"].config(text=f"Error: {ex}", fg="red")
 
-    _populate_filter_menu()
+    # Live preview: proxy renders while a slider moves, the full result once it settles
+    from live_preview import LivePreview
+    live_sliders = {}
+
+    def _show_live(display, full):
+        _set_widget_image(widgets, "live", ImageTk.PhotoImage(display))
+        if full is not None:
+            widgets["live_result_obj"] = full
+            widgets["status"].config(text=f"Live preview: {widgets['live_select_var'].get()} "
+                                          f"at full resolution", fg="green")
+
+    widgets["live_preview"] = LivePreview(
+        root, widgets["jobs"], _apply_live, _run_live_full, _show_live,
+        on_error=lambda ex: _job_failed(widgets, ex),
+    )
+
+    def _live_changed():
+        name = widgets["live_select_var"].get()
+        params = _live_params(live_sliders)
+        if name and params is not None:
+            widgets["live_preview"].update(name, params)
+
+    def _select_live(name):
+        widgets["live_select_var"].set(name)
+        live_sliders.clear()
+        live_sliders.update(_build_live_sliders(widgets, name, _live_changed))
+        _live_changed()
+
+    def _populate_live_menu():
+        menu = widgets["live_select"]["menu"]
+        menu.delete(0, "end")
+        names = _live_operations()
+        for name in names:
+            menu.add_command(label=name, command=lambda n=name: _select_live(n))
+        if names:
+            _select_live(names[0])
+
+    widgets["live_changed"] = _live_changed
+
+    def _on_ready():
+        # Filters (and NumPy) load after the first frame is on screen
+        _populate_filter_menu()
+        _populate_live_menu()
+        ready_ms = (time.perf_counter() - _START) * 1000
+        widgets["status"].config(text=f"No file loaded (ready in {ready_ms:.0f} ms)")
+
+    root.after_idle(_on_ready)
     if "apply_filter_btn" in widgets:
         widgets["apply_filter_btn"].configure(command=_apply_selected_filter)
+    if "save_result_btn" in widgets:
+        widgets["save_result_btn"].configure(command=_save_filter_result)
 
     root.mainloop()
+    widgets["jobs"].shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,165 @@
+import math
+import mmap
+import os
+
+import numpy as np
+from PIL import Image
+
+from pcx_reader import (
+    PcxHeader,
+    _decode_rle,
+    _rle_tokens,
+    check_format,
+    lines_to_pixels,
+    read_palette,
+)
+from profiling import traced
+
+INDEX_SUFFIX = ".lineidx.npz"
+
+
+def build_line_index(data, header, chunk_size=1 << 24):
+    """Locate the start of every scanline in the RLE stream of a PCX file.
+
+    `data` is the whole file (bytes or mmap). Returns an (Height + 1, 2) int64
+    array: row y holds (file offset of the RLE token containing the first byte
+    of scanline y, number of that token's bytes belonging to the previous line).
+    The last row holds the offset just past the pixel data. The stream is
+    tokenized in chunks, so memory stays bounded by `chunk_size`.
+    """
+    line_bytes = header.BytesPerLine * header.NPlanes
+    total = header.decoded_size
+    index = np.zeros((header.Height + 1, 2), dtype=np.int64)
+    targets = np.arange(header.Height, dtype=np.int64) * line_bytes
+    pos, decoded, next_line = 128, 0, 0
+    while next_line < header.Height or decoded < total:
+        view = memoryview(data)[pos:pos + chunk_size]
+        starts, values, counts, consumed = _rle_tokens(view)
+        del view
+        if consumed == 0:
+            raise ValueError(f"PCX data truncated: expected {total} bytes")
+        ends = decoded + np.cumsum(counts)
+        first = ends - counts
+        hi = int(np.searchsorted(targets, ends[-1] if ends.size else decoded))
+        if hi > next_line:
+            # Token containing byte t is the first whose end exceeds t
+            tok = np.searchsorted(ends, targets[next_line:hi], side='right')
+            index[next_line:hi, 0] = pos + starts[tok]
+            index[next_line:hi, 1] = targets[next_line:hi] - first[tok]
+            next_line = hi
+        if ends.size and ends[-1] >= total:
+            last = int(np.searchsorted(ends, total))
+            index[-1, 0] = pos + int(starts[last]) + (2 if data[pos + int(starts[last])] >= 0xC0 else 1)
+            break
+        decoded = int(ends[-1]) if ends.size else decoded
+        pos += consumed
+    return index
+
+
+class MappedPcx:
+    """A memory-mapped PCX file whose scanlines are decoded on demand.
+
+    A one-time index of scanline offsets (see build_line_index) lets any row
+    range or tile be decoded without touching the rest of the file. The index
+    is cached in a sidecar file next to the image when possible.
+    """
+    __slots__ = ('filepath', 'header', 'palette', 'index', '_file', '_map')
+
+    def __init__(self, filepath, use_cache=True):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.header = PcxHeader.from_bytes(self._map[:128])
+            check_format(self.header)
+            self.index = self._load_index() if use_cache else None
+            if self.index is None:
+                self.index = build_line_index(self._map, self.header)
+                if use_cache:
+                    self._save_index()
+            self.palette = read_palette(self._map, self.header, int(self.index[-1, 0]))
+        except Exception:
+            self.close()
+            raise
+
+    def _stamp(self):
+        st = os.stat(self.filepath)
+        return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+    def _load_index(self):
+        try:
+            with np.load(self.filepath + INDEX_SUFFIX) as cached:
+                if np.array_equal(cached['stamp'], self._stamp()):
+                    index = cached['index']
+                    if index.shape == (self.header.Height + 1, 2):
+                        return index
+        except (OSError, KeyError, ValueError):
+            pass
+        return None
+
+    def _save_index(self):
+        try:
+            with open(self.filepath + INDEX_SUFFIX, 'wb') as f:
+                np.savez(f, index=self.index, stamp=self._stamp())
+        except OSError:
+            pass  # Read-only location: the index is simply rebuilt next time
+
+    @property
+    def width(self):
+        return self.header.Width
+
+    @property
+    def height(self):
+        return self.header.Height
+
+    @property
+    def size(self):
+        return self.header.Width, self.header.Height
+
+    def read_rows(self, y0, y1):
+        """Decode scanlines y0 <= y < y1 into indices (or RGB for 24-bit files)."""
+        y0, y1 = max(0, y0), min(self.header.Height, y1)
+        if y1 <= y0:
+            raise ValueError("Empty row range.")
+        (start, skip), end = self.index[y0], self.index[y1, 0]
+        rows = y1 - y0
+        size = rows * self.header.BytesPerLine * self.header.NPlanes
+        view = memoryview(self._map)[start:end + 2]
+        try:
+            plane, _ = _decode_rle(view, skip + size)
+        finally:
+            view.release()
+        return lines_to_pixels(plane[skip:], self.header, rows)
+
+    def read_tile(self, x0, y0, x1, y1):
+        """Decode the pixels in the box x0 <= x < x1, y0 <= y < y1."""
+        return self.read_rows(y0, y1)[:, max(0, x0):x1]
+
+    def pixel_rgb(self, x, y):
+        """RGB tuple of a single pixel, decoding only its scanline."""
+        value = self.read_rows(y, y + 1)[0, x]
+        return tuple(int(c) for c in (value if self.palette is None else self.palette[value]))
+
+    def to_rgb(self, pixels):
+        return pixels if self.palette is None else self.palette[pixels]
+
+    @traced("mmap preview")
+    def preview(self, max_size):
+        """Nearest-neighbour preview fitting max_size (w, h), decoding only sampled rows."""
+        step = max(1, math.ceil(max(self.width / max_size[0], self.height / max_size[1])))
+        rows = [self.read_rows(y, y + 1)[0, ::step] for y in range(0, self.height, step)]
+        return Image.fromarray(self.to_rgb(np.stack(rows)))
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,29 +1,78 @@
 import os
+from dataclasses import dataclass, asdict
+
+import numpy as np
+from PIL import Image
+
+from pcx_writer import write_pcx
+from profiling import span
+
+
+@dataclass(frozen=True)
+class PcxHeader:
+    """Parsed 128-byte PCX file header. Field names match read_pcx_header's keys."""
+    Manufacturer: int
+    Version: int
+    Encoding: int
+    BitsPerPixel: int
+    Xmin: int
+    Ymin: int
+    Xmax: int
+    Ymax: int
+    HDPI: int
+    VDPI: int
+    EgaPalette: bytes
+    NPlanes: int
+    BytesPerLine: int
+    PaletteInfo: int
+    HScreenSize: int
+    VScreenSize: int
+    Width: int
+    Height: int
+
+    @classmethod
+    def from_bytes(cls, h):
+        """Parse the header from the first 128 bytes of a PCX file."""
+        if len(h) < 128 or h[0] != 10:
+            raise ValueError("Not a PCX file.")
+        u16 = lambda i: int.from_bytes(h[i:i+2], 'little')
+        return cls(
+            Manufacturer=h[0],
+            Version=h[1],
+            Encoding=h[2],
+            BitsPerPixel=h[3],
+            Xmin=u16(4),
+            Ymin=u16(6),
+            Xmax=u16(8),
+            Ymax=u16(10),
+            HDPI=u16(12),
+            VDPI=u16(14),
+            EgaPalette=bytes(h[16:64]),
+            NPlanes=h[65],
+            BytesPerLine=u16(66),
+            PaletteInfo=u16(68),
+            HScreenSize=u16(70),
+            VScreenSize=u16(72),
+            Width=u16(8) - u16(4) + 1,
+            Height=u16(10) - u16(6) + 1,
+        )
+
+    @property
+    def decoded_size(self):
+        """Number of bytes in the decoded RLE payload."""
+        return self.Height * self.BytesPerLine * self.NPlanes
+
+    def as_dict(self):
+        """Header fields as a dict, without the raw 48-byte EGA palette."""
+        fields = asdict(self)
+        del fields['EgaPalette']
+        return fields
+
 
 def read_pcx_header(filepath):
     """Read and parse the 128-byte PCX file header."""
     with open(filepath, 'rb') as f:
-        h = f.read(128)
-        header = {
-            'Manufacturer': h[0],
-            'Version': h[1],
-            'Encoding': h[2],
-            'BitsPerPixel': h[3],
-            'Xmin': int.from_bytes(h[4:6], 'little'),
-            'Ymin': int.from_bytes(h[6:8], 'little'),
-            'Xmax': int.from_bytes(h[8:10], 'little'),
-            'Ymax': int.from_bytes(h[10:12], 'little'),
-            'HDPI': int.from_bytes(h[12:14], 'little'),
-            'VDPI': int.from_bytes(h[14:16], 'little'),
-            'NPlanes': h[65],
-            'BytesPerLine': int.from_bytes(h[66:68], 'little'),
-            'PaletteInfo': int.from_bytes(h[68:70], 'little'),
-            'HScreenSize': int.from_bytes(h[70:72], 'little'),
-            'VScreenSize': int.from_bytes(h[72:74], 'little'),
-        }
-        header['Width'] = header['Xmax'] - header['Xmin'] + 1
-        header['Height'] = header['Ymax'] - header['Ymin'] + 1
-        return header
+        return PcxHeader.from_bytes(f.read(128)).as_dict()
 
 def read_pcx_palette(filepath):
     """Read 256-color palette stored at end of 8-bit PCX file."""
@@ -34,22 +83,228 @@ def read_pcx_palette(filepath):
         palette = [(data[i], data[i+1], data[i+2]) for i in range(0, 768, 3)]
         return palette
 
+
+# Input bytes tokenized per step by _decode_rle; bounds its temporaries
+_RLE_CHUNK = 1 << 16
+
+
+def _rle_tokens(data):
+    """Split a PCX RLE stream into tokens: (start, value, count) arrays and bytes consumed.
+
+    A byte >= 0xC0 is a run marker unless it is the data byte of the marker before it.
+    The byte after any byte < 0xC0 always starts a token, so inside each group of
+    consecutive high bytes markers sit at even offsets from the start of the group.
+    A marker at the very end of data (missing its data byte) is left unconsumed.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    n = buf.size
+    high = buf >= 0xC0
+    hp = np.flatnonzero(high)
+    # Parity of each high byte's offset within its group of consecutive high bytes
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(hp) != 1) + 1, [hp.size]))
+    odd = np.repeat((bounds[:-1] & 1).astype(bool), np.diff(bounds))
+    odd[1::2] ^= True
+    markers = hp[~odd]
+    consumed = n
+    if markers.size and markers[-1] == n - 1:
+        markers = markers[:-1]
+        consumed = n - 1
+    is_start = ~high
+    is_start[markers + 1] = False
+    is_start[markers] = True
+    starts = np.flatnonzero(is_start)
+    lead = buf[starts]
+    run = lead >= 0xC0
+    values = buf[starts + run]
+    counts = np.where(run, lead & 0x3F, np.uint8(1))
+    return starts, values, counts, consumed
+
+
+def _decode_rle(data, size, out=None, chunk_size=_RLE_CHUNK):
+    """Decode `size` bytes of RLE data; return (array, number of input bytes used).
+
+    The input is tokenized `chunk_size` bytes at a time (a marker cut off at the
+    end of a chunk starts the next one) and its runs are expanded into `out` at
+    most about `chunk_size` output bytes at a time, so temporaries stay O(chunk)
+    however large the image is.
+    """
+    if out is None:
+        out = np.empty(size, dtype=np.uint8)
+    view = memoryview(data)
+    pos = written = 0
+    while written < size:
+        starts, values, counts, consumed = _rle_tokens(view[pos:pos + chunk_size])
+        if consumed == 0:
+            raise ValueError(f"PCX data truncated: expected {size} bytes")
+        ends = written + np.cumsum(counts, dtype=np.int64)
+        k = int(np.searchsorted(ends, size)) + 1 if ends[-1] >= size else ends.size
+        lo = 0
+        while lo < k:
+            first = int(ends[lo] - counts[lo])
+            hi = min(k, max(lo + 1, int(np.searchsorted(ends, first + chunk_size, side='right'))))
+            stop = min(size, int(ends[hi - 1]))
+            out[first:stop] = np.repeat(values[lo:hi], counts[lo:hi])[:stop - first]
+            lo = hi
+        if ends[-1] >= size:
+            last = pos + int(starts[k - 1])
+            return out, last + (2 if view[last] >= 0xC0 else 1)
+        written = int(ends[-1])
+        pos += consumed
+    return out, 0
+
+
+def decode_rle(data, size, out=None):
+    """Decode exactly `size` bytes of PCX RLE data into a uint8 array.
+
+    `data` is any buffer (bytes, memoryview, mmap) positioned at the first RLE byte;
+    decoding stops at `size` output bytes, so trailing palette bytes are never read
+    as pixels. Raises ValueError if the stream ends early.
+    """
+    return _decode_rle(data, size, out)[0]
+
+
 def decompress_rle(filepath):
-    """Decode PCX pixel data using Run-Length Encoding (RLE)."""
+    """Decode PCX pixel data using Run-Length Encoding (RLE).
+
+    Compatibility wrapper around decode_rle that returns a list of ints.
+    """
     with open(filepath, 'rb') as f:
-        f.seek(128)
-        pixel_data = []
-        file_size = os.path.getsize(filepath)
-        end_pos = file_size - 769
-        while f.tell() < end_pos:
-            byte = f.read(1)
-            if not byte:
-                break
-            val = byte[0]
-            if val >= 0xC0:
-                count = val & 0x3F
-                data_byte = f.read(1)[0]
-                pixel_data.extend([data_byte] * count)
-            else:
-                pixel_data.append(val)
-        return pixel_data
+        header = PcxHeader.from_bytes(f.read(128))
+        data = f.read()
+    return decode_rle(data, header.decoded_size).tolist()
+
+
+# (BitsPerPixel, NPlanes) combinations the decoder understands
+SUPPORTED_FORMATS = {(1, 1), (1, 2), (1, 3), (1, 4), (2, 1), (4, 1), (8, 1), (8, 3)}
+
+
+def check_format(header):
+    """Raise ValueError unless the decoder supports the header's pixel format."""
+    bpp, nplanes = header.BitsPerPixel, header.NPlanes
+    if (bpp, nplanes) not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported PCX format: {bpp}-bit, {nplanes} plane(s).")
+
+
+def _unpack_indices(plane, header, rows):
+    """Turn `rows` decoded scanlines of bit-packed and/or bit-planar data into a
+    (rows, Width) uint8 index plane."""
+    w, bpp, nplanes = header.Width, header.BitsPerPixel, header.NPlanes
+    lines = plane.reshape(rows, nplanes, header.BytesPerLine)
+    if bpp == 8:
+        return lines[:, 0, :w]
+    bits = np.unpackbits(lines, axis=2)
+    # Group the bits of each pixel (most significant first) and weight them
+    pixels = bits.reshape(rows, nplanes, -1, bpp)[:, :, :w]
+    weights = (1 << np.arange(bpp - 1, -1, -1)).astype(np.uint8)
+    values = (pixels * weights).sum(axis=3, dtype=np.uint8)
+    if nplanes == 1:
+        return values[:, 0]
+    # Plane p contributes bits p*bpp .. (p+1)*bpp-1 of the index
+    shifts = (np.arange(nplanes, dtype=np.uint8) * bpp)[None, :, None]
+    return np.bitwise_or.reduce(values << shifts, axis=1)
+
+
+def lines_to_pixels(plane, header, rows):
+    """Convert `rows` decoded scanlines into pixels.
+
+    Returns a contiguous (rows, Width) index array, or (rows, Width, 3) RGB
+    array for 24-bit files.
+    """
+    if header.NPlanes == 3 and header.BitsPerPixel == 8:
+        # Scanlines hold R, G and B planes back to back; transpose them into pixels
+        lines = plane.reshape(rows, 3, header.BytesPerLine)[:, :, :header.Width]
+        return np.ascontiguousarray(lines.transpose(0, 2, 1))
+    return np.ascontiguousarray(_unpack_indices(plane, header, rows))
+
+
+def read_palette(data, header, payload_end):
+    """(256, 3) palette for an indexed file, or None for 24-bit files.
+
+    `data` is the whole file and `payload_end` the offset just past the RLE data.
+    """
+    if header.NPlanes == 3 and header.BitsPerPixel == 8:
+        return None
+    if header.BitsPerPixel != 8:
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        if header.NPlanes == 1 and header.BitsPerPixel == 1:
+            palette[1] = 255
+        else:
+            palette[:16] = np.frombuffer(header.EgaPalette, dtype=np.uint8).reshape(16, 3)
+        return palette
+    # Some writers omit the 0x0C marker before the trailing 768-byte palette
+    if len(data) >= payload_end + 768 or (len(data) >= 769 and data[-769] == 0x0C):
+        return np.frombuffer(data[-768:], dtype=np.uint8).reshape(256, 3).copy()
+    return np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+
+
+class PcxImage:
+    """A decoded PCX image backed by NumPy arrays.
+
+    Indexed files (1, 2, 4 and 8 bits per pixel, bit-planar or packed) have
+    `mode` 'P': `indices` is the (Height, Width) uint8 index plane and `palette`
+    a (256, 3) uint8 array, and the RGB expansion is built on first access and
+    cached. 24-bit files have `mode` 'RGB', with `indices` and `palette` None.
+    """
+    __slots__ = ('header', 'indices', 'palette', '_rgb')
+
+    def __init__(self, header, indices, palette, rgb=None):
+        self.header = header
+        self.indices = indices
+        self.palette = palette
+        self._rgb = rgb
+
+    @classmethod
+    def open(cls, filepath):
+        """Load a PCX file with a single open and one bulk read."""
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        return cls.from_bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        header = PcxHeader.from_bytes(data[:128])
+        check_format(header)
+        view = memoryview(data)
+        with span("rle decode", bytes=len(data)):
+            plane, used = _decode_rle(view[128:], header.decoded_size)
+        with span("unpack scanlines"):
+            pixels = lines_to_pixels(plane, header, header.Height)
+        palette = read_palette(view, header, 128 + used)
+        if palette is None:
+            return cls(header, None, None, pixels)
+        return cls(header, pixels, palette)
+
+    @property
+    def mode(self):
+        return 'P' if self.indices is not None else 'RGB'
+
+    @property
+    def width(self):
+        return self.header.Width
+
+    @property
+    def height(self):
+        return self.header.Height
+
+    @property
+    def size(self):
+        return self.header.Width, self.header.Height
+
+    @property
+    def rgb(self):
+        """(Height, Width, 3) uint8 array expanded through the palette."""
+        if self._rgb is None:
+            with span("palette expansion"):
+                self._rgb = self.palette[self.indices]
+        return self._rgb
+
+    def to_image(self):
+        """Return the image as an RGB PIL image."""
+        return Image.fromarray(self.rgb)
+
+    def save(self, filepath):
+        """Write the image as 8-bit indexed or 24-bit PCX."""
+        if self.indices is not None:
+            write_pcx(filepath, self.indices, self.palette)
+        else:
+            write_pcx(filepath, self._rgb)
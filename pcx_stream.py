@@ -0,0 +1,185 @@
+# Chunked PCX reading and writing for streaming pipelines.
+# PcxStreamReader decodes a file a band of scanlines at a time from a small
+# read buffer, and PcxStreamWriter encodes bands as they arrive, so neither
+# ever holds more than one band of pixels. Runs never cross a scanline in the
+# encoder, so a file written band by band is byte-identical to write_pcx.
+import os
+
+import numpy as np
+
+from pcx_reader import PcxHeader, _rle_tokens, check_format, lines_to_pixels
+from pcx_writer import _as_array, _nplanes, _palette_bytes, _pcx_header, _scanlines, encode_rle
+
+# Bytes of compressed data read from the file at a time
+READ_CHUNK = 1 << 16
+
+# Scanlines per band yielded by PcxStreamReader.bands
+BAND_ROWS = 64
+
+
+class _RleStream:
+    """Decoded bytes of the RLE stream of an open file, tokenized a chunk at a time."""
+
+    def __init__(self, f, chunk_size=READ_CHUNK):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.offset = f.tell()  # file offset just past the last token used
+        self._base = self.offset  # file offset of the next chunk's first byte
+        self._tail = b""  # run marker at the end of the chunk, missing its data byte
+        self._values = self._counts = self._ends = np.empty(0, dtype=np.uint8)
+        self._next = 0
+
+    def _refill(self):
+        data = self._tail + self.f.read(self.chunk_size)
+        starts, values, counts, consumed = _rle_tokens(data)
+        if consumed == 0:
+            raise ValueError("PCX data truncated")
+        self._values, self._counts = values, counts.copy()
+        self._ends = self._base + np.append(starts[1:], consumed)
+        self._base += consumed
+        self._tail = data[consumed:]
+        self._next = 0
+
+    def read(self, size):
+        """The next `size` decoded bytes as a uint8 array."""
+        out = np.empty(size, dtype=np.uint8)
+        filled = 0
+        while filled < size:
+            if self._next >= self._counts.size:
+                self._refill()
+            i = self._next
+            counts = self._counts[i:]
+            total = np.cumsum(counts, dtype=np.int64)
+            need = size - filled
+            k = int(np.searchsorted(total, need))
+            if k == counts.size:  # the whole chunk fits
+                out[filled:filled + int(total[-1])] = np.repeat(self._values[i:], counts)
+                filled += int(total[-1])
+                self._next = self._counts.size
+                self.offset = int(self._ends[-1])
+                continue
+            out[filled:] = np.repeat(self._values[i:i + k + 1], counts[:k + 1])[:need]
+            filled = size
+            left = int(total[k]) - need
+            # A run split between reads keeps its remaining count
+            if left:
+                self._counts[i + k] = left
+                self._next = i + k
+            else:
+                self._next = i + k + 1
+            self.offset = int(self._ends[i + k])
+        return out
+
+
+class PcxStreamReader:
+    """
+    A PCX file decoded band by band. `palette` is the (256, 3) palette of
+    indexed files (None for 24-bit), known before the first band is read.
+    """
+
+    def __init__(self, filepath, chunk_size=READ_CHUNK):
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+        self._file = open(filepath, "rb")
+        try:
+            self.header = PcxHeader.from_bytes(self._file.read(128))
+            check_format(self.header)
+            self.palette = self._read_palette()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_palette(self):
+        """Same rules as pcx_reader.read_palette, reading only the end of the file."""
+        header = self.header
+        if header.NPlanes == 3 and header.BitsPerPixel == 8:
+            return None
+        if header.BitsPerPixel != 8:
+            from pcx_reader import read_palette
+            return read_palette(b"", header, 0)
+        size = os.fstat(self._file.fileno()).st_size
+        if size >= 128 + 769:
+            self._file.seek(-769, os.SEEK_END)
+            tail = self._file.read(769)
+            if tail[0] == 0x0C:
+                return np.frombuffer(tail[1:], dtype=np.uint8).reshape(256, 3).copy()
+            # No marker: the palette is there only if it follows the RLE data
+            self._file.seek(128)
+            stream = _RleStream(self._file, self.chunk_size)
+            line_bytes = header.BytesPerLine * header.NPlanes
+            for y in range(0, header.Height, BAND_ROWS):
+                stream.read(min(BAND_ROWS, header.Height - y) * line_bytes)
+            if size >= stream.offset + 768:
+                return np.frombuffer(tail[1:], dtype=np.uint8).reshape(256, 3).copy()
+        return np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+
+    @property
+    def width(self):
+        return self.header.Width
+
+    @property
+    def height(self):
+        return self.header.Height
+
+    def bands(self, rows=BAND_ROWS):
+        """Yield (rows, Width) index arrays (or (rows, Width, 3) RGB) from top to bottom."""
+        header = self.header
+        self._file.seek(128)
+        stream = _RleStream(self._file, self.chunk_size)
+        line_bytes = header.BytesPerLine * header.NPlanes
+        for y in range(0, header.Height, rows):
+            n = min(rows, header.Height - y)
+            yield lines_to_pixels(stream.read(n * line_bytes), header, n)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PcxStreamWriter:
+    """
+    Write a width x height PCX file to an open binary file one band at a
+    time. The format (8-bit or 24-bit) and palette come from the first band,
+    which is a PIL image or ndarray as accepted by pcx_writer.encode_pcx.
+    """
+
+    def __init__(self, f, width, height, dpi=(72, 72)):
+        self.f = f
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+        self.rows = 0
+        self._nplanes = None
+        self._palette = None
+
+    def write(self, band, palette=None):
+        arr, palette = _as_array(band, palette)
+        nplanes = _nplanes(arr)
+        if arr.shape[1] != self.width or self.rows + arr.shape[0] > self.height:
+            raise ValueError(f"Band of shape {arr.shape} does not fit a {self.width}x{self.height} image.")
+        if self._nplanes is None:
+            self._nplanes, self._palette = nplanes, palette
+            grayscale = nplanes == 1 and palette is None
+            self.f.write(_pcx_header(self.width, self.height, nplanes, self._stride, grayscale, self.dpi))
+        elif nplanes != self._nplanes:
+            raise ValueError("All bands of a PCX file need the same number of planes.")
+        self.f.write(encode_rle(_scanlines(arr, nplanes, self._stride)))
+        self.rows += arr.shape[0]
+
+    @property
+    def _stride(self):
+        return self.width + self.width % 2
+
+    def close(self):
+        """Finish the file: check every row was written and append the palette."""
+        if self.rows != self.height:
+            raise ValueError(f"Wrote {self.rows} of {self.height} rows.")
+        if self._nplanes == 1:
+            self.f.write(b"\x0c" + _palette_bytes(self._palette))
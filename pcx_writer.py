@@ -0,0 +1,132 @@
+import numpy as np
+from PIL import Image
+
+from profiling import traced
+
+
+def encode_rle(lines):
+    """RLE-encode a 2-D uint8 array, one row per scanline, into PCX bytes.
+
+    Runs are found for all rows at once and never cross a row boundary. Runs
+    longer than 63 are split, and single bytes >= 0xC0 get a count-1 marker.
+    """
+    lines = np.ascontiguousarray(lines, dtype=np.uint8)
+    n_rows, row_len = lines.shape
+    flat = lines.ravel()
+    n = flat.size
+    if n == 0:
+        return b''
+    change = np.empty(n, dtype=bool)
+    change[0] = True
+    np.not_equal(flat[1:], flat[:-1], out=change[1:])
+    change[::row_len] = True
+    starts = np.flatnonzero(change)
+    lens = np.diff(np.append(starts, n))
+
+    # Runs longer than 63 bytes are cut every 63 bytes by extra run starts
+    long_runs = np.flatnonzero(lens > 63)
+    if long_runs.size:
+        cuts = (lens[long_runs] - 1) // 63
+        first = np.cumsum(cuts) - cuts
+        step = np.arange(cuts.sum()) - np.repeat(first, cuts) + 1
+        change[np.repeat(starts[long_runs], cuts) + 63 * step] = True
+        starts = np.flatnonzero(change)
+        lens = np.diff(np.append(starts, n))
+
+    values = flat[starts]
+    pair = (lens > 1) | (values >= 0xC0)
+    # Each run is (marker, value); single literal bytes keep only the value
+    tokens = np.empty((starts.size, 2), dtype=np.uint8)
+    tokens[:, 0] = np.where(pair, 0xC0 | lens.astype(np.uint8), values)
+    tokens[:, 1] = values
+    keep = np.empty((starts.size, 2), dtype=bool)
+    keep[:, 0] = True
+    keep[:, 1] = pair
+    out = tokens[keep]
+    return out.tobytes()
+
+
+def _pcx_header(width, height, nplanes, stride, grayscale, dpi):
+    h = bytearray(128)
+    h[0:4] = bytes((10, 5, 1, 8))
+    h[8:10] = (width - 1).to_bytes(2, 'little')
+    h[10:12] = (height - 1).to_bytes(2, 'little')
+    h[12:14] = dpi[0].to_bytes(2, 'little')
+    h[14:16] = dpi[1].to_bytes(2, 'little')
+    h[65] = nplanes
+    h[66:68] = stride.to_bytes(2, 'little')
+    h[68:70] = (2 if grayscale else 1).to_bytes(2, 'little')
+    h[70:72] = width.to_bytes(2, 'little')
+    h[72:74] = height.to_bytes(2, 'little')
+    return bytes(h)
+
+
+def _nplanes(arr):
+    """1 for (H, W) data, 3 for (H, W, 3) RGB."""
+    if arr.ndim == 2:
+        return 1
+    if arr.ndim == 3 and arr.shape[2] == 3:
+        return 3
+    raise ValueError(f"Cannot write array of shape {arr.shape} as PCX.")
+
+
+def _scanlines(arr, nplanes, stride):
+    """One row per plane per scanline, padded to an even stride."""
+    height, width = arr.shape[:2]
+    lines = np.zeros((height, nplanes, stride), dtype=np.uint8)
+    lines[:, :, :width] = arr.reshape(height, width, nplanes).transpose(0, 2, 1)
+    return lines.reshape(height * nplanes, stride)
+
+
+def _palette_bytes(palette):
+    """768 palette bytes; a grayscale ramp when palette is None."""
+    if palette is None:
+        palette = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+    return np.asarray(palette, dtype=np.uint8).reshape(256, 3).tobytes()
+
+
+def _as_array(image, palette):
+    """Normalize a PIL image or ndarray to (uint8 array, palette or None)."""
+    if isinstance(image, Image.Image):
+        if image.mode == 'P':
+            raw = image.getpalette() or []
+            palette = np.zeros(768, dtype=np.uint8)
+            palette[:len(raw)] = raw[:768]
+            return np.asarray(image), palette.reshape(256, 3)
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB' if image.mode in ('RGBA', 'CMYK', 'YCbCr') else 'L')
+        return np.asarray(image), palette
+    arr = np.asarray(image)
+    if arr.dtype != np.uint8:
+        raise ValueError("PCX output must be uint8 data.")
+    return arr, palette
+
+
+@traced("pcx encode")
+def encode_pcx(image, palette=None, dpi=(72, 72)):
+    """Encode an image as 8-bit (grayscale/indexed) or 24-bit PCX bytes.
+
+    `image` is a PIL image ('L', 'P', 'RGB', ...) or a uint8 ndarray of shape
+    (H, W) or (H, W, 3). 2-D data is written with `palette` ((256, 3) uint8)
+    or, when no palette is given, a grayscale ramp.
+    """
+    arr, palette = _as_array(image, palette)
+    nplanes = _nplanes(arr)
+    height, width = arr.shape[:2]
+    if width == 0 or height == 0:
+        raise ValueError("Cannot write empty image as PCX")
+    stride = width + width % 2
+    body = encode_rle(_scanlines(arr, nplanes, stride))
+
+    grayscale = nplanes == 1 and palette is None
+    parts = [_pcx_header(width, height, nplanes, stride, grayscale, dpi), body]
+    if nplanes == 1:
+        parts += [b'\x0c', _palette_bytes(palette)]
+    return b''.join(parts)
+
+
+def write_pcx(filepath, image, palette=None, dpi=(72, 72)):
+    """Write an image to a PCX file; see encode_pcx for accepted inputs."""
+    data = encode_pcx(image, palette, dpi)
+    with open(filepath, 'wb') as f:
+        f.write(data)
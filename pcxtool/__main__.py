@@ -0,0 +1,68 @@
+# Command-line entry point:  python -m pcxtool batch "images/*.pcx" --op median:kernel_size=5 -o out
+import argparse
+import sys
+
+from pcxtool.batch import expand_inputs, output_paths, run_batch
+from pcxtool.operations import OPERATIONS, parse_chain
+from pcxtool.stream import check_streamable
+
+
+def _list_ops():
+    for name, spec in OPERATIONS.items():
+        params = ", ".join(f"{p}={default}" for p, _, default, _ in spec["params"])
+        print(f"{name}" + (f"  [{params}]" if params else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pcxtool", description="Headless PCX processing.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="run an operation chain over many files")
+    batch.add_argument("inputs", nargs="+", help="input files or glob patterns")
+    batch.add_argument("--op", action="append", default=[], metavar="NAME[:key=value,...]",
+                       help="operation to apply; repeat, or join with '>', to build a chain (see 'pcxtool ops')")
+    batch.add_argument("-o", "--output", required=True, help="output directory")
+    batch.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    batch.add_argument("--format", choices=("pcx", "png"), default="pcx", help="output format")
+    batch.add_argument("--fuse", action="store_true",
+                       help="run consecutive filters as one fused chain (float32 intermediates, one final clip)")
+    batch.add_argument("--cache-dir", default=None,
+                       help="keep intermediate results as .npy files here; reruns skip unchanged work")
+    batch.add_argument("--stream", action="store_true",
+                       help="decode, process and encode a band of scanlines at a time (PCX output, "
+                            "point operations and filters only); memory no longer grows with image height")
+
+    sub.add_parser("ops", help="list available operations and their parameters")
+
+    args = parser.parse_args(argv)
+    if args.command == "ops":
+        _list_ops()
+        return 0
+
+    try:
+        ops = [op for text in args.op for op in parse_chain(text)]
+    except ValueError as ex:
+        parser.error(str(ex))
+    if args.stream:
+        if args.format != "pcx":
+            parser.error("--stream writes PCX output only")
+        if args.cache_dir:
+            parser.error("--stream cannot be combined with --cache-dir")
+        try:
+            check_streamable(ops, args.fuse)
+        except ValueError as ex:
+            parser.error(str(ex))
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("no input files matched")
+    try:
+        output_paths(paths, args.output, args.format)
+    except ValueError as ex:
+        parser.error(str(ex))
+    stats = run_batch(paths, ops, args.output, workers=args.workers, out_format=args.format,
+                      cache_dir=args.cache_dir, fuse=args.fuse, stream=args.stream)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
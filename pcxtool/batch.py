@@ -0,0 +1,142 @@
+# Headless batch processing of PCX files through the operation registry
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pcx_reader import PcxImage
+from pcx_writer import write_pcx
+from indexed_processing import indexed_image
+from pcxtool.operations import apply_ops
+from pcxtool.stream import stream_file
+from result_cache import ResultCache
+from profiling import span
+
+# One result cache per worker process and cache directory
+_CACHES = {}
+
+_CACHE_COUNTERS = ("hits", "disk_hits", "misses")
+
+
+def _get_cache(cache_dir):
+    if cache_dir not in _CACHES:
+        _CACHES[cache_dir] = ResultCache(disk_dir=cache_dir)
+    return _CACHES[cache_dir]
+
+
+def expand_inputs(patterns):
+    """Expand glob patterns (recursive '**' allowed) into a sorted, de-duplicated file list."""
+    paths = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        paths.update(m for m in matches if os.path.isfile(m))
+    return sorted(paths)
+
+
+def output_paths(paths, out_dir, out_format="pcx"):
+    """
+    Output path of each input: its path below the inputs' common directory,
+    mirrored under out_dir, so a/x.pcx and b/x.pcx do not both become x.pcx.
+    Raises ValueError if two inputs would still write the same file.
+    """
+    dirs = [os.path.dirname(os.path.abspath(p)) for p in paths]
+    root = os.path.commonpath(dirs) if dirs else ""
+    out_paths, seen = [], {}
+    for path in paths:
+        stem = os.path.splitext(os.path.relpath(os.path.abspath(path), root))[0]
+        out_path = os.path.join(out_dir, f"{stem}.{out_format}")
+        # Case-insensitive file systems would merge x.pcx and X.PCX too
+        key = out_path.lower()
+        if key in seen:
+            raise ValueError(f"{seen[key]} and {path} would both be written to {out_path}")
+        seen[key] = path
+        out_paths.append(out_path)
+    return out_paths
+
+
+def process_file(path, ops, out_path, out_format="pcx", cache_dir=None, fuse=False, stream=False):
+    """
+    Run one file through the chain into out_path (see output_paths); return
+    (input bytes, output path, cache counters).
+    With cache_dir, stage results are cached on disk and reused by later runs.
+    With stream, the file is decoded, processed and encoded a band of scanlines
+    at a time (PCX output only; see pcxtool.stream).
+    """
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with span("batch file", path=os.path.basename(path)):
+        if stream:
+            stream_file(path, out_path, ops, fuse)
+            return os.path.getsize(path), out_path, {}
+        pcx = PcxImage.open(path)
+        # Indexed files stay indexed; point operations then work on the palette
+        source = indexed_image(pcx.indices, pcx.palette) if pcx.mode == "P" else pcx.to_image()
+        cache = _get_cache(cache_dir) if cache_dir else None
+        before = cache.stats() if cache else {}
+        img = apply_ops(source, ops, cache, fuse)
+        after = cache.stats() if cache else {}
+        counters = {k: after[k] - before[k] for k in _CACHE_COUNTERS} if cache else {}
+        if out_format == "pcx":
+            write_pcx(out_path, img)
+        else:
+            img.save(out_path)
+    return os.path.getsize(path), out_path, counters
+
+
+def run_batch(paths, ops, out_dir, workers=None, out_format="pcx", log=print, cache_dir=None,
+              fuse=False, stream=False):
+    """
+    Stream files through a process pool and report throughput. Outputs mirror
+    the input tree under out_dir (see output_paths); colliding outputs raise
+    ValueError before any file is processed.
+    Returns a dict with counts, bytes, elapsed time, failures and cache counters.
+    """
+    out_paths = output_paths(paths, out_dir, out_format)
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    done, failed, total_bytes = 0, [], 0
+    cache_counts = dict.fromkeys(_CACHE_COUNTERS, 0)
+
+    def record(path, result=None, error=None):
+        nonlocal done, total_bytes
+        if error is not None:
+            failed.append((path, error))
+            log(f"FAILED {path}: {error}")
+            return
+        done += 1
+        total_bytes += result[0]
+        for k, v in result[2].items():
+            cache_counts[k] += v
+
+    if workers == 1:
+        for path, out_path in zip(paths, out_paths):
+            try:
+                record(path, process_file(path, ops, out_path, out_format, cache_dir, fuse, stream))
+            except Exception as ex:
+                record(path, error=ex)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_file, p, ops, out_path, out_format, cache_dir, fuse, stream): p
+                       for p, out_path in zip(paths, out_paths)}
+            for future, path in futures.items():
+                try:
+                    record(path, future.result())
+                except Exception as ex:
+                    record(path, error=ex)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "images": done,
+        "failed": len(failed),
+        "bytes": total_bytes,
+        "seconds": elapsed,
+        "images_per_s": done / elapsed if elapsed else 0.0,
+        "mb_per_s": total_bytes / 1e6 / elapsed if elapsed else 0.0,
+        "cache": cache_counts,
+    }
+    log(f"{done} images ({len(failed)} failed) in {elapsed:.2f}s: "
+        f"{stats['images_per_s']:.1f} images/s, {stats['mb_per_s']:.2f} MB/s")
+    if cache_dir:
+        log(f"cache: {cache_counts['hits'] + cache_counts['disk_hits']} hits "
+            f"({cache_counts['disk_hits']} from disk), {cache_counts['misses']} misses")
+    return stats
@@ -0,0 +1,205 @@
+# Headless operation registry: point operations plus every FILTERS entry
+from histogram_equalization import adaptive_equalize_image, equalize_image
+from image_processing import (
+    create_grayscale_image,
+    create_negative_image,
+    create_threshold_image,
+    create_gamma_image,
+)
+from filters.registry import FILTERS
+from filters.pipeline import FilterChain
+from lut import apply_chain
+from indexed_processing import indexed_point_image, split_indexed
+from profiling import span
+
+
+def _to_gray(img):
+    if img.mode == "P":
+        return indexed_point_image(*split_indexed(img))
+    return img if img.mode == "L" else create_grayscale_image(img.convert("RGB"))
+
+
+# Same spec layout as FILTERS: "fn" plus a list of (name, kind, default, rules)
+POINT_OPS = {
+    "Grayscale": {"fn": _to_gray, "params": []},
+    "Negative": {"fn": create_negative_image, "params": []},
+    "Threshold": {
+        "fn": create_threshold_image,
+        "params": [("threshold", "int", 128, {"min": 0, "max": 255})],
+    },
+    "Gamma": {
+        "fn": create_gamma_image,
+        "params": [("gamma", "float", 1.0, {"min": 0.1, "max": 10.0})],
+    },
+    "Equalize": {"fn": lambda img: equalize_image(_to_gray(img)), "params": []},
+    "CLAHE (Adaptive Equalize)": {
+        "fn": lambda img, tiles, clip_limit: adaptive_equalize_image(_to_gray(img), tiles, clip_limit),
+        "params": [
+            ("tiles", "int", 8, {"min": 1, "max": 64}),
+            ("clip_limit", "float", 2.0, {"min": 0.0}),
+        ],
+    },
+}
+
+OPERATIONS = {**POINT_OPS, **FILTERS}
+
+
+def _lookup(name):
+    """Find an operation by full name, first word or parenthesized alias, case-insensitively."""
+    key = name.strip().lower()
+    for op_name in OPERATIONS:
+        alias = op_name.partition("(")[2].rstrip(")").lower()
+        if key in (op_name.lower(), op_name.split()[0].lower(), alias):
+            return op_name
+    raise ValueError(f"Unknown operation '{name}'. Choose from: {', '.join(OPERATIONS)}")
+
+
+def _convert(op_name, param, kind, text, rules):
+    try:
+        value = int(text) if kind == "int" else float(text)
+    except ValueError:
+        raise ValueError(f"{op_name}: {param} must be {'an integer' if kind == 'int' else 'a number'}")
+    if "min" in rules and value < rules["min"]:
+        raise ValueError(f"{op_name}: {param} must be >= {rules['min']}")
+    if "max" in rules and value > rules["max"]:
+        raise ValueError(f"{op_name}: {param} must be <= {rules['max']}")
+    if rules.get("odd") and value % 2 == 0:
+        raise ValueError(f"{op_name}: {param} must be odd.")
+    return value
+
+
+def parse_op(text):
+    """
+    Parse 'name[:key=value,...]' (e.g. 'median:kernel_size=5', 'gamma:gamma=0.5')
+    into (operation name, params dict). Missing parameters take their defaults.
+    """
+    name, _, arg_text = text.partition(":")
+    op_name = _lookup(name)
+    spec = OPERATIONS[op_name]
+    given = {}
+    for item in filter(None, (part.strip() for part in arg_text.split(","))):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"{op_name}: expected key=value, got '{item}'")
+        given[key.strip()] = value.strip()
+    known = {p[0] for p in spec["params"]}
+    unknown = set(given) - known
+    if unknown:
+        raise ValueError(f"{op_name}: unknown parameter(s) {', '.join(sorted(unknown))}")
+    params = {}
+    for param, kind, default, rules in spec["params"]:
+        params[param] = _convert(op_name, param, kind, given[param], rules or {}) if param in given else default
+    return op_name, params
+
+
+def parse_chain(text):
+    """
+    Parse 'op > op > ...' (each in parse_op syntax, '→' also accepted), e.g.
+    'median:kernel_size=5 > unsharp > sobel', into a list of (name, params).
+    """
+    parts = [part.strip() for part in text.replace("→", ">").split(">")]
+    if not all(parts):
+        raise ValueError("Expected operations separated by '>'")
+    return [parse_op(part) for part in parts]
+
+
+# Point operations that compile to lookup tables, as lut step names
+LUT_STEPS = {"Grayscale": "grayscale", "Negative": "negative", "Threshold": "threshold", "Gamma": "gamma"}
+
+
+def _lut_step(op_name, params):
+    return (LUT_STEPS[op_name], *(params[p[0]] for p in OPERATIONS[op_name]["params"]))
+
+
+def _stages(ops, fuse=False):
+    """
+    Group ops into stages: each run of consecutive table-based point operations
+    becomes one fused ("lut", steps) stage, anything else an ("op", (name, params)) stage.
+    With fuse, runs of consecutive filters become one ("chain", ops) FilterChain stage.
+    """
+    stages = []
+    i = 0
+    while i < len(ops):
+        if fuse and ops[i][0] in FILTERS:
+            j = i
+            while j < len(ops) and ops[j][0] in FILTERS:
+                j += 1
+            stages.append(("chain", tuple(ops[i:j])))
+            i = j
+        elif ops[i][0] in LUT_STEPS:
+            j = i
+            while j < len(ops) and ops[j][0] in LUT_STEPS:
+                j += 1
+            steps = [_lut_step(*op) for op in ops[i:j]]
+            # Grayscale anywhere but first is a no-op on an already gray image
+            steps = steps[:1] + [s for s in steps[1:] if s[0] != "grayscale"]
+            stages.append(("lut", steps))
+            i = j
+        else:
+            stages.append(("op", ops[i]))
+            i += 1
+    return stages
+
+
+def _stage_name(stage):
+    kind, arg = stage
+    if kind == "lut":
+        return "lut " + " > ".join(step[0] for step in arg)
+    if kind == "chain":
+        return "chain " + " > ".join(name for name, _ in arg)
+    return arg[0]
+
+
+def _run_stage(img, stage):
+    with span(f"stage {_stage_name(stage)}"):
+        return _apply_stage(img, stage)
+
+
+def _apply_stage(img, stage):
+    kind, arg = stage
+    if kind == "lut":
+        if img.mode == "P" and arg[0][0] == "grayscale":
+            # Indexed input: evaluate the chain on the palette only
+            return indexed_point_image(*split_indexed(img), arg[1:])
+        return apply_chain(img, arg)
+    if kind == "chain":
+        return FilterChain(arg)(_to_gray(img))
+    op_name, params = arg
+    if op_name in FILTERS:
+        img = _to_gray(img)
+    return OPERATIONS[op_name]["fn"](img, **params)
+
+
+def apply_ops(img, ops, cache=None, fuse=False):
+    """
+    Apply a list of (operation name, params) to a PIL image in order.
+    Runs of consecutive table-based point operations are fused into one pass.
+    With fuse, runs of consecutive filters run as one FilterChain: float32
+    intermediates, a single clip at the end and fused linear kernels.
+    With a ResultCache, each stage's result is keyed by the source pixels and
+    the chain so far, and the chain resumes after the last cached stage.
+    """
+    stages = _stages(ops, fuse)
+    if cache is None:
+        for stage in stages:
+            img = _run_stage(img, stage)
+        return img
+
+    keys = []
+    key = cache.key("source", img)
+    for stage in stages:
+        key = cache.key(key, stage)
+        keys.append(key)
+    start = 0
+    for i in range(len(stages) - 1, -1, -1):
+        # Probe uncounted; only the stage resumed from, or the first stage of a
+        # cold chain, is looked up and counted as a hit or miss
+        if i and not cache.contains(keys[i]):
+            continue
+        hit = cache.get(keys[i])
+        if hit is not None:
+            img, start = hit, i + 1
+            break
+    for i in range(start, len(stages)):
+        img = cache.put(keys[i], _run_stage(img, stages[i]))
+    return img
@@ -0,0 +1,94 @@
+# Streaming execution of operation chains, band by band from decoder to encoder.
+# Point-operation stages transform each band of scanlines on its own; a
+# neighbourhood stage keeps a rolling buffer of its input rows and releases an
+# output row once the rows `halo` below it have arrived, so memory stays
+# O(width x (band + halos)) however tall the image is. Every stage runs the
+# same code as apply_ops, so the output equals the in-memory result.
+import numpy as np
+from PIL import Image
+
+from filters.pipeline import FilterChain
+from filters.registry import FILTERS
+from indexed_processing import indexed_image
+from pcx_stream import BAND_ROWS, PcxStreamReader, PcxStreamWriter
+from pcxtool.operations import _apply_stage, _stages, _to_gray
+from profiling import traced
+
+
+def _stage_halo(stage):
+    """Rows above and below one output row that it depends on."""
+    kind, arg = stage
+    if kind == "lut":
+        return 0
+    if kind == "chain":
+        return FilterChain(arg).halo
+    op_name, params = arg
+    if op_name not in FILTERS:
+        raise ValueError(f"{op_name} needs the whole image and cannot be streamed.")
+    return FILTERS[op_name]["halo"](params)
+
+
+class _BandStage:
+    """One stage of a stream: feed() takes the next band and returns the rows that are final."""
+
+    def __init__(self, stage, height):
+        self.stage = stage
+        self.halo = _stage_halo(stage)
+        self.height = height
+        # Filters pad their input by reflection, so windows are kept a few halos tall
+        self._window = 3 * self.halo + 1
+        self._rows = None     # buffered input rows, the first being image row self._start
+        self._start = 0
+        self._received = 0
+        self._done = 0        # output rows returned so far
+
+    def feed(self, band: Image.Image) -> Image.Image | None:
+        if not self.halo:
+            return _apply_stage(band, self.stage)
+        rows = np.asarray(_to_gray(band))
+        self._rows = rows if self._rows is None else np.concatenate((self._rows, rows))
+        self._received += rows.shape[0]
+        last = self._received == self.height
+        # Rows up to `halo` above the last one received still lack context below
+        y1 = self.height if last else self._received - self.halo
+        y0 = self._done
+        if y1 <= y0 or (not last and self._received < self._window):
+            return None
+        s1 = min(self.height, y1 + self.halo)
+        s0 = max(0, min(y0 - self.halo, s1 - self._window))
+        window = self._rows[s0 - self._start:s1 - self._start]
+        out = np.asarray(_apply_stage(Image.fromarray(window, mode="L"), self.stage))
+        self._done = y1
+        keep = max(0, y1 - self._window)
+        self._rows = self._rows[keep - self._start:]
+        self._start = keep
+        return Image.fromarray(np.ascontiguousarray(out[y0 - s0:y1 - s0]), mode="L")
+
+
+def check_streamable(ops, fuse=False):
+    """Raise ValueError if an operation in ops needs the whole image at once."""
+    for stage in _stages(ops, fuse):
+        _stage_halo(stage)
+
+
+@traced("stream file")
+def stream_file(path, out_path, ops, fuse=False, band_rows=BAND_ROWS):
+    """
+    Decode path, apply ops and encode the result to out_path as PCX, one band
+    of scanlines at a time. The file written is identical to
+    write_pcx(out_path, apply_ops(image, ops, fuse=fuse)).
+    """
+    stages = _stages(ops, fuse)
+    with PcxStreamReader(path) as reader, open(out_path, "wb") as f:
+        chain = [_BandStage(stage, reader.height) for stage in stages]
+        writer = PcxStreamWriter(f, reader.width, reader.height)
+        for pixels in reader.bands(band_rows):
+            # Indexed files stay indexed, as in batch.process_file
+            band = indexed_image(pixels, reader.palette) if reader.palette is not None else Image.fromarray(pixels)
+            for stage in chain:
+                band = stage.feed(band)
+                if band is None:
+                    break
+            else:
+                writer.write(band)
+        writer.close()
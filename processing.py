@@ -0,0 +1,95 @@
+# Library API for image processing on NumPy arrays.
+# Every function takes its parameters explicitly, accepts uint8 ndarrays and
+# returns new ndarrays: (H, W) for grayscale, (H, W, 3) for RGB. Nothing here
+# imports tkinter or keeps per-call state, so the functions can run on worker
+# threads, in process pools and on headless machines. image_processing and
+# histogram_equalization are the PIL-image counterparts used by the GUI.
+import numpy as np
+
+from histogram_equalization import _clahe_array, _equalize_array
+from lut import compile_chain, rgb_to_gray
+
+
+def _check_gray(gray: np.ndarray) -> np.ndarray:
+    gray = np.asarray(gray)
+    if gray.ndim != 2 or gray.dtype != np.uint8:
+        raise ValueError(f"Expected a 2-D uint8 array, got {gray.ndim}-D {gray.dtype}.")
+    return gray
+
+
+def _check_rgb(rgb: np.ndarray) -> np.ndarray:
+    rgb = np.asarray(rgb)
+    if rgb.ndim != 3 or rgb.shape[2] != 3 or rgb.dtype != np.uint8:
+        raise ValueError(f"Expected an (H, W, 3) uint8 array, got {rgb.shape} {rgb.dtype}.")
+    return rgb
+
+
+def grayscale(rgb: np.ndarray) -> np.ndarray:
+    """Channel average int((r + g + b) / 3); 2-D input is returned as a copy."""
+    if np.ndim(rgb) == 2:
+        return _check_gray(rgb).copy()
+    return rgb_to_gray(_check_rgb(rgb))
+
+
+def split_channels(rgb: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Contiguous red, green and blue planes of an RGB array."""
+    rgb = _check_rgb(rgb)
+    return tuple(np.ascontiguousarray(rgb[:, :, i]) for i in range(3))
+
+
+def histogram(channel: np.ndarray) -> np.ndarray:
+    """256-bin int64 histogram of a uint8 array of any shape."""
+    channel = np.asarray(channel)
+    if channel.dtype != np.uint8:
+        raise ValueError(f"Expected a uint8 array, got {channel.dtype}.")
+    return np.bincount(channel.ravel(), minlength=256)
+
+
+def point_chain(img: np.ndarray, steps) -> np.ndarray:
+    """
+    Apply point operations, e.g. [("gamma", 0.5), ("threshold", 128)], in one
+    table lookup. RGB input is averaged to grayscale first.
+    """
+    table = compile_chain(steps)
+    if np.ndim(img) == 3:
+        return rgb_to_gray(_check_rgb(img), table)
+    return table[_check_gray(img)]
+
+
+def negative(gray: np.ndarray) -> np.ndarray:
+    return point_chain(gray, [("negative",)])
+
+
+def threshold(gray: np.ndarray, threshold: int) -> np.ndarray:
+    """255 where gray >= threshold, else 0."""
+    if not 0 <= threshold <= 255:
+        raise ValueError("threshold must be between 0 and 255.")
+    return point_chain(gray, [("threshold", int(threshold))])
+
+
+def gamma(gray: np.ndarray, gamma: float) -> np.ndarray:
+    """Power-law transformation 255 * (gray / 255) ** gamma."""
+    if not gamma > 0:
+        raise ValueError("gamma must be positive.")
+    return point_chain(gray, [("gamma", float(gamma))])
+
+
+def equalize(gray: np.ndarray) -> np.ndarray:
+    """Global histogram equalization."""
+    return _equalize_array(_check_gray(gray))[0]
+
+
+def clahe(gray: np.ndarray, tiles=8, clip_limit: float = 2.0) -> np.ndarray:
+    """Contrast-limited adaptive histogram equalization over a tiles x tiles grid."""
+    return _clahe_array(_check_gray(gray), tiles, clip_limit)
+
+
+def apply_filter(name: str, gray: np.ndarray, **params) -> np.ndarray:
+    """Run a filters.registry.FILTERS entry (e.g. "Median", kernel_size=5) on a 2-D array."""
+    from PIL import Image
+    from filters.registry import FILTERS
+
+    if name not in FILTERS:
+        raise ValueError(f"Unknown filter '{name}'")
+    out = FILTERS[name]["fn"](Image.fromarray(_check_gray(gray), mode="L"), **params)
+    return np.asarray(out)
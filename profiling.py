@@ -0,0 +1,258 @@
+# Named timing spans around the decode, processing and rendering stages.
+# Profiling is off by default: span() then returns a shared no-op context
+# manager and @traced functions cost one flag check per call. When enabled
+# (enable(), or PCX_PROFILE in the environment) every span records its wall
+# time, the CPU time of its thread and, with memory tracking, the peak bytes
+# allocated while it ran (tracemalloc; approximate when threads overlap).
+# Finished spans are summarized by name (summary, format_summary) and can be
+# exported as Chrome trace JSON (chrome://tracing, Perfetto).
+#
+# Environment:
+#   PCX_PROFILE=1          enable spans at import; PCX_PROFILE=memory also tracks allocations
+#   PCX_PROFILE_TRACE=path write a Chrome trace at exit ("{pid}" in path is replaced)
+#   PCX_PROFILE_STAGE=name run every span with this name under cProfile and write
+#                          the cumulative pstats to <name>.prof in PCX_PROFILE_DIR (default: .)
+import atexit
+import contextlib
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# Finished spans kept for the summary and trace export (oldest dropped first)
+MAX_SPANS = 100_000
+
+_enabled = False
+_memory = False
+_spans = deque(maxlen=MAX_SPANS)
+_lock = threading.Lock()
+_local = threading.local()
+_epoch = time.perf_counter()
+_NULL = contextlib.nullcontext()
+
+_profile_stage = os.environ.get("PCX_PROFILE_STAGE") or None
+_profiler = None
+_profiling = False
+
+
+class Span:
+    """
+    One timed region. Used as a context manager by span(); afterwards holds
+    name, args, start (seconds since import), wall and cpu (seconds), alloc
+    (peak bytes above the starting level, or None without memory tracking)
+    and thread (ident).
+    """
+
+    __slots__ = ("name", "args", "start", "wall", "cpu", "alloc", "thread",
+                 "_t0", "_cpu0", "_mem0", "_peak", "_profiled")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.alloc = None
+
+    def __enter__(self):
+        stack = _stack()
+        self._mem0 = None
+        if _memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            self._mem0 = self._peak = current
+        stack.append(self)
+        self._profiled = self.name == _profile_stage and _start_profile()
+        self.thread = threading.get_ident()
+        self._cpu0 = time.thread_time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.cpu = time.thread_time() - self._cpu0
+        self.wall = end - self._t0
+        self.start = self._t0 - _epoch
+        if self._profiled:
+            _stop_profile(self.name)
+        stack = _stack()
+        stack.pop()
+        if self._mem0 is not None and tracemalloc.is_tracing():
+            peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            self.alloc = peak - self._mem0
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+        with _lock:
+            _spans.append(self)
+        return False
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def span(name, **args):
+    """Context manager timing the enclosed block as `name` (no-op when disabled)."""
+    if not _enabled:
+        return _NULL
+    return Span(name, args)
+
+
+def traced(name=None):
+    """Decorator running each call of the function inside span(name)."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable(memory=False):
+    """Start recording spans; with memory, also trace allocations (slower)."""
+    global _enabled, _memory
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable():
+    """Stop recording spans (recorded spans are kept)."""
+    global _enabled, _memory
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def memory_tracking():
+    return _memory
+
+
+def clear():
+    with _lock:
+        _spans.clear()
+
+
+def spans():
+    """Finished spans, oldest first."""
+    with _lock:
+        return list(_spans)
+
+
+def summary():
+    """
+    Per-name totals, slowest first: dicts with name, count, total_ms, mean_ms,
+    max_ms, cpu_ms and peak_bytes (largest alloc, None without memory tracking).
+    """
+    rows = {}
+    for s in spans():
+        row = rows.get(s.name)
+        if row is None:
+            row = rows[s.name] = {"name": s.name, "count": 0, "total_ms": 0.0,
+                                  "max_ms": 0.0, "cpu_ms": 0.0, "peak_bytes": None}
+        row["count"] += 1
+        row["total_ms"] += s.wall * 1e3
+        row["max_ms"] = max(row["max_ms"], s.wall * 1e3)
+        row["cpu_ms"] += s.cpu * 1e3
+        if s.alloc is not None:
+            row["peak_bytes"] = max(row["peak_bytes"] or 0, s.alloc)
+    for row in rows.values():
+        row["mean_ms"] = row["total_ms"] / row["count"]
+    return sorted(rows.values(), key=lambda r: r["total_ms"], reverse=True)
+
+
+def format_summary():
+    """summary() as a fixed-width text table."""
+    lines = [f"{'span':<32}{'calls':>7}{'total ms':>11}{'mean ms':>10}{'max ms':>10}"
+             f"{'cpu ms':>10}{'peak MB':>9}"]
+    for row in summary():
+        peak = f"{row['peak_bytes'] / 1e6:9.1f}" if row["peak_bytes"] is not None else f"{'-':>9}"
+        lines.append(f"{row['name'][:31]:<32}{row['count']:>7}{row['total_ms']:>11.1f}"
+                     f"{row['mean_ms']:>10.2f}{row['max_ms']:>10.2f}{row['cpu_ms']:>10.1f}{peak}")
+    return "\n".join(lines)
+
+
+def _json_value(value):
+    return value if isinstance(value, (int, float, str, bool, type(None))) else repr(value)
+
+
+def chrome_trace():
+    """Recorded spans as a Chrome trace event dict (complete 'X' events, microseconds)."""
+    pid = os.getpid()
+    events = []
+    for s in spans():
+        args = {k: _json_value(v) for k, v in s.args.items()}
+        args["cpu_ms"] = round(s.cpu * 1e3, 3)
+        if s.alloc is not None:
+            args["alloc_bytes"] = s.alloc
+        events.append({"name": s.name, "ph": "X", "ts": s.start * 1e6, "dur": s.wall * 1e6,
+                       "pid": pid, "tid": s.thread, "args": args})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(filepath):
+    """Write the recorded spans as Chrome trace JSON; returns the number of events."""
+    trace = chrome_trace()
+    with open(filepath, "w") as f:
+        json.dump(trace, f)
+    return len(trace["traceEvents"])
+
+
+# cProfile for one named stage. Only one profiler can run at a time, so
+# nested or concurrent spans of that stage run unprofiled.
+
+def _start_profile():
+    global _profiler, _profiling
+    import cProfile
+    with _lock:
+        if _profiling:
+            return False
+        _profiling = True
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+    try:
+        _profiler.enable()
+    except ValueError:  # another profiler is active
+        _profiling = False
+        return False
+    return True
+
+
+def _stop_profile(name):
+    global _profiling
+    _profiler.disable()
+    safe = re.sub(r"[^\w.-]+", "_", name)
+    path = os.path.join(os.environ.get("PCX_PROFILE_DIR", "."), f"{safe}.prof")
+    _profiler.dump_stats(path)
+    _profiling = False
+
+
+def _export_at_exit(path):
+    if spans():
+        path = path.replace("{pid}", str(os.getpid()))
+        count = export_chrome_trace(path)
+        print(f"profiling: wrote {count} spans to {path}", file=sys.stderr)
+
+
+if os.environ.get("PCX_PROFILE") or _profile_stage:
+    enable(memory=os.environ.get("PCX_PROFILE", "").lower() == "memory")
+    if os.environ.get("PCX_PROFILE_TRACE"):
+        atexit.register(_export_at_exit, os.environ["PCX_PROFILE_TRACE"])
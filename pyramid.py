@@ -0,0 +1,177 @@
+# Multi-resolution image pyramids for zoomable views.
+# Level 0 is the full image and each further level halves it with 2x2 area
+# averaging, down to a level that fits in one display tile. A view at any
+# zoom is rendered from the nearest level at or above the display resolution,
+# cropped to the visible region first, so its cost depends on the viewport
+# size rather than the image size.
+import math
+
+import numpy as np
+from PIL import Image
+
+from profiling import traced
+
+# Levels are built until the image fits in a TILE x TILE square
+TILE = 256
+
+# Indexed images are expanded to RGB this many rows at a time for level 1
+_EXPAND_ROWS = 512
+
+BACKGROUND = (255, 255, 255)
+
+
+def downsample2(a: np.ndarray) -> np.ndarray:
+    """Halve an (H, W) or (H, W, C) uint8 array by averaging 2x2 blocks (edges repeated)."""
+    height, width = a.shape[:2]
+    if height % 2 or width % 2:
+        pad = [(0, height % 2), (0, width % 2)] + [(0, 0)] * (a.ndim - 2)
+        a = np.pad(a, pad, mode="edge")
+    # Strided adds in place: much faster than a sum over a reshaped block axis
+    total = a[0::2, 0::2].astype(np.uint16)
+    total += a[1::2, 0::2]
+    total += a[0::2, 1::2]
+    total += a[1::2, 1::2]
+    total += 2
+    total >>= 2
+    return total.astype(np.uint8)
+
+
+def _downsample_indexed(indices: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Half-size RGB level of an indexed image, expanding only a band of rows at a time."""
+    bands = [
+        downsample2(palette[indices[y:y + _EXPAND_ROWS]])
+        for y in range(0, indices.shape[0], _EXPAND_ROWS)
+    ]
+    return np.concatenate(bands)
+
+
+def _fit_scale(size, max_size):
+    return min(max_size[0] / size[0], max_size[1] / size[1], 1.0)
+
+
+class ImagePyramid:
+    """
+    Levels of an 'L', 'RGB' or indexed image. For indexed images level 0 keeps
+    the index plane and palette and the smaller levels are RGB.
+    render() draws any viewport; thumbnail() is a render of the whole image.
+    """
+
+    def __init__(self, base: np.ndarray, palette: np.ndarray | None = None):
+        self.palette = palette
+        self.levels = [base]
+        level = base
+        while max(level.shape[:2]) > TILE and min(level.shape[:2]) > 1:
+            if level is base and palette is not None:
+                level = _downsample_indexed(base, palette)
+            else:
+                level = downsample2(level)
+            self.levels.append(level)
+
+    @classmethod
+    @traced("build pyramid")
+    def from_image(cls, img: Image.Image) -> "ImagePyramid":
+        """Pyramid of a PIL image ('P' stays indexed, 'L' and 'RGB' as they are)."""
+        if img.mode == "P":
+            from indexed_processing import split_indexed
+            return cls(*split_indexed(img))
+        if img.mode not in ("L", "RGB"):
+            img = img.convert("RGB")
+        return cls(np.asarray(img))
+
+    @property
+    def size(self):
+        """(width, height) of level 0."""
+        return self.levels[0].shape[1], self.levels[0].shape[0]
+
+    @property
+    def mode(self):
+        return "L" if self.levels[0].ndim == 2 and self.palette is None else "RGB"
+
+    def level_for(self, scale: float) -> int:
+        """Smallest level whose resolution is still at least scale (display pixels per source pixel)."""
+        if scale >= 1:
+            return 0
+        return min(len(self.levels) - 1, int(math.floor(math.log2(1 / scale) + 1e-9)))
+
+    def _crop(self, level: int, x0: int, y0: int, x1: int, y1: int) -> Image.Image:
+        part = self.levels[level][y0:y1, x0:x1]
+        if level == 0 and self.palette is not None:
+            part = self.palette[part]
+        return Image.fromarray(np.ascontiguousarray(part))
+
+    def render(self, x0: float, y0: float, scale: float, size) -> Image.Image:
+        """
+        The viewport of the given (width, height) whose top-left corner is the
+        source point (x0, y0), at scale display pixels per source pixel.
+        Display pixel (u, v) shows the source point (x0 + (u + 0.5) / scale,
+        y0 + (v + 0.5) / scale); areas outside the image are background.
+        """
+        out_w, out_h = size
+        width, height = self.size
+        canvas = Image.new(self.mode, size, BACKGROUND if self.mode == "RGB" else 255)
+        # Visible part of the image, in source and display pixels
+        sx0, sy0 = max(0.0, x0), max(0.0, y0)
+        sx1, sy1 = min(width, x0 + out_w / scale), min(height, y0 + out_h / scale)
+        dx0, dy0 = round((sx0 - x0) * scale), round((sy0 - y0) * scale)
+        dx1, dy1 = round((sx1 - x0) * scale), round((sy1 - y0) * scale)
+        if dx1 <= dx0 or dy1 <= dy0:
+            return canvas
+        level = self.level_for(scale)
+        f = 1 << level
+        level_h, level_w = self.levels[level].shape[:2]
+        lx0, ly0 = int(sx0 / f), int(sy0 / f)
+        lx1, ly1 = min(level_w, math.ceil(sx1 / f)), min(level_h, math.ceil(sy1 / f))
+        crop = self._crop(level, lx0, ly0, lx1, ly1)
+        box = (sx0 / f - lx0, sy0 / f - ly0, sx1 / f - lx0, sy1 / f - ly0)
+        resample = Image.NEAREST if scale * f >= 1 else Image.BILINEAR
+        canvas.paste(crop.resize((dx1 - dx0, dy1 - dy0), resample, box=box), (dx0, dy0))
+        return canvas
+
+    def thumbnail(self, max_size) -> Image.Image:
+        """The whole image scaled to fit within max_size (w, h), never enlarged."""
+        scale = _fit_scale(self.size, max_size)
+        width, height = self.size
+        return self.render(0, 0, scale, (max(1, round(width * scale)), max(1, round(height * scale))))
+
+
+class MappedView:
+    """
+    Viewport renderer for a pcx_mmap.MappedPcx: overviews come from a pyramid
+    of its preview, closer zooms decode only the visible, sampled scanlines.
+    """
+
+    def __init__(self, mapped, preview: Image.Image):
+        self.mapped = mapped
+        self.preview = ImagePyramid.from_image(preview)
+        self.preview_scale = preview.width / mapped.width
+        self.mode = "RGB"
+
+    @property
+    def size(self):
+        return self.mapped.size
+
+    def render(self, x0: float, y0: float, scale: float, size) -> Image.Image:
+        if scale <= self.preview_scale:
+            s = self.preview_scale
+            return self.preview.render(x0 * s, y0 * s, scale / s, size)
+        out_w, out_h = size
+        width, height = self.size
+        canvas = Image.new("RGB", size, BACKGROUND)
+        sx0, sy0 = max(0, int(x0)), max(0, int(y0))
+        sx1 = min(width, math.ceil(x0 + out_w / scale))
+        sy1 = min(height, math.ceil(y0 + out_h / scale))
+        if sx1 <= sx0 or sy1 <= sy0:
+            return canvas
+        # Nearest-neighbour sampling: about one decoded scanline per display row
+        step = max(1, int(1 / scale))
+        if step == 1:
+            pixels = self.mapped.read_tile(sx0, sy0, sx1, sy1)
+        else:
+            pixels = np.stack([self.mapped.read_rows(y, y + 1)[0, sx0:sx1:step]
+                               for y in range(sy0, sy1, step)])
+        crop = Image.fromarray(np.ascontiguousarray(self.mapped.to_rgb(pixels)))
+        dx0, dy0 = round((sx0 - x0) * scale), round((sy0 - y0) * scale)
+        dx1, dy1 = round((sx1 - x0) * scale), round((sy1 - y0) * scale)
+        if dx1 > dx0 and dy1 > dy0:
+            canvas.paste(crop.resize((dx1 - dx0, dy1 - dy0), Image.NEAREST), (dx0, dy0))
+        return canvas
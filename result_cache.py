@@ -0,0 +1,189 @@
+# Content-addressed cache for filter and point-operation results.
+# Keys hash the source pixels together with the operation name and its
+# parameters, so the same operation on the same image is computed once.
+# Entries live in an in-memory LRU bounded by bytes; with a disk directory,
+# images and arrays are also written as .npy files that survive the process
+# (e.g. across batch reruns). The disk tier is not size-bounded.
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Disk file suffixes by stored kind: 'L' and 'RGB' images, or plain arrays
+_DISK_KINDS = ("L", "RGB", "array")
+
+
+def _feed(h, part):
+    if isinstance(part, Image.Image):
+        h.update(f"image:{part.mode}:{part.size}".encode())
+        h.update(np.ascontiguousarray(np.asarray(part)).data)
+        if part.mode == "P":
+            h.update(bytes(part.getpalette() or ()))
+    elif isinstance(part, np.ndarray):
+        h.update(f"array:{part.dtype.str}:{part.shape}".encode())
+        h.update(np.ascontiguousarray(part).data)
+    elif isinstance(part, dict):
+        h.update(b"dict")
+        for k in sorted(part):
+            _feed(h, k)
+            _feed(h, part[k])
+    elif isinstance(part, (list, tuple)):
+        h.update(f"seq:{len(part)}".encode())
+        for item in part:
+            _feed(h, item)
+    else:
+        h.update(f"{type(part).__name__}:{part!r}".encode())
+    h.update(b"|")
+
+
+def make_key(*parts):
+    """Hex digest of images, arrays, names and parameters (dicts in key order)."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _feed(h, part)
+    return h.hexdigest()
+
+
+def _nbytes(value):
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    LRU of computed results bounded by max_bytes, with an optional .npy disk tier.
+    Thread-safe. stats() reports hits, disk hits, misses and evictions.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = self._disk_hits = self._misses = self._evictions = 0
+
+    key = staticmethod(make_key)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+        value = self._load(key)
+        with self._lock:
+            if value is None:
+                self._misses += 1
+                return default
+            self._disk_hits += 1
+        self._remember(key, value)
+        return value
+
+    def contains(self, key):
+        """Whether key is cached in memory or on disk. Unlike get, loads nothing and counts nothing."""
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.disk_dir) and any(os.path.exists(self._path(key, kind)) for kind in _DISK_KINDS)
+
+    def put(self, key, value):
+        """Store value under key (memory, and disk when enabled); returns value."""
+        self._remember(key, value)
+        self._store(key, value)
+        return value
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def wrap(self, name, fn):
+        """fn(src, *args, **kwargs) cached on (name, src pixels, args, kwargs)."""
+        def cached(src, *args, **kwargs):
+            key = make_key(name, src, args, kwargs)
+            return self.get_or_compute(key, lambda: fn(src, *args, **kwargs))
+        cached.__name__ = getattr(fn, "__name__", name)
+        cached.__doc__ = fn.__doc__
+        return cached
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits + self._disk_hits) / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def clear(self):
+        """Drop the memory tier (disk files are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remember(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+
+    # Disk tier: single 'L'/'RGB' images and arrays only
+
+    def _path(self, key, kind):
+        return os.path.join(self.disk_dir, f"{key}.{kind}.npy")
+
+    def _store(self, key, value):
+        if not self.disk_dir:
+            return
+        if isinstance(value, Image.Image) and value.mode in ("L", "RGB"):
+            kind, array = value.mode, np.asarray(value)
+        elif isinstance(value, np.ndarray) and value.dtype != object:
+            kind, array = "array", value
+        else:
+            return
+        path = self._path(key, kind)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, path)  # atomic, so concurrent writers never expose partial files
+
+    def _load(self, key):
+        if not self.disk_dir:
+            return None
+        for kind in _DISK_KINDS:
+            path = self._path(key, kind)
+            try:
+                array = np.load(path)
+            except (FileNotFoundError, ValueError, OSError):
+                continue
+            return array if kind == "array" else Image.fromarray(array, mode=kind)
+        return None
@@ -0,0 +1,173 @@
+# Batched processing of same-size grayscale frames stacked into one array.
+# Every function takes an (N, H, W) uint8 stack. Lookups, equalization and the
+# gradient handle all frames in a few vectorized calls instead of N calls with
+# their per-call Python, PIL and allocation overhead; plain histograms are
+# already one bincount per frame either way. Results match the per-frame
+# functions in processing exactly. Large stacks are processed a group of frames at a time, so
+# temporaries stay bounded however many frames there are.
+import os
+
+import numpy as np
+
+from histogram_equalization import _cdf_luts
+from lut import compile_chain, rgb_to_gray
+
+# Pixels per group of frames: the group's intp index buffer stays cache-sized
+_GROUP_PIXELS = 1 << 17
+
+
+def _check_stack(stack: np.ndarray) -> np.ndarray:
+    stack = np.asarray(stack)
+    if stack.ndim != 3 or stack.dtype != np.uint8:
+        raise ValueError(f"Expected an (N, H, W) uint8 stack, got {stack.ndim}-D {stack.dtype}.")
+    return stack
+
+
+def _groups(stack: np.ndarray):
+    """Slices of whole frames, each about _GROUP_PIXELS pixels."""
+    n, height, width = stack.shape
+    step = max(1, _GROUP_PIXELS // max(1, height * width))
+    for i in range(0, n, step):
+        yield slice(i, min(n, i + step))
+
+
+def _offset_groups(stack: np.ndarray):
+    """
+    Yield (group slice, indices) where indices holds the group's pixels offset
+    by 256 * frame number within the group: positions in its flattened
+    (frames, 256) histograms or tables. The index buffer is reused across groups.
+    """
+    buffer = None
+    for group in _groups(stack):
+        frames = stack[group]
+        if buffer is None:
+            buffer = np.empty(frames.shape, dtype=np.intp)
+        offsets = (np.arange(frames.shape[0], dtype=np.intp) * 256)[:, None, None]
+        yield group, np.add(frames, offsets, out=buffer[:frames.shape[0]])
+
+
+def _bincount(indices: np.ndarray) -> np.ndarray:
+    return np.bincount(indices.ravel(), minlength=indices.shape[0] * 256).reshape(-1, 256)
+
+
+def histograms(stack: np.ndarray) -> np.ndarray:
+    """
+    (N, 256) int64 histograms, one bincount per frame. An offset index per
+    group would cost more to write than the calls it saves; it only pays off
+    where a lookup reuses it (equalize, apply_luts).
+    """
+    stack = _check_stack(stack)
+    hists = np.empty((stack.shape[0], 256), dtype=np.int64)
+    for i, frame in enumerate(stack):
+        hists[i] = np.bincount(frame.ravel(), minlength=256)
+    return hists
+
+
+def apply_luts(stack: np.ndarray, luts: np.ndarray) -> np.ndarray:
+    """Map frame i through its own 256-entry table luts[i]."""
+    stack = _check_stack(stack)
+    luts = np.asarray(luts, dtype=np.uint8)
+    if luts.shape != (stack.shape[0], 256):
+        raise ValueError(f"Expected ({stack.shape[0]}, 256) tables, got {luts.shape}.")
+    out = np.empty_like(stack)
+    for group, indices in _offset_groups(stack):
+        np.take(luts[group].ravel(), indices, out=out[group])
+    return out
+
+
+def equalize(stack: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (equalized stack, (N, 256) original histograms); global equalization per
+    frame. Histograms and table lookups share one offset index per group.
+    """
+    stack = _check_stack(stack)
+    out = np.empty_like(stack)
+    hists = np.empty((stack.shape[0], 256), dtype=np.int64)
+    for group, indices in _offset_groups(stack):
+        hists[group] = _bincount(indices)
+        np.take(_cdf_luts(hists[group]).ravel(), indices, out=out[group])
+    return out, hists
+
+
+def point_chain(stack: np.ndarray, steps) -> np.ndarray:
+    """Apply point operations, e.g. [("gamma", 0.5), ("threshold", 128)], to every frame in one lookup."""
+    return compile_chain(steps)[_check_stack(stack)]
+
+
+def negative(stack: np.ndarray) -> np.ndarray:
+    return point_chain(stack, [("negative",)])
+
+
+def threshold(stack: np.ndarray, threshold: int) -> np.ndarray:
+    """255 where a pixel >= threshold, else 0."""
+    if not 0 <= threshold <= 255:
+        raise ValueError("threshold must be between 0 and 255.")
+    return point_chain(stack, [("threshold", int(threshold))])
+
+
+def gamma(stack: np.ndarray, gamma: float) -> np.ndarray:
+    """Power-law transformation 255 * (pixel / 255) ** gamma."""
+    if not gamma > 0:
+        raise ValueError("gamma must be positive.")
+    return point_chain(stack, [("gamma", float(gamma))])
+
+
+def sobel(stack: np.ndarray) -> np.ndarray:
+    """Sobel gradient magnitude of every frame; the correlations run over the whole group at once."""
+    from filters.gradient import gradient_sobel_stack
+
+    stack = _check_stack(stack)
+    out = np.empty_like(stack)
+    for group in _groups(stack):
+        out[group] = gradient_sobel_stack(stack[group])
+    return out
+
+
+def load_stack(paths, pattern="*.pcx") -> tuple[np.ndarray, list[str]]:
+    """
+    Decode equal-size PCX files into one preallocated (N, H, W) grayscale
+    stack (channel average, as processing.grayscale). `paths` is a directory,
+    whose files matching pattern are loaded in name order, or a list of files.
+    Returns (stack, file paths). Every file's RLE data is decoded into one
+    reused buffer and converted straight into its frame.
+    """
+    import fnmatch
+
+    from indexed_processing import palette_gray
+    from pcx_reader import PcxHeader, _decode_rle, check_format, lines_to_pixels, read_palette
+
+    if isinstance(paths, (str, os.PathLike)):
+        names = sorted(n for n in os.listdir(paths) if fnmatch.fnmatch(n.lower(), pattern.lower()))
+        paths = [os.path.join(paths, n) for n in names]
+    paths = list(paths)
+    if not paths:
+        raise ValueError("No PCX files to load.")
+    headers = []
+    for path in paths:
+        with open(path, "rb") as f:
+            header = PcxHeader.from_bytes(f.read(128))
+        check_format(header)
+        if headers and (header.Width, header.Height) != (headers[0].Width, headers[0].Height):
+            raise ValueError(f"{path} is {header.Width}x{header.Height}, expected "
+                             f"{headers[0].Width}x{headers[0].Height} like {paths[0]}.")
+        headers.append(header)
+
+    width, height = headers[0].Width, headers[0].Height
+    stack = np.empty((len(paths), height, width), dtype=np.uint8)
+    plane = np.empty(max(h.decoded_size for h in headers), dtype=np.uint8)
+    for i, (path, header) in enumerate(zip(paths, headers)):
+        with open(path, "rb") as f:
+            data = f.read()
+        view = memoryview(data)
+        lines, used = _decode_rle(view[128:], header.decoded_size, out=plane[:header.decoded_size])
+        palette = read_palette(view, header, 128 + used)
+        if palette is None:
+            # 24-bit: average the R, G and B planes straight from the decoded scanlines
+            rgb = lines.reshape(height, 3, header.BytesPerLine)[:, :, :width].transpose(0, 2, 1)
+            stack[i] = rgb_to_gray(rgb)
+        elif header.BitsPerPixel == 8 and header.NPlanes == 1:
+            indices = lines.reshape(height, header.BytesPerLine)[:, :width]
+            np.take(palette_gray(palette), indices, out=stack[i])
+        else:
+            np.take(palette_gray(palette), lines_to_pixels(lines, header, height), out=stack[i])
+    return stack, paths
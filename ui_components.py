@@ -1,4 +1,124 @@
+import time
 from tkinter import *
+from tkinter import ttk
+
+from PIL import ImageTk
+
+
+class ZoomView:
+    """
+    Canvas showing a zoomable image source (pyramid.ImagePyramid or MappedView):
+    mouse wheel zooms around the cursor, dragging pans, double-click fits the
+    whole image. Only the visible viewport is rendered, once per idle round.
+    on_click((x, y)) receives the source pixel under a click that did not drag
+    (None outside the image).
+    """
+
+    MAX_SCALE = 32.0
+    ZOOM_STEP = 1.25
+    DRAG_PIXELS = 3  # movement below this is a click, not a pan
+
+    def __init__(self, parent, size=(400, 400), on_click=None):
+        self.size = size
+        self.on_click = on_click
+        self.canvas = Canvas(parent, width=size[0], height=size[1], bg="white",
+                             relief=SUNKEN, bd=1, highlightthickness=0, cursor="crosshair")
+        self._item = self.canvas.create_image(0, 0, anchor=NW)
+        self.source = None
+        self.x0 = self.y0 = 0.0
+        self.scale = 1.0
+        self.render_ms = 0.0
+        self._photo = None
+        self._after_id = None
+        self._press = None
+        self.canvas.bind("<MouseWheel>", lambda e: self._on_wheel(e, e.delta > 0))
+        self.canvas.bind("<Button-4>", lambda e: self._on_wheel(e, True))
+        self.canvas.bind("<Button-5>", lambda e: self._on_wheel(e, False))
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.canvas.bind("<Double-Button-1>", lambda e: self.fit())
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def set_source(self, source):
+        self.source = source
+        self.fit()
+
+    def clear(self):
+        self.source = None
+        self._photo = None
+        self.canvas.itemconfig(self._item, image="")
+
+    def fit(self):
+        """Show the whole image, centered and never enlarged."""
+        if self.source is None:
+            return
+        width, height = self.source.size
+        self.scale = min(self.size[0] / width, self.size[1] / height, 1.0)
+        self._move(0.0, 0.0)
+
+    def to_source(self, u, v):
+        """Source pixel (x, y) under view pixel (u, v), or None outside the image."""
+        if self.source is None:
+            return None
+        x = self.x0 + (u + 0.5) / self.scale
+        y = self.y0 + (v + 0.5) / self.scale
+        width, height = self.source.size
+        if 0 <= x < width and 0 <= y < height:
+            return int(x), int(y)
+        return None
+
+    def zoom(self, factor, u, v):
+        """Zoom by factor keeping the source point under view pixel (u, v) in place."""
+        width, height = self.source.size
+        min_scale = min(self.size[0] / width, self.size[1] / height, 1.0)
+        scale = min(self.MAX_SCALE, max(min_scale, self.scale * factor))
+        sx, sy = self.x0 + u / self.scale, self.y0 + v / self.scale
+        self.scale = scale
+        self._move(sx - u / scale, sy - v / scale)
+
+    def _move(self, x0, y0):
+        # Center along axes where the image is smaller than the view, else keep it covering the view
+        width, height = self.source.size
+        view_w, view_h = self.size[0] / self.scale, self.size[1] / self.scale
+        self.x0 = (width - view_w) / 2 if view_w >= width else min(max(x0, 0.0), width - view_w)
+        self.y0 = (height - view_h) / 2 if view_h >= height else min(max(y0, 0.0), height - view_h)
+        if self._after_id is None:
+            self._after_id = self.canvas.after_idle(self._redraw)
+
+    def _redraw(self):
+        self._after_id = None
+        if self.source is None:
+            return
+        started = time.perf_counter()
+        image = self.source.render(self.x0, self.y0, self.scale, self.size)
+        self._photo = ImageTk.PhotoImage(image)
+        self.canvas.itemconfig(self._item, image=self._photo)
+        self.render_ms = (time.perf_counter() - started) * 1000
+
+    def _on_wheel(self, event, zoom_in):
+        if self.source is not None:
+            self.zoom(self.ZOOM_STEP if zoom_in else 1 / self.ZOOM_STEP, event.x, event.y)
+        return "break"  # keep the surrounding page from scrolling
+
+    def _on_press(self, event):
+        self._press = (event.x, event.y, self.x0, self.y0, False)
+
+    def _on_drag(self, event):
+        if self._press is None or self.source is None:
+            return
+        px, py, x0, y0, dragged = self._press
+        if not dragged and max(abs(event.x - px), abs(event.y - py)) < self.DRAG_PIXELS:
+            return
+        self._press = (px, py, x0, y0, True)
+        self._move(x0 - (event.x - px) / self.scale, y0 - (event.y - py) / self.scale)
+
+    def _on_release(self, event):
+        press, self._press = self._press, None
+        if press is not None and not press[4] and self.on_click is not None:
+            self.on_click(self.to_source(event.x, event.y))
 
 def create_main_ui(root, open_callback):
     """Builds all UI elements and returns dictionary of widgets."""
@@ -9,6 +129,16 @@ def create_main_ui(root, open_callback):
     status_label = Label(root, text="No file loaded", fg="gray")
     status_label.pack()
 
+    # Progress of background jobs (decoding, filtering) and their Cancel button
+    progress_row = Frame(root)
+    progress_row.pack(pady=2)
+    progress_bar = ttk.Progressbar(progress_row, length=300, mode="determinate", maximum=100)
+    progress_bar.pack(side=LEFT, padx=5)
+    cancel_btn = Button(progress_row, text="Cancel", state=DISABLED)
+    cancel_btn.pack(side=LEFT)
+    stats_btn = Button(progress_row, text="Stats")
+    stats_btn.pack(side=LEFT, padx=5)
+
     # Scrollable container
     container = Frame(root)
     container.pack(fill=BOTH, expand=True)
@@ -20,7 +150,10 @@ def create_main_ui(root, open_callback):
         lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
     )
     canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-    canvas.configure(yscrollcommand=scrollbar.set)
+    def _on_yview(first, last):
+        scrollbar.set(first, last)
+        canvas.event_generate("<<ViewScrolled>>")  # lets lazy views render on scroll
+    canvas.configure(yscrollcommand=_on_yview)
     canvas.pack(side=LEFT, fill=BOTH, expand=True)
     scrollbar.pack(side=RIGHT, fill=Y)
 
@@ -29,10 +162,11 @@ def create_main_ui(root, open_callback):
     header_text = Text(scrollable_frame, width=70, height=10, font=("Courier", 9))
     header_text.pack(pady=5)
 
-    # Original Image (clickable for RGB values)
-    Label(scrollable_frame, text="Original Image (click to see RGB values):", font=("Arial", 11, "bold")).pack(anchor=W)
-    original_img_label = Label(scrollable_frame, bg="white", relief=SUNKEN, cursor="crosshair")
-    original_img_label.pack(pady=5)
+    # Original Image (clickable for RGB values, zoomable)
+    Label(scrollable_frame, text="Original Image (click to see RGB values, wheel to zoom, drag to pan):",
+          font=("Arial", 11, "bold")).pack(anchor=W)
+    original_view = ZoomView(scrollable_frame, (400, 400))
+    original_view.pack(pady=5)
     rgb_info_label = Label(scrollable_frame, text="", font=("Courier", 10), fg="blue")
     rgb_info_label.pack()
 
@@ -107,12 +241,30 @@ def create_main_ui(root, open_callback):
     filter_select.pack(side=LEFT)
     apply_filter_btn = Button(selector_row, text="Apply Filter")
     apply_filter_btn.pack(side=LEFT, padx=8)
+    save_result_btn = Button(selector_row, text="Save Result as PCX")
+    save_result_btn.pack(side=LEFT)
 
     result_frame = Frame(filters_frame)
     result_frame.pack(pady=8, fill=X)
     Label(result_frame, text="Filter Result", font=("Arial", 9, "bold")).pack(anchor=W)
-    filter_result_img = Label(result_frame, bg="white", relief=SUNKEN)
-    filter_result_img.pack()
+    filter_result_view = ZoomView(result_frame, (400, 400))
+    filter_result_view.pack()
+
+    # Live preview: sliders for the selected operation's parameters, filled in when a file loads
+    Label(scrollable_frame, text="Live Preview (drag a slider):", font=("Arial", 11, "bold")).pack(anchor=W)
+    live_frame = Frame(scrollable_frame)
+    live_frame.pack(pady=10, fill=X)
+    live_row = Frame(live_frame)
+    live_row.pack(anchor=W, pady=2)
+    Label(live_row, text="Operation:").pack(side=LEFT, padx=(0, 6))
+    live_select_var = StringVar()
+    live_select = OptionMenu(live_row, live_select_var, "")
+    live_select.config(width=18)
+    live_select.pack(side=LEFT)
+    live_sliders = Frame(live_frame)
+    live_sliders.pack(anchor=W, fill=X)
+    live_label = Label(live_frame, bg="white", relief=SUNKEN)
+    live_label.pack(pady=8)
 
     # Mouse scroll
     def _on_mousewheel(event):
@@ -121,8 +273,12 @@ def create_main_ui(root, open_callback):
 
     return {
         "status": status_label,
+        "canvas": canvas,
+        "progress": progress_bar,
+        "cancel_btn": cancel_btn,
+        "stats_btn": stats_btn,
         "header": header_text,
-        "original_img": original_img_label,
+        "original_view": original_view,
         "rgb_info": rgb_info_label,
         "palette": palette_label,
         "img": img_label,
@@ -134,5 +290,44 @@ def create_main_ui(root, open_callback):
         "filter_select_var": filter_select_var,
         "filter_select": filter_select,
         "apply_filter_btn": apply_filter_btn,
-        "filter_result_img": filter_result_img
+        "save_result_btn": save_result_btn,
+        "filter_result_view": filter_result_view,
+        "live_select_var": live_select_var,
+        "live_select": live_select,
+        "live_sliders": live_sliders,
+        "live": live_label
+    }
+
+
+def create_stats_panel(root):
+    """Builds the profiling stats window and returns dictionary of its widgets."""
+    window = Toplevel(root)
+    window.title("Profiling Stats")
+    window.geometry("760x420")
+
+    controls = Frame(window)
+    controls.pack(fill=X, padx=5, pady=5)
+    record_var = BooleanVar()
+    record_check = Checkbutton(controls, text="Record spans", variable=record_var)
+    record_check.pack(side=LEFT)
+    memory_var = BooleanVar()
+    memory_check = Checkbutton(controls, text="Track memory", variable=memory_var)
+    memory_check.pack(side=LEFT, padx=5)
+    clear_btn = Button(controls, text="Clear")
+    clear_btn.pack(side=LEFT, padx=5)
+    export_btn = Button(controls, text="Export Chrome Trace...")
+    export_btn.pack(side=LEFT)
+
+    table = Text(window, font=("Courier", 9), wrap=NONE)
+    table.pack(fill=BOTH, expand=True, padx=5, pady=5)
+
+    return {
+        "window": window,
+        "record_var": record_var,
+        "record_check": record_check,
+        "memory_var": memory_var,
+        "memory_check": memory_check,
+        "clear_btn": clear_btn,
+        "export_btn": export_btn,
+        "table": table,
     }